@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acne_service.settings")
+# 실행: gunicorn acne_service.asgi:application -k uvicorn.workers.UvicornWorker -w 2
+# ASGI 로 뜰 때는 diagnosis 의 async 뷰 사용 (WSGI 는 기존 sync 뷰 그대로)
+os.environ.setdefault("DIAG_ASYNC_VIEWS", "1")
+application = get_asgi_application()
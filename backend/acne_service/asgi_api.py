@@ -0,0 +1,6 @@
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acne_service.settings_api")
+# 실행: gunicorn acne_service.asgi_api:application -k uvicorn.workers.UvicornWorker -w 2
+os.environ.setdefault("DIAG_ASYNC_VIEWS", "1")
+application = get_asgi_application()
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "diagnosis.metrics.TimingMiddleware",  # 가장 바깥: 전체 요청 시간/에러 집계
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -41,6 +42,7 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "acne_service.urls"
 WSGI_APPLICATION = "acne_service.wsgi.application"
+ASGI_APPLICATION = "acne_service.asgi.application"
 
 TEMPLATES = [{
     "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -66,17 +68,37 @@ if DATABASE_URL:
         "default": dj_database_url.parse(
             DATABASE_URL,
             conn_max_age=600,
-            ssl_require=True,
+            ssl_require=env_bool("DATABASE_SSL_REQUIRE", True),  # 로컬 Postgres 벤치 등은 0
         )
     }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("DJANGO_SQLITE_PATH") or BASE_DIR / "db.sqlite3",
         }
     }
 
+# (선택) 읽기 전용 replica: 통계 API / export / admin 목록만 여기서 읽음 (diagnosis/db_routing.py)
+# 로컬 시험: DATABASE_REPLICA_URL=sqlite:////tmp/replica.sqlite3
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        ssl_require=env_bool("DATABASE_SSL_REQUIRE", True) and not DATABASE_REPLICA_URL.startswith("sqlite"),
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["diagnosis.db_routing.PrimaryReplicaRouter"]
+
+# ---- 로깅 ----
+# DIAG_LOG_FORMAT=json   : 한 줄 JSON (결과 로그는 answers/scores 필드로)
+# DIAG_LOG_ASYNC=1       : QueueHandler → 백그라운드 스레드가 stdout 출력 (요청 스레드 블로킹 X)
+# DIAG_LOG_RESULT_SAMPLE : 결과 상세 로그 샘플링 비율 (0~1, 예: 0.01)
+DIAG_LOG_FORMAT = os.getenv("DIAG_LOG_FORMAT", "text").lower()
+DIAG_LOG_ASYNC = env_bool("DIAG_LOG_ASYNC", False)
+DIAG_LOG_RESULT_SAMPLE = float(os.getenv("DIAG_LOG_RESULT_SAMPLE", "1.0"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -84,12 +106,15 @@ LOGGING = {
         "simple": {
             "format": "%(message)s"
         },
+        "json": {
+            "()": "diagnosis.logging_utils.JsonFormatter",
+        },
     },
     "handlers": {
         "console": {
             "level": "INFO",
-            "class": "logging.StreamHandler",
-            "formatter": "simple",
+            "class": "diagnosis.logging_utils.BackgroundHandler" if DIAG_LOG_ASYNC else "logging.StreamHandler",
+            "formatter": "json" if DIAG_LOG_FORMAT == "json" else "simple",
         },
     },
     "loggers": {
@@ -107,6 +132,94 @@ LOGGING = {
 }
 
 
+# ---- 진단 API ----
+DIAG_BATCH_MAX_ITEMS = int(os.getenv("DIAG_BATCH_MAX_ITEMS", "5000"))  # /api/result/batch 1회 최대 건수
+DIAG_CLICK_BATCH_MAX_EVENTS = int(os.getenv("DIAG_CLICK_BATCH_MAX_EVENTS", "500"))  # /api/track-click/batch 1회 최대 건수
+
+# async 뷰 사용 여부 (acne_service/asgi.py 가 기본 1 로 설정)
+DIAG_ASYNC_VIEWS = env_bool("DIAG_ASYNC_VIEWS", False)
+
+# 저장 시 시간별 롤업(DiagnosisHourlyStat/ClickHourlyStat) 증분 갱신 (워커 메모리 → FLUSH_INTERVAL 초마다). 끄면 rebuild_rollups 로만 채움
+DIAG_ROLLUP_ON_WRITE = env_bool("DIAG_ROLLUP_ON_WRITE", True)
+DIAG_ROLLUP_FLUSH_INTERVAL = float(os.getenv("DIAG_ROLLUP_FLUSH_INTERVAL", "5"))  # 증분을 모아 DB 에 더하는 주기(초)
+
+# /share/<code> Cache-Control max-age (초). 크롤러/CDN 캐시용
+DIAG_SHARE_MAX_AGE = int(os.getenv("DIAG_SHARE_MAX_AGE", "3600"))
+
+# 단계별 타이밍 Server-Timing 헤더 노출 여부 / /metrics 접근 토큰
+# (Authorization: Bearer <token>. 비우면 DEBUG 에서만 공개, 운영에서는 403)
+DIAG_SERVER_TIMING = env_bool("DIAG_SERVER_TIMING", True)
+DIAG_METRICS_TOKEN = os.getenv("DIAG_METRICS_TOKEN", "")
+
+# DiagnosisResult write-behind 저장 (기본 off: 요청 안에서 동기 insert)
+DIAG_WRITE_BEHIND = env_bool("DIAG_WRITE_BEHIND", False)
+DIAG_WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("DIAG_WRITE_BEHIND_QUEUE_SIZE", "10000"))
+DIAG_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("DIAG_WRITE_BEHIND_BATCH_SIZE", "200"))
+DIAG_WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("DIAG_WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))  # 초
+DIAG_WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv("DIAG_WRITE_BEHIND_PUT_TIMEOUT", "0.05"))  # 큐 full 시 대기(초)
+# 아직 flush 안 된 진단을 가리키는 클릭: 진단이 저장될 때까지 연결을 미루는 최대 시간(초)
+DIAG_WRITE_BEHIND_LINK_TIMEOUT = float(os.getenv("DIAG_WRITE_BEHIND_LINK_TIMEOUT", "60"))
+
+# archive_diagnoses 출력 디렉터리 (월별 .ndjson.gz)
+DIAG_ARCHIVE_DIR = Path(os.getenv("DIAG_ARCHIVE_DIR", str(BASE_DIR / "archive")))
+
+# 채점표 JSON 파일 (비우면 quiz_logic.py 내장 표). 파일이 바뀌면 RELOAD_INTERVAL 초 안에 워커가 교체
+DIAG_SCORING_TABLES = os.getenv("DIAG_SCORING_TABLES", "")
+DIAG_SCORING_RELOAD_INTERVAL = float(os.getenv("DIAG_SCORING_RELOAD_INTERVAL", "5"))
+# 채점 lookup 파일 디렉터리 (build_scoring_lut 로 생성). 비우면 사용 안 함
+DIAG_SCORING_LUT_DIR = os.getenv("DIAG_SCORING_LUT_DIR", "")
+
+# 퀴즈 완료 시간 분위수 스케치 (워커 메모리 → FLUSH_INTERVAL 초마다 CompletionSketch 로 병합)
+DIAG_COMPLETION_SKETCHES = env_bool("DIAG_COMPLETION_SKETCHES", True)
+DIAG_SKETCH_FLUSH_INTERVAL = float(os.getenv("DIAG_SKETCH_FLUSH_INTERVAL", "30"))
+DIAG_SKETCH_ACCURACY = float(os.getenv("DIAG_SKETCH_ACCURACY", "0.01"))
+
+# total_score 실측 분포 (워커 메모리 → SYNC_INTERVAL 초마다 ScoreHistogramBin 공유 표와 병합)
+# DIAG_LIVE_PERCENTILE=1 이면 결과 응답에 live_percentile / live_percentile_label 추가
+# 분포 수집은 기본적으로 LIVE_PERCENTILE 을 따름. 기존 진단은 버전별 첫 동기화 때 자동으로 시드 (ScoreHistogramSeed)
+DIAG_LIVE_PERCENTILE = env_bool("DIAG_LIVE_PERCENTILE", False)
+DIAG_SCORE_HISTOGRAM = env_bool("DIAG_SCORE_HISTOGRAM", DIAG_LIVE_PERCENTILE)
+DIAG_SCORE_HISTOGRAM_SYNC_INTERVAL = float(os.getenv("DIAG_SCORE_HISTOGRAM_SYNC_INTERVAL", "30"))
+DIAG_LIVE_PERCENTILE_MIN_SAMPLES = int(os.getenv("DIAG_LIVE_PERCENTILE_MIN_SAMPLES", "1000"))
+DIAG_LIVE_PERCENTILE_MAX_STALENESS = float(os.getenv("DIAG_LIVE_PERCENTILE_MAX_STALENESS", "600"))  # 초
+
+# 쓰기 엔드포인트 IP 별 token bucket (호스트 내 워커 공유: mmap 파일, 기본 /dev/shm/diag-ratelimit)
+# 한도 "<횟수>/<s|m|h>", 빈 값이면 해당 엔드포인트 제한 없음
+# 프록시 뒤라면 DIAG_TRUSTED_PROXY_COUNT = X-Forwarded-For 를 덧붙이는 프록시 수 (nginx 하나면 1, 0 이면 REMOTE_ADDR)
+DIAG_RATELIMIT = env_bool("DIAG_RATELIMIT", False)
+DIAG_TRUSTED_PROXY_COUNT = int(os.getenv("DIAG_TRUSTED_PROXY_COUNT", "0"))
+DIAG_RATELIMIT_FILE = os.getenv("DIAG_RATELIMIT_FILE", "")
+DIAG_RATELIMIT_SLOTS = int(os.getenv("DIAG_RATELIMIT_SLOTS", "65536"))
+DIAG_RATELIMITS = {
+    "result": os.getenv("DIAG_RATELIMIT_RESULT", "30/m"),
+    "result_batch": os.getenv("DIAG_RATELIMIT_RESULT_BATCH", "10/m"),
+    "click": os.getenv("DIAG_RATELIMIT_CLICK", "120/m"),
+    "click_batch": os.getenv("DIAG_RATELIMIT_CLICK_BATCH", "60/m"),
+    "og_render": os.getenv("DIAG_RATELIMIT_OG_RENDER", "30/m"),
+}
+
+# POST /api/result 재전송 중복 방지 (클라이언트별 Idempotency-Key 헤더, write-behind 와 함께 동작)
+# BODY_HASH=1 이면 헤더 없이 client_submitted_at 이 든 body 도 키로 씀
+DIAG_IDEMPOTENCY = env_bool("DIAG_IDEMPOTENCY", True)
+DIAG_IDEMPOTENCY_BODY_HASH = env_bool("DIAG_IDEMPOTENCY_BODY_HASH", False)
+DIAG_IDEMPOTENCY_CACHE_SIZE = int(os.getenv("DIAG_IDEMPOTENCY_CACHE_SIZE", "10000"))
+DIAG_IDEMPOTENCY_BLOOM_BITS = int(os.getenv("DIAG_IDEMPOTENCY_BLOOM_BITS", str(1 << 23)))
+
+# 개인화 OG 이미지 (/og/<code>.png, Pillow 필요. 없으면 원본 결과 이미지로 redirect)
+# 캐시에 없는 조합 렌더는 DIAG_RATELIMIT 의 "og_render" 한도 (운영에서는 DIAG_RATELIMIT=1 권장)
+DIAG_OG_BASE_DIR = Path(os.getenv("DIAG_OG_BASE_DIR", str(BASE_DIR.parent / "frontend" / "public" / "assets")))
+DIAG_OG_CACHE_DIR = Path(os.getenv("DIAG_OG_CACHE_DIR", str(BASE_DIR / "og_cache")))
+DIAG_OG_CACHE_MAX_BYTES = int(os.getenv("DIAG_OG_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DIAG_OG_FONT = os.getenv("DIAG_OG_FONT", "")  # 한글 문구용 TTF/OTF 경로 (없으면 영문 문구)
+DIAG_OG_MAX_AGE = int(os.getenv("DIAG_OG_MAX_AGE", "86400"))
+
+# 요청 단위 cProfile + SQL 기록 (X-Diag-Profile: <secret> 또는 ?_profile=<secret>, staff 는 ?_profile=1)
+# 목록: /admin/diag-profiles/
+DIAG_PROFILING = env_bool("DIAG_PROFILING", False)
+DIAG_PROFILING_SECRET = os.getenv("DIAG_PROFILING_SECRET", "")
+DIAG_PROFILING_DIR = Path(os.getenv("DIAG_PROFILING_DIR", str(BASE_DIR / "profiles")))
+DIAG_PROFILING_KEEP = int(os.getenv("DIAG_PROFILING_KEEP", "200"))
+
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
@@ -120,7 +233,7 @@ _CORS = [o.strip() for o in os.getenv(
 CORS_ALLOW_ALL_ORIGINS = env_bool("CORS_ALLOW_ALL_ORIGINS", False)  # 임시 디버그용 True 가능
 CORS_ALLOWED_ORIGINS = [] if CORS_ALLOW_ALL_ORIGINS else _CORS
 CORS_ALLOW_METHODS = ["GET", "POST", "OPTIONS"]
-CORS_ALLOW_HEADERS = list(default_headers) + ["content-type"]
+CORS_ALLOW_HEADERS = list(default_headers) + ["content-type", "idempotency-key"]
 CORS_ALLOW_CREDENTIALS = False
 
 CSRF_TRUSTED_ORIGINS = [o.replace("http://", "https://") for o in _CORS]  # https로 신뢰
@@ -0,0 +1,22 @@
+# backend/acne_service/settings_api.py
+# API 전용 프로필: /api/*, /share, /og, /metrics 만 서빙 (wsgi_api.py / asgi_api.py)
+# 세 JSON 엔드포인트는 csrf_exempt, 세션/로그인 없음 → admin/auth/sessions/messages/staticfiles/DRF
+# 와 관련 미들웨어를 빼서 import(콜드 스타트)와 요청당 미들웨어 비용을 줄임.
+# admin, staff 전용 export, migrate 는 기존 acne_service.settings 로 띄운 별도 배포에서.
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = ["corsheaders", "diagnosis"]
+
+MIDDLEWARE = [
+    "diagnosis.metrics.TimingMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",  # ALLOWED_HOSTS 검사 (get_host)
+]
+
+ROOT_URLCONF = "acne_service.urls_api"
+WSGI_APPLICATION = "acne_service.wsgi_api.application"
+ASGI_APPLICATION = "acne_service.asgi_api.application"
+
+# 템플릿 렌더 없음 (share 페이지는 share_pages 에서 문자열로 생성)
+TEMPLATES = []
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 
+# diagnosis 가 먼저: /admin/diag-profiles/ 가 admin 의 catch-all 에 걸리지 않도록
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("", include("diagnosis.urls")),
+    path("admin/", admin.site.urls),
 ]
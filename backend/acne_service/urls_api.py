@@ -0,0 +1,6 @@
+from django.urls import include, path
+
+# admin 없음 (settings_api). diagnosis.urls 는 auth 가 없으면 staff 전용 경로를 뺌
+urlpatterns = [
+    path("", include("diagnosis.urls")),
+]
@@ -0,0 +1,5 @@
+import os
+from django.core.wsgi import get_wsgi_application
+# 실행: gunicorn acne_service.wsgi_api:application  (admin 은 acne_service.wsgi 로 따로)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acne_service.settings_api")
+application = get_wsgi_application()
@@ -0,0 +1,173 @@
+"""
+설정 프로필별 콜드 스타트 / 요청당 오버헤드 비교 (전체 settings vs API 전용 settings_api).
+
+    cd backend
+    python bench/cold_start.py                 # 프로필마다 새 프로세스 --runs 번
+    python bench/cold_start.py --runs 10 --requests 2000
+
+프로필마다 새 인터프리터를 띄워서 측정:
+  - process_ms: 인터프리터 시작 ~ 첫 응답까지 (부모 프로세스 기준 wall time)
+  - import_ms: WSGI 모듈 import (django.setup + 핸들러/미들웨어 로드)
+  - first_ms: 첫 요청 (URLconf/뷰 모듈 lazy import 포함)
+  - modules: 첫 응답 후 sys.modules 개수
+  - share_us / result_us: 워밍업 후 GET /share/1, POST /api/result 평균 (WSGI 핸들러 직접 호출, 네트워크 없음)
+DB 는 임시 SQLite (전체 프로필로 한 번 migrate).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+PROFILES = {
+    "full": "acne_service.wsgi",
+    "api": "acne_service.wsgi_api",
+}
+
+RESULT_BODY = json.dumps({"answers": [1, 0, 2, 3, 4, 1, 2, 3, 1, 2, 4, 3], "birth_year": 1995, "lang": "KOR"}).encode()
+
+
+# ---- 자식 프로세스: 실제 측정 ----
+def _environ(method: str, path: str, body: bytes = b""):
+    from wsgiref.util import setup_testing_defaults
+
+    path, _, query = path.partition("?")
+    env = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "HTTP_HOST": "localhost",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    setup_testing_defaults(env)
+    return env
+
+
+def _call(app, method, path, body=b""):
+    status = []
+    chunks = app(_environ(method, path, body), lambda s, h, e=None: status.append(s))
+    try:
+        for _ in chunks:
+            pass
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    if not status[0].startswith("200"):
+        raise RuntimeError(f"{method} {path} -> {status[0]}")
+
+
+def child(module: str, requests: int) -> dict:
+    import importlib
+
+    t0 = time.perf_counter()
+    app = importlib.import_module(module).application
+    t1 = time.perf_counter()
+    _call(app, "GET", "/share/1")
+    _call(app, "POST", "/api/result", RESULT_BODY)
+    t2 = time.perf_counter()
+    out = {"import_ms": (t1 - t0) * 1e3, "first_ms": (t2 - t1) * 1e3, "modules": len(sys.modules)}
+
+    for name, args in (("share_us", ("GET", "/share/1")), ("result_us", ("POST", "/api/result", RESULT_BODY))):
+        for _ in range(min(200, requests)):
+            _call(app, *args)
+        start = time.perf_counter()
+        for _ in range(requests):
+            _call(app, *args)
+        out[name] = (time.perf_counter() - start) / requests * 1e6
+    return out
+
+
+# ---- 부모 프로세스 ----
+def run_profile(module: str, env: dict, requests: int) -> dict:
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", module, "--requests", str(requests)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr)
+    data = json.loads(proc.stdout.strip().splitlines()[-1])
+    # 요청 루프 시간은 빼고 "첫 응답까지" 만
+    loop_s = (data["share_us"] + data["result_us"]) * (requests + min(200, requests)) / 1e6
+    data["process_ms"] = (time.perf_counter() - t0 - loop_s) * 1e3
+    return data
+
+
+def summarize(runs):
+    keys = ("process_ms", "import_ms", "first_ms", "modules", "share_us", "result_us")
+    return {k: round(statistics.median(r[k] for r in runs), 2) for k in keys}
+
+
+def print_report(report):
+    cols = ("process_ms", "import_ms", "first_ms", "modules", "share_us", "result_us")
+    print(f"{'profile':<8} " + " ".join(f"{c:>11}" for c in cols))
+    base = report.get("full")
+    for name, r in report.items():
+        print(f"{name:<8} " + " ".join(f"{r[c]:>11.2f}" for c in cols))
+        if base and name != "full":
+            print(f"{'':<8} " + " ".join(
+                f"{((r[c] / base[c]) - 1) * 100 if base[c] else 0:>+10.1f}%" for c in cols))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--runs", type=int, default=5, help="프로필별 프로세스 수 (중앙값)")
+    p.add_argument("--requests", type=int, default=1000, help="프로세스당 엔드포인트별 요청 수")
+    p.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/cold-start-<시각>.json)")
+    p.add_argument("--child", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, str(BACKEND_DIR))
+        print(json.dumps(child(args.child, args.requests)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="acne-cold-") as tmp:
+        env = dict(os.environ)
+        env.pop("DATABASE_URL", None)
+        env.pop("DJANGO_SETTINGS_MODULE", None)
+        env.setdefault("DJANGO_SECRET_KEY", "bench")
+        env["DJANGO_ALLOWED_HOSTS"] = "localhost"
+        env["DJANGO_SQLITE_PATH"] = str(Path(tmp) / "bench.sqlite3")
+        subprocess.run([sys.executable, "manage.py", "migrate", "--noinput", "-v0"],
+                       cwd=BACKEND_DIR, env=env, check=True)
+        runs = {name: [] for name in PROFILES}
+        for _ in range(args.runs):
+            for name, module in PROFILES.items():  # 번갈아 실행 (디스크 캐시 영향 균등하게)
+                runs[name].append(run_profile(module, env, args.requests))
+
+    report = {name: summarize(r) for name, r in runs.items()}
+    print_report(report)
+
+    result = {
+        "profiles": report,
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "runs": args.runs,
+            "requests": args.requests,
+            "python": sys.version.split()[0],
+        },
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"cold-start-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
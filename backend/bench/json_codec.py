@@ -0,0 +1,75 @@
+"""
+JSON 코덱 마이크로벤치마크 (result_view 요청/응답 페이로드 기준).
+
+    cd backend
+    python bench/json_codec.py                # 현재 설치된 백엔드 vs 기존 방식
+    python bench/json_codec.py --number 50000
+
+기존 방식: json.loads(request.body.decode("utf-8")) + django.http.JsonResponse
+신규 방식: diagnosis.codec.loads(request.body) + diagnosis.codec.JsonResponse
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acne_service.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.http import JsonResponse as DjangoJsonResponse  # noqa: E402
+
+from diagnosis import codec, quiz_logic  # noqa: E402
+
+
+def payloads(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        answers = [rng.randint(0, 4) for _ in range(12)]
+        birth_year = rng.randint(1960, 2010)
+        req = json.dumps({"answers": answers, "birth_year": birth_year, "lang": "KOR"}).encode()
+        res = quiz_logic.compute_result(answers, birth_year)
+        res = {**res, "image": "/assets/result-1.png", "diagnosis_id": "3f1c2a8e-6a0e-4a57-9d0b-1b6a0c6f1e22"}
+        out.append((req, res))
+    return out
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--number", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+
+    data = payloads(256)
+
+    def old():
+        for req, res in data:
+            json.loads(req.decode("utf-8"))
+            DjangoJsonResponse(res)
+
+    def new():
+        for req, res in data:
+            codec.loads(req)
+            codec.JsonResponse(res)
+
+    loops = max(1, args.number // len(data))
+    results = {}
+    for name, fn in (("stdlib+JsonResponse", old), (f"codec[{codec.BACKEND}]", new)):
+        best = min(timeit.repeat(fn, number=loops, repeat=args.repeat))
+        results[name] = best / (loops * len(data)) * 1e6
+    base = results["stdlib+JsonResponse"]
+    for name, us in results.items():
+        print(f"{name:<24} {us:8.2f} us/request  ({base / us:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+HTTP 부하 테스트 / 지연시간 벤치마크.
+
+로컬 SQLite(기본) 또는 로컬 Postgres(--database-url)로 앱을 띄우고
+/api/result, /api/track-click, /share/<code> 를 섞어서 호출한 뒤
+엔드포인트별 처리량 + p50/p95/p99 를 출력하고 JSON 으로 저장.
+
+    cd backend
+    python bench/load_test.py --concurrency 16 --duration 20
+    python bench/load_test.py --mix result=8,click=3,share=1 --server runserver
+    python bench/load_test.py --url http://127.0.0.1:8000   # 이미 떠 있는 서버
+    python bench/load_test.py --compare bench/results/이전결과.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+ENDPOINTS = ("result", "click", "share")
+BUTTON_KEYS = ("purchase", "share", "retry")
+
+
+# ---- 요청 생성 ----
+def random_answers(rng: random.Random):
+    # Q2(출생년도)는 드롭다운이라 0, 나머지는 1..4 (가끔 무응답 0)
+    arr = [rng.choice((1, 2, 3, 4, 4, 0)) if i != 1 else 0 for i in range(12)]
+    return arr
+
+
+def make_request(kind: str, rng: random.Random, diagnosis_ids):
+    if kind == "result":
+        body = {
+            "answers": random_answers(rng),
+            "birth_year": rng.randint(1960, 2010),
+            "lang": rng.choice(("ENG", "KOR")),
+        }
+        return "POST", "/api/result", json.dumps(body)
+    if kind == "click":
+        body = {
+            "button_key": rng.choice(BUTTON_KEYS),
+            "lang": rng.choice(("ENG", "KOR")),
+            "diagnosis_id": rng.choice(diagnosis_ids) if diagnosis_ids else None,
+        }
+        return "POST", "/api/track-click", json.dumps(body)
+    lang = rng.choice(("ENG", "KOR"))
+    return "GET", f"/share/{rng.randint(1, 8)}?lang={lang}", None
+
+
+def percentile(sorted_vals, p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+# ---- 서버 기동 ----
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/share/1")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def start_server(args, env):
+    port = _free_port()
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v0"],
+        cwd=BACKEND_DIR, env=env, check=True,
+    )
+    if args.server == "gunicorn":
+        cmd = [
+            sys.executable, "-m", "gunicorn", "acne_service.wsgi:application",
+            "-b", f"127.0.0.1:{port}", "-w", str(args.workers), "--threads", str(args.threads),
+            "--log-level", "warning",
+        ]
+    elif args.server == "uvicorn":
+        cmd = [
+            sys.executable, "-m", "gunicorn", "acne_service.asgi:application",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-b", f"127.0.0.1:{port}", "-w", str(args.workers), "--log-level", "warning",
+        ]
+    else:
+        cmd = [sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload"]
+    proc = subprocess.Popen(
+        cmd, cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready("127.0.0.1", port)
+    except Exception:
+        proc.kill()
+        raise
+    return proc, f"http://127.0.0.1:{port}"
+
+
+# ---- 부하 ----
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lat = {k: [] for k in ENDPOINTS}
+        self.errors = {k: 0 for k in ENDPOINTS}
+        self.diagnosis_ids = []
+
+    def add(self, kind, ms, ok, diagnosis_id=None):
+        with self.lock:
+            self.lat[kind].append(ms)
+            if not ok:
+                self.errors[kind] += 1
+            if diagnosis_id and len(self.diagnosis_ids) < 10000:
+                self.diagnosis_ids.append(diagnosis_id)
+
+
+def worker(base_url, kinds, weights, stop_at, max_requests, counter, stats, seed):
+    rng = random.Random(seed)
+    u = urllib.parse.urlsplit(base_url)
+    conn = http.client.HTTPConnection(u.hostname, u.port, timeout=30)
+    headers = {"Content-Type": "application/json", "User-Agent": "acne-loadtest/1.0"}
+    while time.monotonic() < stop_at:
+        with counter["lock"]:
+            if max_requests and counter["n"] >= max_requests:
+                break
+            counter["n"] += 1
+        kind = rng.choices(kinds, weights)[0]
+        method, path, body = make_request(kind, rng, stats.diagnosis_ids)
+        t0 = time.perf_counter()
+        ok, did = False, None
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+            ok = resp.status in (200, 304)
+            if ok and kind == "result":
+                did = json.loads(data).get("diagnosis_id")
+            if resp.getheader("Connection", "").lower() == "close" or resp.version == 10:
+                conn.close()
+        except (OSError, http.client.HTTPException, ValueError):
+            conn.close()
+        stats.add(kind, (time.perf_counter() - t0) * 1000.0, ok, did)
+    conn.close()
+
+
+def run_load(base_url, args):
+    mix = dict(item.split("=") for item in args.mix.split(","))
+    kinds = [k for k in ENDPOINTS if float(mix.get(k, 0)) > 0]
+    weights = [float(mix[k]) for k in kinds]
+    stats = Stats()
+    counter = {"n": 0, "lock": threading.Lock()}
+
+    # warmup
+    warm_stop = time.monotonic() + args.warmup
+    threads = [
+        threading.Thread(target=worker, args=(
+            base_url, kinds, weights, warm_stop, 0, {"n": 0, "lock": threading.Lock()}, Stats(), i))
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    t0 = time.monotonic()
+    stop_at = t0 + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(
+            base_url, kinds, weights, stop_at, args.requests, counter, stats, args.seed + i))
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+
+    report = {}
+    for k in kinds:
+        lat = sorted(stats.lat[k])
+        n = len(lat)
+        report[k] = {
+            "requests": n,
+            "errors": stats.errors[k],
+            "rps": round(n / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(lat) / n, 3) if n else 0.0,
+            "p50_ms": round(percentile(lat, 0.50), 3),
+            "p95_ms": round(percentile(lat, 0.95), 3),
+            "p99_ms": round(percentile(lat, 0.99), 3),
+            "max_ms": round(lat[-1], 3) if n else 0.0,
+        }
+    total = sum(r["requests"] for r in report.values())
+    return {"elapsed_s": round(elapsed, 3), "total_requests": total,
+            "total_rps": round(total / elapsed, 2) if elapsed else 0.0, "endpoints": report}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(result, baseline=None):
+    print(f"{'endpoint':<8} {'req':>7} {'err':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for k, r in result["endpoints"].items():
+        line = (f"{k:<8} {r['requests']:>7} {r['errors']:>5} {r['rps']:>9.1f} "
+                f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+        b = (baseline or {}).get("endpoints", {}).get(k)
+        if b and b.get("p99_ms"):
+            line += f"   p99 {((r['p99_ms'] / b['p99_ms']) - 1) * 100:+.1f}% / rps {((r['rps'] / b['rps']) - 1) * 100 if b['rps'] else 0:+.1f}%"
+        print(line)
+    print(f"total {result['total_requests']} req in {result['elapsed_s']}s = {result['total_rps']} req/s")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--url", help="이미 떠 있는 서버 주소 (없으면 직접 기동)")
+    p.add_argument("--server", choices=("gunicorn", "uvicorn", "runserver"), default="gunicorn")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--database-url", help="로컬 Postgres (예: postgres://u:p@127.0.0.1/bench). 없으면 임시 SQLite")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--duration", type=float, default=10.0, help="측정 시간(초)")
+    p.add_argument("--requests", type=int, default=0, help="총 요청 수 상한 (0=시간만)")
+    p.add_argument("--warmup", type=float, default=1.0)
+    p.add_argument("--mix", default="result=6,click=3,share=1")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/<시각>-<커밋>.json)")
+    p.add_argument("--compare", help="비교할 이전 결과 JSON")
+    p.add_argument("--label", default="")
+    args = p.parse_args(argv)
+
+    proc = None
+    tmpdir = None
+    base_url = args.url
+    if not base_url:
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SECRET_KEY", "bench")
+        env["DJANGO_ALLOWED_HOSTS"] = "127.0.0.1,localhost"
+        if args.database_url:
+            env["DATABASE_URL"] = args.database_url
+            env.setdefault("DATABASE_SSL_REQUIRE", "0")
+        else:
+            tmpdir = tempfile.TemporaryDirectory(prefix="acne-bench-")
+            env.pop("DATABASE_URL", None)
+            env["DJANGO_SQLITE_PATH"] = str(Path(tmpdir.name) / "bench.sqlite3")
+        proc, base_url = start_server(args, env)
+
+    try:
+        result = run_load(base_url, args)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    result["meta"] = {
+        "commit": _git_rev(),
+        "label": args.label,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "server": "external" if args.url else args.server,
+        "database": "external" if args.url else ("postgres" if args.database_url else "sqlite"),
+        "workers": args.workers,
+        "threads": args.threads,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "python": sys.version.split()[0],
+    }
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    print_report(result, baseline)
+
+    out = Path(args.out) if args.out else (
+        RESULTS_DIR / f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{result['meta']['commit']}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+quiz_logic 채점 경로 마이크로벤치마크 (호출당 ns + 메모리 할당).
+
+    cd backend
+    python bench/quiz_logic.py                          # 측정 + bench/results/quiz-logic-<시각>-<커밋>.json
+    python bench/quiz_logic.py --compare bench/results/이전.json --max-regression 15
+    python bench/quiz_logic.py --only compute_result,_pick --lut
+
+측정 대상 (모두 v1 내장 표, 같은 시드의 입력 1000개를 돌아가며):
+  compute_result             현재 요청 경로 (lookup 파일이 있으면 그 경로)
+  tables.score               ScoringTables.score (검증 제외)
+  lut.score                  scoring_lut 조회 (--lut 이면 임시 디렉터리에 빌드)
+  reference                  compute_result_reference (dict 해석 원본)
+  normalize_answers          입력 검증
+  _pick / tables._pick       A 타입 선택
+  _derive_pct_age            백분위/피부나이
+  batch.per_row              batch_scoring 1000행 한 번 ÷ 1000
+항목별: ns_per_call (repeat 중 최솟값), peak_bytes (호출 1번 동안 tracemalloc 최대 증가 = 임시 할당 포함),
+blocks_per_call (호출 1번이 남기는 메모리 블록 수, 반환값 포함. tracemalloc 스냅샷 차이 기준).
+--compare 로 이전 결과와 비교, --max-regression 넘으면 종료코드 1 (CI 용).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acne_service.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from diagnosis import equivalence, quiz_logic, scoring_lut  # noqa: E402
+
+N_INPUTS = 1000
+
+
+def inputs(seed: int):
+    rng = random.Random(seed)
+    this_year = datetime.date.today().year
+    return [
+        ([rng.randint(0, 4) for _ in range(12)], rng.choice((None, rng.randint(this_year - 70, this_year - 14))))
+        for _ in range(N_INPUTS)
+    ]
+
+
+def cycle_call(fn, items):
+    """items 를 돌아가며 fn 호출하는 인자 없는 함수 (timeit 용)"""
+    state = {"i": 0}
+    n = len(items)
+
+    def call():
+        i = state["i"]
+        state["i"] = i + 1 if i + 1 < n else 0
+        return fn(*items[i])
+    return call
+
+
+def targets(seed: int, lut_dir=None):
+    t = equivalence.builtin_tables()
+    data = inputs(seed)
+    arrs = [(quiz_logic.normalize_answers(a), by) for a, by in data]
+    raw_scores = [equivalence._raw_scores(a)[0] for a, _ in arrs]
+    list_scores = [[s[k] for k in quiz_logic.A_CATS] for s in raw_scores]
+    totals = [(t.score(a)["total_score"], by) for a, by in arrs]
+    th_a = tuple(quiz_logic.TH_A[k] for k in quiz_logic.A_CATS)
+    a_cats = tuple(quiz_logic.A_CATS)
+
+    out = {
+        "compute_result": (cycle_call(lambda a, by: quiz_logic.compute_result(a, by, tables=t), data), 1),
+        "tables.score": (cycle_call(t.score, arrs), 1),
+        "reference": (cycle_call(quiz_logic.compute_result_reference, data), 1),
+        "normalize_answers": (cycle_call(lambda a, by: quiz_logic.normalize_answers(a), data), 1),
+        "_pick": (cycle_call(
+            lambda s: quiz_logic._pick(s, quiz_logic.TH_A, quiz_logic.A_CATS), [(s,) for s in raw_scores]), 1),
+        "tables._pick": (cycle_call(lambda s: t._pick(s, th_a, a_cats), [(s,) for s in list_scores]), 1),
+        "_derive_pct_age": (cycle_call(quiz_logic._derive_pct_age, totals), 1),
+    }
+    if lut_dir:
+        path = Path(lut_dir) / scoring_lut.file_name(t)
+        if path.exists():
+            lut = scoring_lut.ScoringLut(str(path), t)
+            out["lut.score"] = (cycle_call(lut.score, arrs), 1)
+    try:
+        import numpy as np
+
+        from diagnosis import batch_scoring
+    except ImportError:
+        return out
+    compiled = batch_scoring.compile_tables(t)
+    mat = np.array([a for a, _ in arrs], dtype=np.int64)
+    years = [by for _, by in arrs]
+    out["batch.per_row"] = (
+        lambda: batch_scoring.to_dicts(batch_scoring.score_matrix(mat, years, compiled), compiled), N_INPUTS
+    )
+    return out
+
+
+def measure(call, per: int, number: int, repeat: int) -> dict:
+    call()  # 워밍업 (지연 초기화 제외)
+    best = min(timeit.repeat(call, number=number, repeat=repeat))
+    ns = best / number / per * 1e9
+
+    # 메모리: 호출 1번의 최대 증가량 + 호출마다 남는 블록 수
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        calls = max(1, 1000 // per)
+        before = tracemalloc.take_snapshot()
+        kept = [call() for _ in range(calls)]  # 결과를 잡아둬서 블록이 사라지지 않게
+        after = tracemalloc.take_snapshot()
+        blocks = sum(max(0, d.count_diff) for d in after.compare_to(before, "traceback"))
+        del kept
+    finally:
+        tracemalloc.stop()
+    return {
+        "ns_per_call": round(ns, 1),
+        "peak_bytes": max(0, peak - base) // per,
+        "blocks_per_call": round(blocks / calls / per, 2),
+    }
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(results, baseline=None, max_regression=None) -> bool:
+    """표 출력. max_regression(%) 보다 느려진 항목이 있으면 False"""
+    ok = True
+    print(f"{'benchmark':<20} {'ns/call':>10} {'peak B':>8} {'blocks':>7}")
+    for name, r in results.items():
+        line = f"{name:<20} {r['ns_per_call']:>10.1f} {r['peak_bytes']:>8} {r['blocks_per_call']:>7.2f}"
+        b = (baseline or {}).get(name)
+        if b and b.get("ns_per_call"):
+            change = (r["ns_per_call"] / b["ns_per_call"] - 1) * 100
+            line += f"   {change:+6.1f}% vs {b['ns_per_call']:.1f}"
+            if max_regression is not None and change > max_regression:
+                line += "  REGRESSION"
+                ok = False
+        print(line)
+    return ok
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--number", type=int, default=20000, help="repeat 1회당 호출 수")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--only", help="쉼표로 구분한 측정 대상만")
+    p.add_argument("--lut", action="store_true", help="lookup 파일을 임시로 빌드해서 lut.score 도 측정")
+    p.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/quiz-logic-<시각>-<커밋>.json)")
+    p.add_argument("--compare", help="비교할 이전 결과 JSON")
+    p.add_argument("--max-regression", type=float, help="ns/call 이 이 비율(%%) 넘게 늘면 종료코드 1")
+    args = p.parse_args(argv)
+
+    tmp = None
+    lut_dir = scoring_lut.lut_dir()
+    if args.lut:
+        tmp = tempfile.TemporaryDirectory(prefix="acne-lut-")
+        lut_dir = tmp.name
+        scoring_lut.build(equivalence.builtin_tables(), lut_dir)
+
+    try:
+        only = set(args.only.split(",")) if args.only else None
+        results = {}
+        for name, (call, per) in targets(args.seed, lut_dir).items():
+            if only and name not in only:
+                continue
+            number = max(1, args.number // per)
+            results[name] = measure(call, per, number, args.repeat)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")).get("benchmarks")
+    ok = print_report(results, baseline, args.max_regression)
+
+    result = {
+        "benchmarks": results,
+        "meta": {
+            "commit": _git_rev(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "number": args.number,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "tables": quiz_logic.TABLES_VERSION,
+            "python": sys.version.split()[0],
+        },
+    }
+    out = Path(args.out) if args.out else (
+        RESULTS_DIR / f"quiz-logic-{datetime.datetime.now():%Y%m%d-%H%M%S}-{result['meta']['commit']}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"saved {out}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
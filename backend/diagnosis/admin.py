@@ -0,0 +1,40 @@
+from django.contrib import admin
+
+from .db_routing import analytics_db
+from .models import ButtonClick, DiagnosisResult
+
+
+class ReplicaReadAdmin(admin.ModelAdmin):
+    """목록/상세 조회는 analytics_db() (replica). 수정/추가/삭제 없음 (조회 전용)"""
+
+    list_per_page = 50
+    show_full_result_count = False  # 큰 테이블에서 전체 COUNT(*) 생략
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).using(analytics_db())
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DiagnosisResult)
+class DiagnosisResultAdmin(ReplicaReadAdmin):
+    list_display = ("id", "created_at", "lang", "result_code", "a_type", "b_type",
+                    "skin_age", "skin_percentile", "total_score", "scoring_version")
+    list_filter = ("lang", "result_code", "scoring_version")
+    date_hierarchy = "created_at"
+    ordering = ("-created_at",)
+
+
+@admin.register(ButtonClick)
+class ButtonClickAdmin(ReplicaReadAdmin):
+    list_display = ("id", "created_at", "button_key", "lang", "diagnosis_id")
+    list_filter = ("button_key", "lang")
+    date_hierarchy = "created_at"
+    ordering = ("-created_at",)
@@ -0,0 +1,226 @@
+# diagnosis/archive.py
+"""
+오래된 DiagnosisResult / ButtonClick 을 월별 압축 NDJSON 으로 옮기고 읽는 API.
+
+파일: <DIAG_ARCHIVE_DIR>/<kind>-YYYY-MM-<생성시각>.ndjson.gz  (kind = diagnoses | clicks | rescores)
+- 컬럼은 모델의 concrete field 전부 (컬럼이 늘어도 그대로 보존, FK 는 <name>_id)
+- archive_month(): 한 달치를 파일로 쓰고(임시파일→rename) 원본에서 chunk 단위로 삭제
+  순서: clicks → rescores → diagnoses. 진단 삭제 시 SET_NULL/CASCADE 되는 행을 먼저 옮김
+  핫 테이블에 남은 (더 최근) 클릭이 가리키는 진단은 연결이 끊기지 않게 보류 → 그 클릭이 옮겨진 뒤 다음 실행에서
+- iter_diagnoses()/iter_clicks(): 핫 테이블 + 아카이브를 같은 dict 모양으로 함께 순회
+"""
+from __future__ import annotations
+
+import datetime
+import gzip
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
+from django.utils.dateparse import parse_datetime
+
+from .models import ButtonClick, DiagnosisRescore, DiagnosisResult
+
+
+def _fields(model) -> List[str]:
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+DIAG_FIELDS = _fields(DiagnosisResult)
+CLICK_FIELDS = _fields(ButtonClick)
+RESCORE_FIELDS = _fields(DiagnosisRescore)
+DATETIME_FIELDS = tuple(sorted({
+    f.attname
+    for model in (DiagnosisResult, ButtonClick, DiagnosisRescore)
+    for f in model._meta.concrete_fields if isinstance(f, models.DateTimeField)
+}))
+
+
+def _diagnoses(start, end, dry_run=False):
+    # 핫 테이블 클릭이 남아 있는 진단은 삭제하면 그 클릭의 diagnosis_id 가 NULL 이 됨 → 보류
+    hot = ButtonClick.objects.filter(diagnosis_id=OuterRef("pk"))
+    if dry_run:
+        # 실제 실행에서는 이 달 클릭이 먼저 옮겨진 뒤에 셈
+        hot = hot.exclude(created_at__gte=start, created_at__lt=end)
+    return DiagnosisResult.objects.filter(created_at__gte=start, created_at__lt=end).filter(~Exists(hot))
+
+
+def _clicks(start, end, dry_run=False):
+    return ButtonClick.objects.filter(created_at__gte=start, created_at__lt=end)
+
+
+def _rescores(start, end, dry_run=False):
+    # rescore 의 created_at 은 재채점 시각 → 옮길 진단 기준으로 고름 (진단 삭제 시 CASCADE 되므로 먼저)
+    return DiagnosisRescore.objects.filter(diagnosis__in=_diagnoses(start, end, dry_run).values("pk"))
+
+
+KINDS = {
+    "diagnoses": (DiagnosisResult, DIAG_FIELDS, _diagnoses),
+    "clicks": (ButtonClick, CLICK_FIELDS, _clicks),
+    "rescores": (DiagnosisRescore, RESCORE_FIELDS, _rescores),
+}
+ARCHIVE_ORDER = ("clicks", "rescores", "diagnoses")
+
+
+def archive_dir() -> Path:
+    return Path(getattr(settings, "DIAG_ARCHIVE_DIR", Path(settings.BASE_DIR) / "archive"))
+
+
+def month_start(dt: datetime.datetime) -> datetime.datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(dt: datetime.datetime) -> datetime.datetime:
+    return (dt.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def _encode(row: Dict) -> str:
+    out = {}
+    for k, v in row.items():
+        if isinstance(v, (datetime.datetime, datetime.date)):
+            v = v.isoformat()
+        elif isinstance(v, uuid.UUID):
+            v = str(v)
+        out[k] = v
+    return json.dumps(out, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(line: str) -> Dict:
+    row = json.loads(line)
+    for k in DATETIME_FIELDS:
+        if row.get(k):
+            row[k] = parse_datetime(row[k])
+    return row
+
+
+def _normalize_hot(row: Dict) -> Dict:
+    # 핫 테이블 행도 아카이브와 같은 모양으로 (UUID → str)
+    for k in ("id", "diagnosis_id"):
+        if isinstance(row.get(k), uuid.UUID):
+            row[k] = str(row[k])
+    return row
+
+
+def archive_month(kind: str, start: datetime.datetime, end: datetime.datetime,
+                  out_dir: Optional[Path] = None, chunk_size: int = 5000,
+                  dry_run: bool = False) -> int:
+    """[start, end) 행을 파일로 쓰고 원본에서 삭제. 옮긴 행 수 반환"""
+    model, fields, rows = KINDS[kind]
+    qs = rows(start, end, dry_run).order_by("created_at", "pk")
+    if dry_run:
+        return qs.count()
+
+    out_dir = out_dir or archive_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    final = out_dir / f"{kind}-{start:%Y-%m}-{stamp}.ndjson.gz"
+    tmp = final.with_name(final.name + ".tmp")
+
+    written = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        for row in qs.values(*fields).iterator(chunk_size=chunk_size):
+            f.write(_encode(row))
+            f.write("\n")
+            written += 1
+    if not written:
+        tmp.unlink()
+        return 0
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, final)
+
+    # 파일이 확정된 뒤에만 삭제. 과거 구간이라 새 행이 끼어들지 않음 → 구간 기준으로 chunk 삭제
+    # (id 목록을 메모리에 들고 있지 않음)
+    while True:
+        with transaction.atomic():
+            pks = list(qs.values_list("pk", flat=True)[:chunk_size])
+            if not pks:
+                break
+            model.objects.filter(pk__in=pks).delete()
+    return written
+
+
+def _files(kind: str, since=None, until=None, base: Optional[Path] = None) -> List[Path]:
+    base = base or archive_dir()
+    if not base.exists():
+        return []
+    out = []
+    for p in sorted(base.glob(f"{kind}-*.ndjson.gz")):
+        try:
+            month = datetime.datetime.strptime(p.name[len(kind) + 1:len(kind) + 8], "%Y-%m")
+        except ValueError:
+            continue
+        # 파일 이름의 월로 먼저 거름 (열어보지 않음)
+        if until is not None and month >= until:
+            continue
+        if since is not None and next_month(month) <= month_start(since):
+            continue
+        out.append(p)
+    return out
+
+
+def iter_archived(kind: str, since=None, until=None, base: Optional[Path] = None, **filters) -> Iterator[Dict]:
+    for p in _files(kind, since, until, base):
+        with gzip.open(p, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = _decode(line)
+                ts = row.get("created_at")
+                if since is not None and ts < since:
+                    continue
+                if until is not None and ts >= until:
+                    continue
+                if any(row.get(k) != v for k, v in filters.items()):
+                    continue
+                yield row
+
+
+def _iter_combined(kind: str, since, until, chunk_size: int, **filters) -> Iterator[Dict]:
+    model, fields, _ = KINDS[kind]
+    yield from iter_archived(kind, since, until, **filters)
+    qs = model.objects.all()
+    if since is not None:
+        qs = qs.filter(created_at__gte=since)
+    if until is not None:
+        qs = qs.filter(created_at__lt=until)
+    if filters:
+        qs = qs.filter(**filters)
+    for row in qs.order_by("created_at").values(*fields).iterator(chunk_size=chunk_size):
+        yield _normalize_hot(row)
+
+
+def iter_diagnoses(since=None, until=None, result_code=None, lang=None,
+                   chunk_size: int = 2000) -> Iterator[Dict]:
+    """아카이브(오래된 것) → 핫 테이블 순으로 DiagnosisResult 행을 dict 로"""
+    filters = {}
+    if result_code is not None:
+        filters["result_code"] = result_code
+    if lang is not None:
+        filters["lang"] = lang
+    return _iter_combined("diagnoses", since, until, chunk_size, **filters)
+
+
+def iter_clicks(since=None, until=None, button_key=None, lang=None,
+                chunk_size: int = 2000) -> Iterator[Dict]:
+    filters = {}
+    if button_key is not None:
+        filters["button_key"] = button_key
+    if lang is not None:
+        filters["lang"] = lang
+    return _iter_combined("clicks", since, until, chunk_size, **filters)
+
+
+def first_month(before: datetime.datetime) -> Optional[datetime.datetime]:
+    """before 이전에 옮길 행이 있는 가장 이른 달 (진단/클릭 각각의 최솟값 중 이른 것)"""
+    from django.db.models import Min
+
+    firsts = [
+        model.objects.filter(created_at__lt=before).aggregate(m=Min("created_at"))["m"]
+        for model in (DiagnosisResult, ButtonClick)
+    ]
+    firsts = [f for f in firsts if f is not None]
+    return month_start(min(firsts)) if firsts else None
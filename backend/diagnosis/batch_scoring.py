@@ -0,0 +1,221 @@
+# diagnosis/batch_scoring.py
+"""
+채점표(scoring_tables)를 NumPy 배열로 컴파일해서 N×12 답안 행렬을 한 번에 채점.
+
+결과는 quiz_logic.compute_result 와 1:1 동일해야 합니다.
+(채점표가 교체되면 get_tables() 가 알아서 다시 컴파일)
+"""
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import quiz_logic, scoring_tables
+
+N_Q = 12
+N_OPT = 5  # 보기 0..4 (0 = 무응답)
+
+
+@dataclass(frozen=True)
+class CompiledTables:
+    version: str
+    a_cats: Tuple[str, ...]
+    b_cats: Tuple[str, ...]
+    w_a: np.ndarray          # (12, 5, len(a_cats))
+    w_b: np.ndarray          # (12, 5, len(b_cats))
+    w_t: np.ndarray          # (12, 5) T 가점
+    th_a: np.ndarray         # (len(a_cats),)
+    th_b: np.ndarray         # (len(b_cats),)
+    code_map: np.ndarray     # (len(a_cats), len(b_cats)), 없으면 0
+    pct_delta: np.ndarray    # total_score -> 나이 조정율
+    pct_label_idx: np.ndarray  # total_score -> labels 인덱스
+    label_pct: np.ndarray    # labels 인덱스 -> percentile
+    labels: List[str]
+    default_label_idx: int
+    default_delta: float
+
+
+def compile_tables(scoring: Optional[scoring_tables.ScoringTables] = None) -> CompiledTables:
+    """ScoringTables(없으면 현재 표) → NumPy 배열"""
+    t = scoring or scoring_tables.get_tables()
+    n_a, n_b = len(t.a_cats), len(t.b_cats)
+
+    w_a = np.zeros((N_Q, N_OPT, n_a), dtype=np.int64)
+    w_b = np.zeros((N_Q, N_OPT, n_b), dtype=np.int64)
+    w_t = np.zeros((N_Q, N_OPT), dtype=np.int64)
+    for q, row in enumerate(t.cells):
+        for o, (a_add, b_add, t_add) in enumerate(row):
+            for i, v in a_add:
+                w_a[q, o, i] += v
+            for i, v in b_add:
+                w_b[q, o, i] += v
+            w_t[q, o] = t_add
+
+    code_map = np.zeros((n_a, n_b), dtype=np.int64)
+    for (a, b), code in t.result_map.items():
+        code_map[t.a_cats.index(a), t.b_cats.index(b)] = int(code or 0)
+
+    default_pct, default_label, default_delta = t.pct_default
+    labels: List[str] = [default_label]
+    label_pct = [default_pct]
+    pct_delta = np.empty(len(t.pct_by_total), dtype=np.float64)
+    pct_label_idx = np.empty(len(t.pct_by_total), dtype=np.int64)
+    for total, (pct, label, delta) in enumerate(t.pct_by_total):
+        if label not in labels:
+            labels.append(label)
+            label_pct.append(pct)
+        pct_delta[total] = delta
+        pct_label_idx[total] = labels.index(label)
+
+    return CompiledTables(
+        version=t.version,
+        a_cats=t.a_cats, b_cats=t.b_cats,
+        w_a=w_a, w_b=w_b, w_t=w_t,
+        th_a=np.array(t.th_a, dtype=np.int64), th_b=np.array(t.th_b, dtype=np.int64),
+        code_map=code_map,
+        pct_delta=pct_delta,
+        pct_label_idx=pct_label_idx,
+        label_pct=np.array(label_pct, dtype=np.int64),
+        labels=labels,
+        default_label_idx=0,
+        default_delta=default_delta,
+    )
+
+
+_TABLES: Optional[CompiledTables] = None
+_TABLES_SRC: Optional[scoring_tables.ScoringTables] = None
+
+
+def get_tables() -> CompiledTables:
+    """현재 채점표의 NumPy 버전. 채점표가 교체되면 다시 컴파일"""
+    global _TABLES, _TABLES_SRC
+    src = scoring_tables.get_tables()
+    if _TABLES is None or _TABLES_SRC is not src:
+        _TABLES, _TABLES_SRC = compile_tables(src), src
+    return _TABLES
+
+
+def _pick(scores: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """quiz_logic._pick 벡터판: 최고점, 동점이면 order 앞쪽. 후보 없으면 -1"""
+    ok = scores >= threshold
+    masked = np.where(ok, scores, -1)
+    idx = masked.argmax(axis=1)  # argmax 는 동점 시 첫 인덱스
+    return np.where(ok.any(axis=1), idx, -1)
+
+
+# 이 범위의 연도만 int64/float64 로 계산. 밖이면 (overflow/정밀도) 단건과 같은 scoring_tables.skin_age_for 로
+VECTOR_YEARS = (-10 ** 6, 10 ** 6)
+
+
+def _coerce_birth_year(birth_year) -> Optional[int]:
+    # scoring_tables.skin_age_for 와 같은 규칙 (빈 값/숫자 아님 → None, "0" 같은 문자열은 연도 0)
+    if not birth_year:
+        return None
+    try:
+        return int(birth_year)
+    except Exception:
+        return None
+
+
+def score_matrix(
+    answers: np.ndarray,
+    birth_years: Optional[Sequence] = None,
+    tables: Optional[CompiledTables] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    answers: (N, 12) 정수 행렬, 값 0..4 (quiz_logic.normalize_answers 통과한 값)
+    birth_years: 길이 N (None/숫자 아닌 값 허용. 결과는 compute_result 와 같음)
+    반환: 컬럼별 배열 (a_idx/b_idx/code 는 없으면 -1/-1/0, skin_age 없으면 -1)
+    """
+    t = tables or get_tables()
+    ans = np.asarray(answers, dtype=np.int64)
+    if ans.ndim != 2 or ans.shape[1] != N_Q:
+        raise ValueError("answers must be an (N, 12) matrix")
+    if ans.size and (ans.min() < 0 or ans.max() >= N_OPT):
+        raise ValueError("answers values must be 0..4")
+    n = ans.shape[0]
+    q = np.arange(N_Q)
+
+    score_a = t.w_a[q, ans].sum(axis=1)  # (N, |A|)
+    score_b = t.w_b[q, ans].sum(axis=1)  # (N, |B|)
+    total = score_a.sum(axis=1) + score_b.sum(axis=1) + t.w_t[q, ans].sum(axis=1)
+
+    a_idx = _pick(score_a, t.th_a)
+    b_idx = _pick(score_b, t.th_b)
+    both = (a_idx >= 0) & (b_idx >= 0)
+    code = np.where(both, t.code_map[np.maximum(a_idx, 0), np.maximum(b_idx, 0)], 0)
+
+    size = t.pct_delta.shape[0]
+    in_range = (total >= 0) & (total < size)
+    lut = np.clip(total, 0, size - 1)
+    delta = np.where(in_range, t.pct_delta[lut], t.default_delta)
+    label_idx = np.where(in_range, t.pct_label_idx[lut], t.default_label_idx)
+    percentile = t.label_pct[label_idx]
+
+    years = [None] * n if birth_years is None else [_coerce_birth_year(b) for b in birth_years]
+    if len(years) != n:
+        raise ValueError("birth_years length must match answers")
+    low, high = VECTOR_YEARS
+    vector = [y is not None and low <= y <= high for y in years]
+    has_age = np.array(vector, dtype=bool)
+    year_arr = np.array([y if ok else 0 for y, ok in zip(years, vector)], dtype=np.int64)
+    real_age = np.maximum(0, datetime.date.today().year - year_arr)
+    # np.round == python round (banker's rounding)
+    skin_age = np.where(has_age, np.round(real_age * (1.0 + delta)), -1).astype(np.int64)
+    rest = [i for i, (y, ok) in enumerate(zip(years, vector)) if y is not None and not ok]
+    if rest:
+        skin_age = skin_age.astype(object)  # int64 를 넘을 수 있음
+        for i in rest:
+            age = scoring_tables.skin_age_for(years[i], float(delta[i]))
+            skin_age[i] = -1 if age is None else age
+
+    return {
+        "score_a": score_a,
+        "score_b": score_b,
+        "total_score": total,
+        "a_idx": a_idx,
+        "b_idx": b_idx,
+        "code": code,
+        "percentile": percentile,
+        "label_idx": label_idx,
+        "skin_age": skin_age,
+    }
+
+
+def to_dicts(cols: Dict[str, np.ndarray], tables: Optional[CompiledTables] = None) -> List[Dict]:
+    """score_matrix 결과 → compute_result 와 같은 모양의 dict 리스트"""
+    t = tables or get_tables()
+    a_cats, b_cats = t.a_cats, t.b_cats
+    score_a = cols["score_a"].tolist()
+    score_b = cols["score_b"].tolist()
+    out = []
+    for i, (a, b, code, total, pct, li, age) in enumerate(zip(
+        cols["a_idx"].tolist(), cols["b_idx"].tolist(), cols["code"].tolist(),
+        cols["total_score"].tolist(), cols["percentile"].tolist(),
+        cols["label_idx"].tolist(), cols["skin_age"].tolist(),
+    )):
+        out.append({
+            "a_type": a_cats[a] if a >= 0 else None,
+            "b_type": b_cats[b] if b >= 0 else None,
+            "code": code or None,
+            "scores": {
+                "A": dict(zip(a_cats, score_a[i])),
+                "B": dict(zip(b_cats, score_b[i])),
+            },
+            "total_score": total,
+            "percentile": pct,
+            "percentile_label": t.labels[li],
+            "skin_age": age if age >= 0 else None,
+        })
+    return out
+
+
+def compute_results(answers_list: List[List[int]], birth_years: Optional[Sequence] = None) -> List[Dict]:
+    """compute_result 의 배치판 (검증 포함)."""
+    arr = [quiz_logic.normalize_answers(a) for a in answers_list]
+    mat = np.array(arr, dtype=np.int64).reshape(len(arr), N_Q)
+    t = get_tables()
+    return to_dicts(score_matrix(mat, birth_years, t), t)
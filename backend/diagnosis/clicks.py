@@ -0,0 +1,155 @@
+# diagnosis/clicks.py
+"""
+버튼 클릭 저장 (단건/배치 공용).
+
+diagnosis_id 는 조회 없이 FK 컬럼에 바로 넣고 bulk_create 한 번으로 저장.
+없는 id 가 섞여 FK 제약에 걸리면 그때만 id__in 한 번으로 걸러서 재시도.
+write-behind 가 켜져 있으면 없는 id 는 아직 flush 안 된 진단일 수 있으므로
+비워서 저장한 뒤 진단이 저장되면 연결 (write_behind.defer_click_links)
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+import traceback
+import uuid
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import metrics, rollups, write_behind
+from .models import ButtonClick, DiagnosisResult
+
+logger = logging.getLogger(__name__)
+
+
+def _log_failure(e) -> None:
+    metrics.db_failure("click")
+    logger.error(f"Failed to persist clicks: {e}")
+    logger.error(traceback.format_exc())
+
+
+def _parse_uuid(value) -> Optional[uuid.UUID]:
+    if not value:
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _fit_tz(dt: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """USE_TZ 설정에 맞게 aware/naive 정리 (SQLite 는 USE_TZ=False 에서 aware 거부)"""
+    if dt is None:
+        return None
+    if settings.USE_TZ:
+        return dt if timezone.is_aware(dt) else timezone.make_aware(dt)
+    return timezone.make_naive(dt) if timezone.is_aware(dt) else dt
+
+
+def parse_client_ts(value) -> Optional[datetime.datetime]:
+    """ISO 문자열 또는 epoch ms (JS Date.now()). 클릭 client_ts / 결과 client_started_at 등 공용"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return _fit_tz(datetime.datetime.fromtimestamp(value / 1000.0, tz=datetime.timezone.utc))
+        except (OverflowError, OSError, ValueError):
+            return None
+    try:
+        return _fit_tz(parse_datetime(str(value)))
+    except ValueError:
+        return None
+
+
+def build_click(event, default_lang: str = "ENG") -> ButtonClick:
+    """event dict → 저장 전 ButtonClick. button_key 없으면 ValueError"""
+    if not isinstance(event, dict):
+        raise ValueError("event must be an object")
+    button_key = (event.get("button_key") or "").strip()
+    if not button_key:
+        raise ValueError("button_key is required")
+    return ButtonClick(
+        diagnosis_id=_parse_uuid(event.get("diagnosis_id")),
+        button_key=button_key[:32],
+        lang=(event.get("lang") or default_lang).upper()[:8],
+        client_ts=parse_client_ts(event.get("client_ts")),
+    )
+
+
+def _unlink_unknown(clicks: List[ButtonClick], known: set) -> List[Tuple[uuid.UUID, uuid.UUID]]:
+    """DB 에 없는 diagnosis_id 를 비움. 반환: 나중에 연결할 (click id, diagnosis id)"""
+    deferred = []
+    for c in clicks:
+        if c.diagnosis_id and c.diagnosis_id not in known:
+            deferred.append((c.pk, c.diagnosis_id))
+            c.diagnosis_id = None
+    return deferred
+
+
+def _defer(deferred) -> None:
+    # write-behind 가 꺼져 있으면 없는 id 는 정말 없는 진단
+    if deferred and write_behind.enabled():
+        write_behind.get_queue().defer_click_links(deferred)
+
+
+def save_clicks(clicks: List[ButtonClick]) -> int:
+    """bulk_create 1회. 저장한 건수 반환 (실패 시 0, 로그만 남김)"""
+    if not clicks:
+        return 0
+    try:
+        ButtonClick.objects.bulk_create(clicks)
+        rollups.record_clicks(clicks)
+        return len(clicks)
+    except IntegrityError:
+        pass
+    except Exception as e:
+        _log_failure(e)
+        return 0
+
+    # 없는 diagnosis_id 가 섞인 경우: 한 번에 검증 후 끊고 재시도
+    try:
+        ids = {c.diagnosis_id for c in clicks if c.diagnosis_id}
+        # 방금 저장된 진단일 수 있으므로 replica 가 아니라 primary 에서 확인
+        known = set(DiagnosisResult.objects.using("default").filter(id__in=ids).values_list("id", flat=True))
+        deferred = _unlink_unknown(clicks, known)
+        ButtonClick.objects.bulk_create(clicks)
+        rollups.record_clicks(clicks)
+        _defer(deferred)
+        return len(clicks)
+    except Exception as e:
+        _log_failure(e)
+        return 0
+
+
+async def asave_clicks(clicks: List[ButtonClick]) -> int:
+    """save_clicks 의 async ORM 버전 (ASGI 뷰용)"""
+    if not clicks:
+        return 0
+    try:
+        await ButtonClick.objects.abulk_create(clicks)
+        rollups.record_clicks(clicks)
+        return len(clicks)
+    except IntegrityError:
+        pass
+    except Exception as e:
+        _log_failure(e)
+        return 0
+
+    try:
+        ids = {c.diagnosis_id for c in clicks if c.diagnosis_id}
+        known = {
+            pk async for pk in DiagnosisResult.objects.using("default").filter(id__in=ids)
+            .values_list("id", flat=True)
+        }
+        deferred = _unlink_unknown(clicks, known)
+        await ButtonClick.objects.abulk_create(clicks)
+        rollups.record_clicks(clicks)
+        _defer(deferred)
+        return len(clicks)
+    except Exception as e:
+        _log_failure(e)
+        return 0
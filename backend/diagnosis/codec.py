@@ -0,0 +1,89 @@
+# diagnosis/codec.py
+"""
+JSON 코덱 레이어 (뷰 공용).
+
+- orjson 이 설치돼 있으면 사용, 없으면 stdlib json (DIAG_JSON_CODEC=stdlib 로 강제 가능)
+- loads 는 bytes 를 바로 받음 (request.body.decode() 불필요)
+- 두 구현의 출력 바이트가 같도록 맞춤: compact 구분자, UTF-8 그대로(ensure_ascii=False),
+  datetime/Decimal 등은 DjangoJSONEncoder 규칙
+- 서로 다르게 나오는 값은 stdlib 쪽으로 통일
+  · 지수 표기 float (1e16 ↔ 1e+16, 1e-7 ↔ 1e-07, 0.00001 ↔ 1e-05): 그런 숫자가 보이면 stdlib 로 다시 인코딩
+  · 64비트 넘는 정수: orjson 은 TypeError → stdlib 로
+  · NaN/Infinity: 둘 다 ValueError (orjson 은 null 로 바꿔 버리므로 null 이 있을 때만 값을 훑어 확인)
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
+_django_default = DjangoJSONEncoder().default
+
+
+def _use_orjson() -> bool:
+    # settings 보다 먼저 import 될 수 있어 환경변수로 판단
+    return orjson is not None and os.getenv("DIAG_JSON_CODEC", "auto").lower() != "stdlib"
+
+
+BACKEND = "orjson" if _use_orjson() else "stdlib"
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+# 지수 표기, 또는 stdlib 이면 지수로 쓰는 1e-4 미만 소수 (orjson: 0.00001 ↔ stdlib: 1e-05).
+# 문자열 안에서 걸려도 stdlib 로 갈 뿐
+_FLOAT_DIFF = re.compile(rb"[0-9][eE][-+]?[0-9]|0\.0000")
+
+
+def _has_nonfinite(obj) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_nonfinite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_nonfinite(v) for v in obj)
+    return False
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return _encoder.encode(obj).encode("utf-8")
+
+
+def _orjson_dumps(obj) -> bytes:
+    try:
+        out = orjson.dumps(obj, default=_django_default, option=_OPTS)
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(obj)  # 64비트 넘는 정수 등. 정말 못 쓰는 값이면 stdlib 도 같은 TypeError
+    if _FLOAT_DIFF.search(out) or (b"null" in out and _has_nonfinite(obj)):
+        return _stdlib_dumps(obj)
+    return out
+
+
+if orjson is not None:
+    _OPTS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+if BACKEND == "orjson":
+    def loads(data):
+        return orjson.loads(data)
+
+    dumps = _orjson_dumps
+else:
+    def loads(data):
+        return json.loads(data)
+
+    dumps = _stdlib_dumps
+
+
+class JsonResponse(HttpResponse):
+    """django.http.JsonResponse 대체 (dict 외 값도 허용)"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,47 @@
+# diagnosis/db_routing.py
+"""
+읽기 전용 replica 라우팅 (opt-in: DATABASE_REPLICA_URL → DATABASES["replica"]).
+
+- 쓰기와 일반 읽기는 항상 primary(default). track-click 의 diagnosis 존재 확인,
+  idempotency 조회처럼 방금 쓴 행을 다시 읽는 경우가 replica 지연에 걸리지 않도록
+  라우터가 replica 를 고르는 일은 없음
+- 분석용 읽기(통계 API, export, admin 목록)만 analytics_db() 로 명시적으로 .using()
+- replica 가 설정되지 않았으면 analytics_db() == "default" (동작 변화 없음)
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = "replica"
+
+
+def analytics_db() -> str:
+    """분석용 읽기에 쓸 DB alias"""
+    return REPLICA if REPLICA in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+class PrimaryReplicaRouter:
+    """settings.DATABASE_ROUTERS 용"""
+
+    def db_for_read(self, model, **hints):
+        # replica 에서 읽은 인스턴스의 관계 조회(FK 따라가기 등)는 그 인스턴스의 DB 그대로
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 같은 데이터 (replica 는 primary 복제본)
+        dbs = {DEFAULT_DB_ALIAS, REPLICA}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 운영 replica 는 복제로 스키마를 받음. 로컬 SQLite 두 개로 시험할 때는
+        # `migrate --database replica` 로 스키마만 만들 수 있게 막지 않음
+        return None
@@ -0,0 +1,376 @@
+# diagnosis/equivalence.py
+"""
+채점 구현 동등성 검사 (quiz_logic.compute_result_reference 기준).
+
+1) golden corpus: golden_data/quiz_logic_v1.jsonl
+   - 한 줄 = {"id", "tags", "answers", "age" / "age_str" / "birth_year" 중 하나, "expect"}
+   - age 는 올해 기준 나이 → 실행 시 birth_year = 올해 - age (skin_age 가 날짜와 무관하게 재현됨)
+     age_str 은 같은 값을 문자열로, birth_year 는 그대로 (None/0/"abc" 등)
+   - expect = reference 결과 dict, 또는 {"error": "ValueError"} (잘못된 입력)
+   - _pick 동점, 임계값 미달(None 타입), 범위 밖 값/길이, 이상한 birth_year, 모든 결과코드/백분위 구간 포함
+     (v1 표에서 총점 최대 17, stress 최대 3 → "상위 5%" 구간과 B 동점은 나올 수 없음)
+2) 무작위(시드 고정) 입력: 유효/경계/잘못된 값 섞어서 reference 와 결과(또는 예외 종류) 비교
+   + 성질 검사: code 는 a/b 타입이 모두 있을 때만, 가점 없는 문항(Q1/Q2/Q9) 값은 결과와 무관
+   실패하면 답안을 0 으로 줄여 가며 최소 사례로 축소해서 보고
+
+새 채점 구현(최적화 등)은 implementations() 에 추가하고 `manage.py check_scoring_equivalence` 통과 필요.
+golden 은 v1 내장 표 기준 (DIAG_SCORING_TABLES 설정과 무관하게 builtin 표로 비교).
+"""
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import quiz_logic, scoring_lut, scoring_tables
+
+GOLDEN_PATH = Path(__file__).resolve().parent / "golden_data" / "quiz_logic_v1.jsonl"
+
+Impl = Callable[[list, object], Dict]
+
+
+# ---- 구현 목록 ----
+def builtin_tables() -> scoring_tables.ScoringTables:
+    return scoring_tables.compile_tables(scoring_tables.builtin_raw())
+
+
+def _tables_impl(t: scoring_tables.ScoringTables) -> Impl:
+    def run(answers, birth_year=None):
+        return t.score(quiz_logic.normalize_answers(answers), birth_year)
+    return run
+
+
+def _compute_result_impl(t: scoring_tables.ScoringTables) -> Impl:
+    def run(answers, birth_year=None):
+        return quiz_logic.compute_result(answers, birth_year, tables=t)
+    return run
+
+
+def _lut_impl(lut: scoring_lut.ScoringLut) -> Impl:
+    def run(answers, birth_year=None):
+        return lut.score(quiz_logic.normalize_answers(answers), birth_year)
+    return run
+
+
+def _batch_impl(t: scoring_tables.ScoringTables) -> Impl:
+    import numpy as np
+
+    from . import batch_scoring
+
+    compiled = batch_scoring.compile_tables(t)
+
+    def run(answers, birth_year=None):
+        arr = quiz_logic.normalize_answers(answers)
+        cols = batch_scoring.score_matrix(np.array([arr], dtype=np.int64), [birth_year], compiled)
+        return batch_scoring.to_dicts(cols, compiled)[0]
+    return run
+
+
+def implementations(lut_dir: Optional[str] = None) -> Dict[str, Impl]:
+    """이름 → (answers, birth_year) 채점 함수. reference 가 기준"""
+    t = builtin_tables()
+    impls: Dict[str, Impl] = {
+        "reference": quiz_logic.compute_result_reference,
+        "tables": _tables_impl(t),
+        "compute_result": _compute_result_impl(t),
+        "batch": _batch_impl(t),
+    }
+    base = lut_dir or scoring_lut.lut_dir()
+    if base:
+        path = Path(base) / scoring_lut.file_name(t)
+        if path.exists():
+            impls["lut"] = _lut_impl(scoring_lut.ScoringLut(str(path), t))
+    return impls
+
+
+# ---- 결과 비교 ----
+def outcome(fn: Impl, answers, birth_year) -> Dict:
+    """결과 dict, 또는 예외면 {"error": 예외 클래스 이름}"""
+    try:
+        return fn(answers, birth_year)
+    except Exception as e:
+        return {"error": type(e).__name__}
+
+
+def _resolve_birth_year(case: Dict):
+    this_year = datetime.date.today().year
+    if "age" in case:
+        return this_year - case["age"]
+    if "age_str" in case:
+        return str(this_year - case["age_str"])
+    return case.get("birth_year")
+
+
+@dataclass
+class Failure:
+    source: str  # "golden:<id>" / "random" / "property:<이름>"
+    answers: object
+    birth_year: object
+    expected: object
+    got: object
+
+
+@dataclass
+class Report:
+    impl: str
+    golden: int = 0
+    random: int = 0
+    failures: List[Failure] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+# ---- golden corpus ----
+def load_golden(path: Optional[Path] = None) -> List[Dict]:
+    with open(path or GOLDEN_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_golden(fn: Impl, cases: Iterable[Dict], report: Report, max_failures: int = 20) -> None:
+    for case in cases:
+        report.golden += 1
+        birth_year = _resolve_birth_year(case)
+        got = outcome(fn, case["answers"], birth_year)
+        if got != case["expect"] and len(report.failures) < max_failures:
+            report.failures.append(Failure(f"golden:{case['id']}", case["answers"], birth_year, case["expect"], got))
+
+
+def _raw_scores(arr: List[int]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    sa = {k: 0 for k in quiz_logic.A_CATS}
+    sb = {k: 0 for k in quiz_logic.B_CATS}
+    for qi, ans in enumerate(arr, start=1):
+        cell = quiz_logic.WEIGHTS.get(qi, {}).get(ans, {})
+        quiz_logic._acc(sa, cell.get("A", {}))
+        quiz_logic._acc(sb, cell.get("B", {}))
+    return sa, sb
+
+
+def _tie(scores: Dict[str, int], th: Dict[str, int]) -> bool:
+    cand = [v for k, v in scores.items() if v >= th[k]]
+    return len(cand) > 1 and cand.count(max(cand)) > 1
+
+
+def tags_for(arr: List[int], res: Dict) -> List[str]:
+    sa, sb = _raw_scores(arr)
+    tags = [f"code:{res['code']}", f"pct:{res['percentile_label']}"]
+    if _tie(sa, quiz_logic.TH_A):
+        tags.append("tie_a")
+    if _tie(sb, quiz_logic.TH_B):
+        tags.append("tie_b")
+    if res["a_type"] is None:
+        tags.append("a_none")
+    if res["b_type"] is None:
+        tags.append("b_none")
+    lows = [low for (low, _), _, _ in quiz_logic.PCT_AGE_TABLE]
+    if res["total_score"] < min(lows):
+        tags.append("pct_default")
+    return tags
+
+
+def _invalid_cases() -> Iterator[Tuple[str, object, object]]:
+    ok = [1, 0, 2, 3, 4, 1, 2, 3, 1, 2, 4, 3]
+    yield "len_11", ok[:11], 1990
+    yield "len_13", ok + [1], 1990
+    yield "empty", [], 1990
+    yield "not_list_str", "101234123123", 1990
+    yield "not_list_none", None, 1990
+    yield "value_5", ok[:3] + [5] + ok[4:], 1990
+    yield "value_neg", ok[:3] + [-1] + ok[4:], 1990
+    yield "value_str_nan", ok[:3] + ["x"] + ok[4:], 1990
+    yield "value_big", ok[:3] + [10 ** 6] + ok[4:], 1990
+
+
+def _coercion_cases() -> Iterator[Tuple[str, list]]:
+    # 유효하지만 정수가 아닌 입력 (int(x or 0) 변환)
+    yield "value_none", [None, 0, 1, 1, 2, 2, 1, 2, 0, 1, 1, 1]
+    yield "value_str", ["1", "0", "3", "1", "1", "3", "1", "2", "4", "1", "1", "1"]
+    yield "value_float", [1.0, 0, 2.9, 1.2, 1, 3, 1.99, 2, 4, 1, 1, 1]
+    yield "value_bool", [True, False, True, True, True, True, True, True, True, True, True, True]
+    yield "all_zero", [0] * 12
+    yield "all_four", [4] * 12
+
+
+def _birth_year_cases() -> Iterator[Tuple[str, Dict]]:
+    yield "by_none", {"birth_year": None}
+    yield "by_zero", {"birth_year": 0}
+    yield "by_empty", {"birth_year": ""}
+    yield "by_str_nan", {"birth_year": "abc"}
+    yield "by_float_str", {"birth_year": "1990.5"}
+    yield "by_str_year", {"age_str": 30}
+    yield "by_future", {"age": -5}
+    yield "by_this_year", {"age": 0}
+    yield "by_old", {"age": 95}
+    # 연도 0 이하/10000 이상 (배치는 int64 밖이면 단건 경로). 올해에 따라 결과가 바뀌는 리터럴
+    # ("0", -1 등) 은 random_case 쪽에서 매번 reference 와 비교
+    yield "by_negative", {"age": 3000}
+    yield "by_negative_str", {"age_str": 3000}
+    yield "by_10000", {"birth_year": 10000}
+    yield "by_10000_str", {"birth_year": "10000"}
+    yield "by_int64_overflow", {"birth_year": 10 ** 20}
+    yield "by_int64_overflow_neg", {"birth_year": -10 ** 30}
+
+
+def build_golden(seed: int = 20261018, per_tag: int = 3) -> List[Dict]:
+    """reference 로 golden corpus 생성 (결과 구간/동점/None 타입별로 최대 per_tag 개씩 고름)"""
+    ref = quiz_logic.compute_result_reference
+    rng = random.Random(seed)
+    cases: List[Dict] = []
+
+    def add(case_id, tags, answers, by_spec):
+        case = {"id": case_id, "tags": tags, "answers": answers, **by_spec}
+        case["expect"] = outcome(ref, answers, _resolve_birth_year(case))
+        cases.append(case)
+
+    # 답안 공간 표본에서 태그별로 고르기 (가점 있는 문항만 의미 있음, 나머지는 무작위)
+    seen: Dict[str, int] = {}
+    by_label: Dict[str, list] = {}
+    for _ in range(200000):
+        arr = [rng.randint(0, 4) for _ in range(12)]
+        res = ref(arr)
+        by_label.setdefault(res["percentile_label"], arr)
+        tags = tags_for(arr, res)
+        if all(seen.get(t, 0) >= per_tag for t in tags):
+            continue
+        for t in tags:
+            seen[t] = seen.get(t, 0) + 1
+        add(f"sample-{len(cases):03d}", tags, arr, {"age": rng.randint(14, 70)})
+
+    for name, answers in _coercion_cases():
+        add(name, ["coerce"], answers, {"age": 33})
+    for name, answers, by in _invalid_cases():
+        add(name, ["invalid"], answers, {"birth_year": by})
+    base = [1, 0, 1, 1, 1, 1, 1, 2, 0, 2, 1, 3]
+    for name, spec in _birth_year_cases():
+        add(name, ["birth_year"], base, spec)
+    # 반올림 경계: 나이 × (1 + delta) 가 x.5 인 경우 (round 는 banker's rounding)
+    deltas = {label: d for _, label, d in quiz_logic.PCT_AGE_TABLE}
+    for label, arr in sorted(by_label.items()):
+        d = deltas.get(label)
+        if d is None:
+            continue
+        halves = [age for age in range(1, 100) if abs((age * (1.0 + d)) % 1 - 0.5) < 1e-9]
+        for age in halves[:2]:
+            add(f"round_half-{d:+.2f}-{age}", ["rounding", f"pct:{label}"], arr, {"age": age})
+    return cases
+
+
+def write_golden(cases: List[Dict], path: Optional[Path] = None) -> Path:
+    path = Path(path or GOLDEN_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for case in cases:
+            f.write(json.dumps(case, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return path
+
+
+# ---- 무작위 입력 + 성질 검사 ----
+def random_case(rng: random.Random) -> Tuple[object, object]:
+    r = rng.random()
+    if r < 0.6:
+        answers = [rng.randint(0, 4) for _ in range(12)]
+    elif r < 0.8:
+        # 한 카테고리 쪽으로 몰린 답안 (임계값/동점 근처)
+        pick = rng.randint(1, 4)
+        answers = [pick if rng.random() < 0.7 else rng.randint(0, 4) for _ in range(12)]
+    elif r < 0.9:
+        answers = [rng.choice((None, "2", 3.7, True, 0, 4)) for _ in range(12)]
+    else:
+        answers = [rng.randint(-2, 6) for _ in range(rng.choice((11, 12, 12, 13)))]
+    this_year = datetime.date.today().year
+    birth_year = rng.choice((
+        None, 0, "", "abc", this_year + 3,
+        rng.randint(this_year - 90, this_year), str(rng.randint(1950, 2015)),
+        "0", -1, 10000, 10 ** 20, -10 ** 20,
+    ))
+    return answers, birth_year
+
+
+def _shrink(fn: Impl, ref: Impl, answers, birth_year):
+    """실패를 유지하는 한 답안을 하나씩 0 으로"""
+    if not isinstance(answers, list):
+        return answers
+    cur = list(answers)
+    for i in range(len(cur)):
+        if cur[i] == 0:
+            continue
+        trial = cur[:i] + [0] + cur[i + 1:]
+        if outcome(fn, trial, birth_year) != outcome(ref, trial, birth_year):
+            cur = trial
+    return cur
+
+
+def check_properties(res: Dict, answers, birth_year, fn: Impl, irrelevant: List[int]) -> Optional[str]:
+    if "error" in res:
+        return None
+    if (res["code"] is not None) != (res["a_type"] is not None and res["b_type"] is not None):
+        return "code_requires_both_types"
+    if res["a_type"] is not None and res["a_type"] not in quiz_logic.A_CATS:
+        return "a_type_known"
+    # 가점 없는 문항을 바꿔도 결과 동일
+    arr = quiz_logic.normalize_answers(answers)
+    for q in irrelevant:
+        other = arr[:q] + [(arr[q] + 1) % 5] + arr[q + 1:]
+        if fn(other, birth_year) != res:
+            return f"irrelevant_q{q + 1}"
+    return None
+
+
+def check_random(fn: Impl, n: int, seed: int, report: Report, max_failures: int = 20) -> None:
+    ref = quiz_logic.compute_result_reference
+    rng = random.Random(seed)
+    t = builtin_tables()
+    relevant = set(scoring_lut.relevant_questions(t))
+    irrelevant = [q for q in range(scoring_tables.N_Q) if q not in relevant]
+    for _ in range(n):
+        answers, birth_year = random_case(rng)
+        report.random += 1
+        expected = outcome(ref, answers, birth_year)
+        got = outcome(fn, answers, birth_year)
+        if got != expected:
+            if len(report.failures) < max_failures:
+                small = _shrink(fn, ref, answers, birth_year)
+                report.failures.append(Failure(
+                    "random", small, birth_year, outcome(ref, small, birth_year), outcome(fn, small, birth_year)
+                ))
+            continue
+        prop = check_properties(got, answers, birth_year, fn, irrelevant)
+        if prop and len(report.failures) < max_failures:
+            report.failures.append(Failure(f"property:{prop}", answers, birth_year, expected, got))
+
+
+def run(names: Optional[List[str]] = None, n_random: int = 10000, seed: int = 1234,
+        golden_path: Optional[Path] = None, lut_dir: Optional[str] = None,
+        exhaustive: bool = False) -> List[Report]:
+    impls = implementations(lut_dir)
+    cases = load_golden(golden_path)
+    reports = []
+    for name in names or list(impls):
+        if name not in impls:
+            raise ValueError(f"unknown or unavailable implementation: {name}")
+        report = Report(name)
+        check_golden(impls[name], cases, report)
+        check_random(impls[name], n_random, seed, report)
+        if exhaustive and name != "reference":
+            check_exhaustive(impls[name], report, birth_year=datetime.date.today().year - 30)
+        reports.append(report)
+    return reports
+
+
+def check_exhaustive(fn: Impl, report: Report, birth_year=None, max_failures: int = 20) -> None:
+    """가점 있는 문항의 모든 조합 (v1: 5^9) 을 reference 와 비교. 나머지 문항은 0"""
+    ref = quiz_logic.compute_result_reference
+    relevant = scoring_lut.relevant_questions(builtin_tables())
+    arr = [0] * scoring_tables.N_Q
+    for combo in itertools.product(range(scoring_lut.N_OPT), repeat=len(relevant)):
+        for q, v in zip(relevant, combo):
+            arr[q] = v
+        report.random += 1
+        expected, got = ref(arr, birth_year), fn(arr, birth_year)
+        if got != expected and len(report.failures) < max_failures:
+            report.failures.append(Failure("exhaustive", list(arr), birth_year, expected, got))
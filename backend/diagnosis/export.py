@@ -0,0 +1,108 @@
+# diagnosis/export.py
+"""
+DiagnosisResult / ButtonClick 스트리밍 내보내기 (CSV / NDJSON).
+
+values_list().iterator(chunk_size) 로 읽고 행 단위로 바로 직렬화 → 행 수와 무관하게 메모리 일정.
+답안은 비정규화 컬럼 q1..q12 를 그대로 읽음 (answers JSON 파싱 없음).
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import json
+import uuid
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from .db_routing import analytics_db
+from .models import ButtonClick, DiagnosisResult
+
+N_Q = 12
+
+DIAG_COLUMNS = [
+    "id", "created_at", "client_started_at", "client_submitted_at", "lang",
+    "birth_year", "result_code", "a_type", "b_type", "skin_age", "skin_percentile",
+    "score_a", "score_b", "total_score",
+] + [f"q{i}" for i in range(1, N_Q + 1)]
+CLICK_COLUMNS = ["id", "created_at", "diagnosis_id", "button_key", "lang", "client_ts"]
+
+KINDS = ("diagnoses", "clicks")
+FORMATS = ("csv", "ndjson")
+
+
+def header(kind: str) -> List[str]:
+    return list(DIAG_COLUMNS if kind == "diagnoses" else CLICK_COLUMNS)
+
+
+def iter_rows(kind: str, since: Optional[datetime.datetime] = None,
+              until: Optional[datetime.datetime] = None,
+              result_code: Optional[int] = None, lang: Optional[str] = None,
+              chunk_size: int = 2000, using: Optional[str] = None) -> Iterator[tuple]:
+    """header(kind) 순서의 튜플을 created_at 순으로 (기본: replica 가 있으면 replica)"""
+    using = using or analytics_db()
+    if kind == "diagnoses":
+        qs = DiagnosisResult.objects.using(using).all()
+        if result_code is not None:
+            qs = qs.filter(result_code=result_code)
+        columns = DIAG_COLUMNS
+    elif kind == "clicks":
+        qs = ButtonClick.objects.using(using).all()
+        columns = CLICK_COLUMNS
+    else:
+        raise ValueError(f"unknown kind: {kind}")
+    if since is not None:
+        qs = qs.filter(created_at__gte=since)
+    if until is not None:
+        qs = qs.filter(created_at__lt=until)
+    if lang:
+        qs = qs.filter(lang=lang.upper())
+
+    yield from qs.order_by("created_at").values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def _cell(v):
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    return v
+
+
+class _Echo:
+    """csv.writer 용 가짜 버퍼: write() 가 받은 문자열을 그대로 돌려줌"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns: Sequence[str], rows: Iterable[tuple], batch: int = 500) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    buf = []
+    for row in rows:
+        buf.append(writer.writerow([_cell(v) for v in row]))
+        if len(buf) >= batch:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+def ndjson_lines(columns: Sequence[str], rows: Iterable[tuple], batch: int = 500) -> Iterator[str]:
+    buf = []
+    for row in rows:
+        buf.append(json.dumps(
+            {c: _cell(v) for c, v in zip(columns, row)}, ensure_ascii=False, separators=(",", ":")
+        ) + "\n")
+        if len(buf) >= batch:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+def stream(kind: str, fmt: str, **filters) -> Iterator[str]:
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format: {fmt}")
+    columns = header(kind)
+    rows = iter_rows(kind, **filters)
+    return csv_lines(columns, rows) if fmt == "csv" else ndjson_lines(columns, rows)
@@ -0,0 +1,226 @@
+# diagnosis/idempotency.py
+"""
+POST /api/result 재전송(모바일 네트워크 재시도 등) 중복 방지.
+
+키: 클라이언트(ratelimit.client_ip + User-Agent) 범위의 Idempotency-Key 헤더
+    (DIAG_IDEMPOTENCY_BODY_HASH=1 이면 헤더 없는 요청도 client_submitted_at 이 든 body 원문으로)
+    → sha256 → DiagnosisResult.idempotency_key (unique). 다른 클라이언트가 같은 헤더를 보내도 남의 결과를 못 받음
+진단 id 는 키에서 만듦 (diagnosis_id) → 어느 워커가 받든 같은 재전송은 같은 diagnosis_id
+조회 순서:
+  1) 워커 LRU (최근 응답 그대로) → DB/채점 없이 바로 응답
+  2) Bloom filter 에 있을 수도 있으면 DB 조회 → 저장된 행으로 응답 재구성
+  3) 없으면 채점 + 저장 (write-behind 켜져 있으면 큐로). 다른 워커가 먼저 넣었으면 같은 id/키라
+     insert 가 unique 위반 → 동기 저장이면 그 행으로 응답, write-behind 면 flusher 가 중복 행만 버림
+Bloom filter 는 워커별이라 다른 워커가 받은 첫 요청은 모름 → 3) 의 unique 컬럼이 최종 판단.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from . import ratelimit, score_histogram, scoring_tables, write_behind
+from .models import SCORE_FIELDS, DiagnosisResult
+
+MAX_HEADER_LEN = 255
+
+# (res, image, diagnosis_id)
+Replay = Tuple[Dict, str, str]
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DIAG_IDEMPOTENCY", True))
+
+
+def _client(request) -> bytes:
+    ua = (request.META.get("HTTP_USER_AGENT") or "")[:MAX_HEADER_LEN]
+    return f"{ratelimit.client_ip(request) or '-'}\0{ua}\0".encode("utf-8")
+
+
+def key_for(request, body) -> Optional[str]:
+    if not enabled():
+        return None
+    header = (request.META.get("HTTP_IDEMPOTENCY_KEY") or "").strip()
+    if header:
+        return hashlib.sha256(b"k:" + _client(request) + header[:MAX_HEADER_LEN].encode("utf-8")).hexdigest()
+    # 클라이언트 시각이 들어 있는 body 는 재전송이 아니면 바이트가 같을 수 없음
+    if getattr(settings, "DIAG_IDEMPOTENCY_BODY_HASH", False) \
+            and isinstance(body, dict) and body.get("client_submitted_at"):
+        return hashlib.sha256(b"b:" + _client(request) + request.body).hexdigest()
+    return None
+
+
+def diagnosis_id(key: str) -> uuid.UUID:
+    """키(sha256 hex) → 진단 id. 워커마다 따로 채점해도 같은 재전송이면 같은 id"""
+    return uuid.UUID(hex=key[:32], version=4)
+
+
+def image_for(code) -> str:
+    return f"/assets/result-{code}.png" if code else "/assets/result-1.png"
+
+
+class BloomFilter:
+    """두 세대 Bloom filter: 현재 세대가 capacity 만큼 차면 이전 세대를 버리고 교체"""
+
+    def __init__(self, bits: int = 1 << 23, hashes: int = 7):
+        self.bits = max(64, int(bits))
+        self.hashes = hashes
+        self.capacity = self.bits // 10  # 약 1% 오탐
+        self._cur = bytearray(self.bits // 8 + 1)
+        self._prev = bytearray(len(self._cur))
+        self._count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        if self._count >= self.capacity:
+            self._prev, self._cur = self._cur, bytearray(len(self._cur))
+            self._count = 0
+        for p in self._positions(key):
+            self._cur[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+    def __contains__(self, key: str) -> bool:
+        pos = self._positions(key)
+        return all(self._cur[p >> 3] & (1 << (p & 7)) for p in pos) or \
+            all(self._prev[p >> 3] & (1 << (p & 7)) for p in pos)
+
+
+class RecentResults:
+    def __init__(self, size: int = 10000, bloom_bits: int = 1 << 23):
+        self.size = max(1, int(size))
+        self._lru: "OrderedDict[str, Replay]" = OrderedDict()
+        self._bloom = BloomFilter(bloom_bits)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Replay]:
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None:
+                self._lru.move_to_end(key)
+            return hit
+
+    def maybe_stored(self, key: str) -> bool:
+        with self._lock:
+            return key in self._bloom
+
+    def remember(self, key: str, replay: Replay) -> None:
+        with self._lock:
+            self._lru[key] = replay
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+            self._bloom.add(key)
+
+
+_recent: Optional[RecentResults] = None
+_recent_lock = threading.Lock()
+
+
+def get_recent() -> RecentResults:
+    global _recent
+    if _recent is None:
+        with _recent_lock:
+            if _recent is None:
+                _recent = RecentResults(
+                    getattr(settings, "DIAG_IDEMPOTENCY_CACHE_SIZE", 10000),
+                    getattr(settings, "DIAG_IDEMPOTENCY_BLOOM_BITS", 1 << 23),
+                )
+    return _recent
+
+
+def _tables_for(version: str) -> Optional[scoring_tables.ScoringTables]:
+    for t in (scoring_tables.get_tables(), scoring_tables.builtin_tables()):
+        if t.version == version:
+            return t
+    return None
+
+
+def replay_from_row(row: DiagnosisResult) -> Replay:
+    """저장된 행 → 처음 응답과 같은 모양 (라벨은 그 행을 채점한 표 기준)"""
+    tables = _tables_for(row.scoring_version)
+    total = row.total_score or 0
+    if tables is not None:
+        pct, label, _ = tables.pct_for(total)
+        if row.skin_percentile is not None:
+            pct = row.skin_percentile
+    else:
+        # 이제 없는 버전 → 저장된 백분위로 같은 형식의 라벨
+        tables = scoring_tables.get_tables()
+        pct = row.skin_percentile if row.skin_percentile is not None else tables.pct_for(total)[0]
+        label = score_histogram.label_for(pct)
+    res = {
+        "a_type": row.a_type or None,
+        "b_type": row.b_type or None,
+        "code": row.result_code,
+        "scores": {
+            group: {c: getattr(row, SCORE_FIELDS[c], None) or 0 for c in cats if c in SCORE_FIELDS}
+            for group, cats in (("A", tables.a_cats), ("B", tables.b_cats))
+        },
+        "total_score": row.total_score,
+        "percentile": pct,
+        "percentile_label": label,
+        "skin_age": row.skin_age,
+    }
+    if score_histogram.live_enabled():
+        live = score_histogram.percentile(total, row.scoring_version) if row.total_score is not None else None
+        res["live_percentile"] = live
+        res["live_percentile_label"] = score_histogram.label_for(live) if live is not None else None
+    return res, image_for(row.result_code), str(row.id)
+
+
+def _load(key: str) -> Optional[Replay]:
+    row = DiagnosisResult.objects.filter(idempotency_key=key).first()
+    if row is None:
+        return None
+    replay = replay_from_row(row)
+    get_recent().remember(key, replay)
+    return replay
+
+
+def lookup(key: str) -> Optional[Replay]:
+    """이미 처리한 키면 (res, image, diagnosis_id), 아니면 None"""
+    recent = get_recent()
+    hit = recent.get(key)
+    if hit is not None:
+        return hit
+    if not recent.maybe_stored(key):
+        return None  # 이 워커는 본 적 없음 (다른 워커 것이면 save() 에서 잡힘)
+    return _load(key)
+
+
+async def alookup(key: str) -> Optional[Replay]:
+    recent = get_recent()
+    hit = recent.get(key)
+    if hit is not None:
+        return hit
+    if not recent.maybe_stored(key):
+        return None
+    return await sync_to_async(_load)(key)
+
+
+def save(diag: DiagnosisResult, res: Dict, image: str) -> Replay:
+    """diag.idempotency_key 가 있는 행 저장. 이미 있으면 새로 넣지 않고 기존 행 기준 응답"""
+    key = diag.idempotency_key
+    try:
+        # 중복이면 바깥 트랜잭션(ATOMIC_REQUESTS 등)은 살려 두고 이 insert 만 되돌림
+        with transaction.atomic():
+            write_behind.save_diagnosis(diag)
+    except IntegrityError:
+        replay = _load(key)
+        if replay is None:
+            raise
+        return replay
+    replay = (res, image, str(diag.id))
+    get_recent().remember(key, replay)
+    return replay
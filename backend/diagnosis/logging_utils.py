@@ -0,0 +1,146 @@
+# diagnosis/logging_utils.py
+"""
+결과 로그용 로깅 유틸.
+
+- ResultLogLine: 로그 한 줄에 필요한 값만 들고 있다가, 실제로 출력될 때만 문자열/JSON 으로 변환
+- JsonFormatter: DIAG_LOG_FORMAT=json 일 때 한 줄 JSON
+- BackgroundHandler: QueueHandler + QueueListener. 요청 스레드는 큐에 넣기만 하고
+  stdout 쓰기는 백그라운드 스레드가 담당 (DIAG_LOG_ASYNC=1)
+- should_sample: DIAG_LOG_RESULT_SAMPLE (0~1) 비율만 결과 상세 로그
+"""
+from __future__ import annotations
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+
+def client_ip(request) -> str:
+    return request.META.get("HTTP_X_FORWARDED_FOR") or request.META.get("REMOTE_ADDR")
+
+
+class ResultLogLine:
+    """result_view 로그 한 줄. 포맷은 출력 시점까지 미룸"""
+
+    __slots__ = ("ts", "ip", "ua", "answers", "res", "code")
+
+    def __init__(self, request, answers, res):
+        self.ts = time.time()
+        self.ip = client_ip(request)
+        self.ua = request.META.get("HTTP_USER_AGENT", "-")
+        self.answers = answers
+        self.res = res
+        self.code = res.get("code")
+
+    def __str__(self) -> str:
+        # 기존 텍스트 포맷 그대로
+        now = datetime.datetime.fromtimestamp(self.ts).strftime("%Y-%m-%d %H:%M:%S")
+        res, code = self.res, self.code
+        return (
+            f"[{now}] IP={self.ip} UA={self.ua[:80]} + answers:{self.answers} "
+            f"--> A:{res['scores']['A']} B:{res['scores']['B']} total:{res['total_score']} "
+            f"pct:{res['percentile_label']} skin_age:{res['skin_age']} "
+            f"view: result-{code if code else '?'} .png"
+        )
+
+    def as_dict(self) -> dict:
+        res = self.res
+        return {
+            "event": "diagnosis_result",
+            "ip": self.ip,
+            "ua": self.ua[:80],
+            "answers": self.answers,
+            "scores": res["scores"],
+            "total_score": res["total_score"],
+            "percentile_label": res["percentile_label"],
+            "skin_age": res["skin_age"],
+            "code": self.code,
+        }
+
+
+def should_sample() -> bool:
+    rate = getattr(settings, "DIAG_LOG_RESULT_SAMPLE", 1.0)
+    return rate >= 1.0 or (rate > 0 and random.random() < rate)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        line = getattr(record, "diag", None)
+        if line is not None:
+            payload.update(line.as_dict())
+        else:
+            payload["msg"] = record.getMessage()
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """
+    요청 스레드: 큐에 record 넣기만 (포맷 X)
+    백그라운드 스레드(QueueListener): 포맷 + StreamHandler 출력
+
+    큐가 가득 차면 기다리지 않고 버림 (stdout 이 막혀도 요청은 멈추지 않게).
+    gunicorn --preload 로 fork 된 워커에서는 첫 emit 때 리스너를 다시 띄움.
+    """
+
+    def __init__(self, stream="ext://sys.stdout", maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        if isinstance(stream, str):
+            stream = sys.stderr if stream.endswith("stderr") else sys.stdout
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self._pid = None
+        self._listener = None
+        self._start_lock = threading.Lock()
+        atexit.register(self._stop)
+
+    def setFormatter(self, fmt) -> None:
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def _ensure_listener(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._listener = logging.handlers.QueueListener(
+                self.queue, self.target, respect_handler_level=False
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def _stop(self) -> None:
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()  # 남은 record 모두 출력 후 종료
+            self._pid = None
+
+    def prepare(self, record):
+        # 기본 QueueHandler 는 여기서 format 을 해버림 → 백그라운드로 미룸
+        return record
+
+    def enqueue(self, record) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record) -> None:
+        self._ensure_listener()
+        super().emit(record)
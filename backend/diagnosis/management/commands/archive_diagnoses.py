@@ -0,0 +1,47 @@
+import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from diagnosis import archive
+
+
+class Command(BaseCommand):
+    help = "cutoff 이전 DiagnosisResult/ButtonClick/DiagnosisRescore 를 월별 .ndjson.gz 로 옮기고 핫 테이블에서 삭제"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", help="이 시각 이전 (ISO). 월 경계로 내림")
+        parser.add_argument("--older-than-days", type=int, default=180, help="--before 없을 때 (기본 180일)")
+        parser.add_argument("--out", help="출력 디렉터리 (기본: DIAG_ARCHIVE_DIR)")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="옮길 건수만 출력")
+
+    def handle(self, *args, **opts):
+        if opts["before"]:
+            cutoff = parse_datetime(opts["before"])
+            if cutoff is None:
+                raise CommandError(f"invalid datetime: {opts['before']}")
+        else:
+            cutoff = datetime.datetime.now() - datetime.timedelta(days=opts["older_than_days"])
+        # 한 달이 여러 파일로 쪼개지지 않게 월 경계로 자름
+        cutoff = archive.month_start(cutoff)
+        out = Path(opts["out"]) if opts["out"] else None
+
+        month = archive.first_month(cutoff)
+        if month is None:
+            self.stdout.write(f"nothing older than {cutoff:%Y-%m-%d}")
+            return
+
+        while month < cutoff:
+            end = archive.next_month(month)
+            # 클릭 → rescore → 진단: 진단 삭제 시 SET_NULL/CASCADE 되기 전에 옮김
+            n = {
+                kind: archive.archive_month(kind, month, end, out, opts["chunk_size"], opts["dry_run"])
+                for kind in archive.ARCHIVE_ORDER
+            }
+            verb = "would archive" if opts["dry_run"] else "archived"
+            self.stdout.write(
+                f"{month:%Y-%m}: {verb} {n['diagnoses']} diagnoses, {n['clicks']} clicks, {n['rescores']} rescores"
+            )
+            month = end
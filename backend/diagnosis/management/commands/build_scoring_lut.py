@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnosis import scoring_lut, scoring_tables
+
+
+class Command(BaseCommand):
+    help = "채점표의 전체 답안 공간을 미리 계산해서 lookup 파일(.lut) 생성 (배포 시 1회)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tables", help="채점표 JSON (기본: 현재 채점표)")
+        parser.add_argument("--out-dir", help="출력 디렉터리 (기본: DIAG_SCORING_LUT_DIR)")
+
+    def handle(self, *args, **opts):
+        out_dir = opts["out_dir"] or scoring_lut.lut_dir()
+        if not out_dir:
+            raise CommandError("set DIAG_SCORING_LUT_DIR or pass --out-dir")
+        if opts["tables"]:
+            try:
+                tables = scoring_tables.load_file(opts["tables"])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"invalid scoring tables: {e}")
+        else:
+            tables = scoring_tables.get_tables()
+
+        started = time.monotonic()
+        path = scoring_lut.build(tables, out_dir)
+        lut = scoring_lut.ScoringLut(str(path), tables)
+        self.stdout.write(
+            f"built {path} ({lut.count} records, {path.stat().st_size / 1e6:.1f} MB) "
+            f"in {time.monotonic() - started:.1f}s"
+        )
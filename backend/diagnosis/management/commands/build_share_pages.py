@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from diagnosis import share_pages
+
+
+class Command(BaseCommand):
+    help = "/share/<code> 페이지 16종을 정적 파일로 생성 (CDN 이 Django 없이 서빙)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--out",
+            default=str(Path(settings.BASE_DIR).parent / "frontend" / "public" / "share"),
+            help="출력 디렉터리 (기본: frontend/public/share)",
+        )
+
+    def handle(self, *args, **opts):
+        out = Path(opts["out"])
+        # /share/3 → 3/index.html, /share/3?lang=ENG → 3-eng/index.html
+        # (기존 수작업 페이지 result-N/ 과 이름이 겹치지 않음)
+        for (code, lang), page in sorted(share_pages.all_pages().items()):
+            d = out / (f"{code}-eng" if lang == "ENG" else str(code))
+            d.mkdir(parents=True, exist_ok=True)
+            (d / "index.html").write_bytes(page.body)
+        self.stdout.write(f"wrote {len(share_pages.all_pages())} pages to {out}")
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnosis import equivalence
+
+
+class Command(BaseCommand):
+    help = "채점 구현들을 golden corpus + 무작위 입력으로 compute_result_reference 와 비교 (불일치 시 실패)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--impl", action="append", help="검사할 구현 (여러 번 가능, 기본: 전부)")
+        parser.add_argument("--cases", type=int, default=10000, help="무작위 입력 수 (구현별)")
+        parser.add_argument("--seed", type=int, default=1234)
+        parser.add_argument("--golden", help="golden corpus 경로 (기본: golden_data/quiz_logic_v1.jsonl)")
+        parser.add_argument("--lut-dir", help="lut 구현도 검사할 lookup 파일 디렉터리 (기본: DIAG_SCORING_LUT_DIR)")
+        parser.add_argument("--exhaustive", action="store_true", help="가점 문항 전체 조합도 비교 (수 분)")
+        parser.add_argument("--write-golden", action="store_true",
+                            help="reference 로 golden corpus 다시 생성 (표를 의도적으로 바꿨을 때만)")
+
+    def handle(self, *args, **opts):
+        if opts["write_golden"]:
+            cases = equivalence.build_golden()
+            path = equivalence.write_golden(cases, opts["golden"])
+            self.stdout.write(f"wrote {len(cases)} cases to {path}")
+            return
+
+        try:
+            reports = equivalence.run(
+                opts["impl"], n_random=opts["cases"], seed=opts["seed"],
+                golden_path=opts["golden"], lut_dir=opts["lut_dir"], exhaustive=opts["exhaustive"],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        failed = 0
+        for r in reports:
+            status = "ok" if r.ok else f"FAILED ({len(r.failures)})"
+            self.stdout.write(f"{r.impl:<15} golden={r.golden} random={r.random} {status}")
+            for f in r.failures:
+                failed += 1
+                self.stdout.write(f"  {f.source}: answers={f.answers!r} birth_year={f.birth_year!r}")
+                self.stdout.write(f"    expected {json.dumps(f.expected, ensure_ascii=False, default=str)}")
+                self.stdout.write(f"    got      {json.dumps(f.got, ensure_ascii=False, default=str)}")
+        if failed:
+            raise CommandError(f"{failed} mismatches")
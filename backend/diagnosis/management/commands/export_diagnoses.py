@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from diagnosis import export
+
+
+class Command(BaseCommand):
+    help = "DiagnosisResult/ButtonClick 을 CSV 또는 NDJSON 으로 스트리밍 내보내기"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=export.KINDS, default="diagnoses")
+        parser.add_argument("--format", choices=export.FORMATS, default="csv")
+        parser.add_argument("--from", dest="since", help="created_at >= (ISO)")
+        parser.add_argument("--to", dest="until", help="created_at < (ISO)")
+        parser.add_argument("--result-code", type=int)
+        parser.add_argument("--lang")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--database", help="읽을 DB alias (기본: replica 가 있으면 replica)")
+        parser.add_argument("--out", default="-", help="출력 파일 (기본: stdout)")
+
+    def handle(self, *args, **opts):
+        filters = {
+            "since": self._parse(opts["since"]),
+            "until": self._parse(opts["until"]),
+            "lang": opts["lang"],
+            "chunk_size": opts["chunk_size"],
+            "using": opts["database"],
+        }
+        if opts["kind"] == "diagnoses":
+            filters["result_code"] = opts["result_code"]
+
+        out = sys.stdout if opts["out"] == "-" else open(opts["out"], "w", encoding="utf-8", newline="")
+        try:
+            for chunk in export.stream(opts["kind"], opts["format"], **filters):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        dt = parse_datetime(value)
+        if dt is None:
+            raise CommandError(f"invalid datetime: {value}")
+        return dt
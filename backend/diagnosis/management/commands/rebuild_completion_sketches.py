@@ -0,0 +1,33 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from diagnosis import sketches
+
+
+class Command(BaseCommand):
+    help = "원본 DiagnosisResult 에서 일별 완료 시간 스케치를 다시 계산 (멱등, 지난 날짜 백필용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="시작 날짜 (YYYY-MM-DD). 기본: --days 전")
+        parser.add_argument("--until", help="끝 날짜 (YYYY-MM-DD, 포함). 기본: 어제")
+        parser.add_argument("--days", type=int, default=7, help="--since 없을 때 최근 며칠 (기본 7)")
+
+    def handle(self, *args, **opts):
+        until = self._parse(opts["until"]) or (datetime.date.today() - datetime.timedelta(days=1))
+        since = self._parse(opts["since"]) or (until - datetime.timedelta(days=opts["days"] - 1))
+        if since > until:
+            raise CommandError("--since must not be after --until")
+
+        n = sketches.rebuild(since, until)
+        self.stdout.write(f"rebuilt {since} ~ {until}: {n} sketches")
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        d = parse_date(value)
+        if d is None:
+            raise CommandError(f"invalid date: {value}")
+        return d
@@ -0,0 +1,44 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from diagnosis import rollups
+
+
+class Command(BaseCommand):
+    help = "원본 DiagnosisResult/ButtonClick 에서 시간별 롤업을 다시 계산 (멱등, cron 용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="시작 시각 (ISO). 기본: --hours 전")
+        parser.add_argument("--until", help="끝 시각 (ISO, 미포함). 기본: 끝난 마지막 시간의 끝 (진행 중인 시간 제외)")
+        parser.add_argument("--hours", type=int, default=48, help="--since 없을 때 최근 몇 시간 (기본 48)")
+
+    def handle(self, *args, **opts):
+        until = self._parse(opts["until"]) or self._completed_hour()
+        since = self._parse(opts["since"]) or (until - datetime.timedelta(hours=opts["hours"]))
+        if since >= until:
+            raise CommandError("--since must be before --until")
+
+        n_diag, n_click = rollups.rebuild(since, until)
+        self.stdout.write(
+            f"rebuilt {since:%Y-%m-%d %H:00} ~ {until:%Y-%m-%d %H:%M}: "
+            f"{n_diag} diagnosis buckets, {n_click} click buckets"
+        )
+
+    @staticmethod
+    def _completed_hour():
+        # 진행 중인 시간은 워커가 flush 안 한 증분과 겹쳐 두 번 셈 → 끝난 시간까지만.
+        # 정각 직후면 직전 시간 증분이 아직 flush 전일 수 있어 flush 주기 2번만큼 여유
+        margin = 2 * float(getattr(settings, "DIAG_ROLLUP_FLUSH_INTERVAL", 5.0))
+        return rollups.truncate_hour(datetime.datetime.now() - datetime.timedelta(seconds=margin))
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        dt = parse_datetime(value)
+        if dt is None:
+            raise CommandError(f"invalid datetime: {value}")
+        return dt
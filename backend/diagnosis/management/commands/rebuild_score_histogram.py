@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from diagnosis import score_histogram
+
+
+class Command(BaseCommand):
+    help = "원본 DiagnosisResult 에서 total_score 분포(ScoreHistogramBin)를 다시 계산하고 시드 cutoff 를 지금으로 (멱등)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scoring-version", help="이 채점표 버전만 (기본: 전체)")
+
+    def handle(self, *args, **opts):
+        version = opts["scoring_version"]
+        n = score_histogram.rebuild(version)
+        self.stdout.write(f"rebuilt score histogram ({version or 'all versions'}): {n} bins")
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from diagnosis import rescoring, scoring_tables
+from diagnosis.models import DiagnosisResult
+
+
+class Command(BaseCommand):
+    help = "후보 채점표로 과거 진단을 일괄 재채점 → 기존/새 result_code 교차표 (--write: shadow 테이블 저장)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tables", help="후보 채점표 JSON (기본: 현재 채점표)")
+        parser.add_argument("--from", dest="since", help="created_at >= (ISO)")
+        parser.add_argument("--to", dest="until", help="created_at < (ISO)")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--write", action="store_true", help="DiagnosisRescore 에 결과 upsert")
+        parser.add_argument("--quiet", action="store_true", help="진행 상황 출력 안 함")
+
+    def handle(self, *args, **opts):
+        try:
+            from diagnosis import batch_scoring
+        except ImportError as e:
+            raise CommandError(f"rescore_diagnoses requires numpy (pip install -r requirements.txt): {e}")
+
+        if opts["tables"]:
+            try:
+                candidate = scoring_tables.load_file(opts["tables"])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"invalid scoring tables: {e}")
+        else:
+            candidate = scoring_tables.get_tables()
+        if opts["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        qs = DiagnosisResult.objects.all()
+        since, until = self._parse(opts["since"]), self._parse(opts["until"])
+        if since is not None:
+            qs = qs.filter(created_at__gte=since)
+        if until is not None:
+            qs = qs.filter(created_at__lt=until)
+
+        progress = None if opts["quiet"] else self._progress
+        report = rescoring.rescore(
+            batch_scoring.compile_tables(candidate), qs,
+            chunk_size=opts["chunk_size"], write=opts["write"], progress=progress,
+        )
+        self._print(report)
+
+    def _progress(self, report):
+        rate = report.scored / report.elapsed if report.elapsed else 0
+        self.stderr.write(f"  {report.scored} rows ({rate:,.0f}/s)")
+
+    def _print(self, report):
+        olds, news, counts = report.matrix()
+        self.stdout.write(
+            f"version={report.version} scored={report.scored} changed={report.changed} "
+            f"skipped={report.skipped} written={report.written} elapsed={report.elapsed:.1f}s"
+        )
+        if not olds:
+            return
+        width = max(6, *(len(str(n)) for row in counts for n in row))
+        self.stdout.write("old\\new " + "".join(f"{n:>{width + 1}}" for n in news))
+        for old, row in zip(olds, counts):
+            self.stdout.write(f"{old:>7} " + "".join(f"{n:>{width + 1}}" for n in row))
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        dt = parse_datetime(value)
+        if dt is None:
+            raise CommandError(f"invalid datetime: {value}")
+        return dt
@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnosis import scoring_tables
+
+
+class Command(BaseCommand):
+    help = "채점표 JSON 검증(--check) 또는 현재 내장 표를 JSON 으로 출력(--dump)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", metavar="PATH", help="후보 JSON 파일 검증")
+        parser.add_argument("--dump", action="store_true", help="quiz_logic 내장 표를 JSON 으로 출력")
+
+    def handle(self, *args, **opts):
+        if opts["check"]:
+            try:
+                t = scoring_tables.load_file(opts["check"])
+                scoring_tables.check_version(t, scoring_tables.get_tables())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"invalid scoring tables: {e}")
+            self.stdout.write(
+                f"ok: version={t.version}, max_total={len(t.pct_by_total) - 1}, codes={sorted(set(t.result_map.values()))}"
+            )
+        elif opts["dump"]:
+            self.stdout.write(json.dumps(scoring_tables.builtin_raw(), ensure_ascii=False, indent=2))
+        else:
+            current = scoring_tables.get_tables()
+            self.stdout.write(f"current: version={current.version}")
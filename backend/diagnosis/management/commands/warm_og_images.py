@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnosis import og_images
+
+
+class Command(BaseCommand):
+    help = "저장된 진단에서 많이 나온 (결과코드, 언어, 피부나이, 백분위) 조합의 OG 이미지를 미리 렌더"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=500, help="렌더할 조합 수 (빈도순, 기본 500)")
+
+    def handle(self, *args, **opts):
+        if not og_images.available():
+            raise CommandError("Pillow is not installed")
+        keys = og_images.common_keys(opts["top"])
+        done = failed = 0
+        for key in keys:
+            if og_images.get_image(key) is None:
+                failed += 1
+            else:
+                done += 1
+        self.stdout.write(f"warmed {done} images ({failed} failed) in {og_images.cache_dir()}")
@@ -0,0 +1,202 @@
+# diagnosis/metrics.py
+"""
+요청 단계별 타이밍 + 프로세스 내 히스토그램/카운터 (Prometheus text 포맷).
+
+- stage(request, "compute"): 뷰 안의 단계 시간 측정 → Server-Timing 헤더 + 히스토그램
+- TimingMiddleware: 요청 전체 시간/건수/에러 수 집계, Server-Timing 헤더 부착
+- metrics_view: /metrics (워커 프로세스별 값. gunicorn 멀티워커면 워커마다 따로 집계됨)
+"""
+from __future__ import annotations
+
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+# 초 단위 (Prometheus 관례)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._hist.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram()
+            h.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+
+    @staticmethod
+    def _fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        items = list(key) + list(extra)
+        if not items:
+            return ""
+        esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, v in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{self._fmt_labels(key)} {v:g}")
+            for name in sorted(self._hist):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(self._hist[name].items()):
+                    cum = 0
+                    for le, c in zip(h.buckets, h.counts):
+                        cum += c
+                        lines.append(f"{name}_bucket{self._fmt_labels(key, (('le', f'{le:g}'),))} {cum}")
+                    lines.append(f"{name}_bucket{self._fmt_labels(key, (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{name}_sum{self._fmt_labels(key)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{self._fmt_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REGISTRY.describe("diag_requests_total", "HTTP requests by view and status")
+REGISTRY.describe("diag_request_errors_total", "Requests that raised or returned 5xx")
+REGISTRY.describe("diag_db_failures_total", "Failed DiagnosisResult/ButtonClick writes")
+REGISTRY.describe("diag_request_seconds", "Request duration by view")
+REGISTRY.describe("diag_stage_seconds", "Per-stage duration inside diagnosis views")
+
+_TIMINGS_ATTR = "_diag_stage_timings"
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name or match.view_name) if match else "unmatched"
+
+
+@contextmanager
+def stage(request, name: str):
+    """뷰 내부 단계 시간 측정. 미들웨어 없이도 히스토그램에는 기록됨"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dur = time.perf_counter() - t0
+        timings = getattr(request, _TIMINGS_ATTR, None)
+        if timings is None:
+            timings = []
+            setattr(request, _TIMINGS_ATTR, timings)
+        timings.append((name, dur))
+        REGISTRY.observe("diag_stage_seconds", dur, view=_view_name(request), stage=name)
+
+
+def db_failure(what: str) -> None:
+    REGISTRY.inc("diag_db_failures_total", what=what)
+
+
+def _server_timing(request, total: float) -> str:
+    parts = [f"{name};dur={dur * 1000:.3f}" for name, dur in getattr(request, _TIMINGS_ATTR, ())]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """요청 수/에러/시간 집계 + Server-Timing 헤더 (WSGI/ASGI 둘 다 지원)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _finish(self, request, response, t0, failed: bool):
+        total = time.perf_counter() - t0
+        view = _view_name(request)
+        status = response.status_code if response is not None else 500
+        REGISTRY.inc("diag_requests_total", view=view, status=str(status))
+        REGISTRY.observe("diag_request_seconds", total, view=view)
+        if failed or status >= 500:
+            REGISTRY.inc("diag_request_errors_total", view=view)
+        if response is not None and getattr(settings, "DIAG_SERVER_TIMING", True):
+            response["Server-Timing"] = _server_timing(request, total)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self._finish(request, None, t0, True)
+            raise
+        self._finish(request, response, t0, False)
+        return response
+
+    async def __acall__(self, request):
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            self._finish(request, None, t0, True)
+            raise
+        self._finish(request, response, t0, False)
+        return response
+
+
+def _authorized(request) -> bool:
+    """DIAG_METRICS_TOKEN 설정 시 Authorization: Bearer <token>. 토큰이 없으면 DEBUG 에서만 공개"""
+    token = getattr(settings, "DIAG_METRICS_TOKEN", "")
+    if not token:
+        return settings.DEBUG
+    given = request.META.get("HTTP_AUTHORIZATION", "")
+    return hmac.compare_digest(given.encode(), f"Bearer {token}".encode())
+
+
+def metrics_view(request):
+    """Prometheus text (접근 조건은 _authorized)"""
+    if not _authorized(request):
+        return HttpResponse("forbidden\n", status=403, content_type="text/plain")
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0002_buttonclick_client_ts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClickHourlyStat",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("hour", models.DateTimeField()),
+                ("button_key", models.CharField(max_length=32)),
+                ("lang", models.CharField(default="ENG", max_length=8)),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DiagnosisHourlyStat",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("hour", models.DateTimeField()),
+                ("result_code", models.IntegerField(default=0)),
+                ("lang", models.CharField(default="ENG", max_length=8)),
+                ("count", models.IntegerField(default=0)),
+                ("sum_total_score", models.BigIntegerField(default=0)),
+                ("sum_skin_age", models.BigIntegerField(default=0)),
+                ("skin_age_count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="diagnosishourlystat",
+            constraint=models.UniqueConstraint(fields=("hour", "result_code", "lang"), name="diag_hourly_uniq"),
+        ),
+        migrations.AddConstraint(
+            model_name="clickhourlystat",
+            constraint=models.UniqueConstraint(fields=("hour", "button_key", "lang"), name="click_hourly_uniq"),
+        ),
+    ]
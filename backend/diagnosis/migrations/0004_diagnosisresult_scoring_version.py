@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0003_hourly_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="scoring_version",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0004_diagnosisresult_scoring_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DiagnosisRescore",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("scoring_version", models.CharField(max_length=32)),
+                ("created_at", models.DateTimeField(auto_now=True)),
+                ("result_code", models.IntegerField(blank=True, null=True)),
+                ("skin_percentile", models.IntegerField(blank=True, null=True)),
+                ("score_a", models.IntegerField(blank=True, null=True)),
+                ("score_b", models.IntegerField(blank=True, null=True)),
+                ("total_score", models.IntegerField(blank=True, null=True)),
+                ("diagnosis", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="rescores", to="diagnosis.diagnosisresult")),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="diagnosisrescore",
+            constraint=models.UniqueConstraint(fields=("diagnosis", "scoring_version"), name="diag_rescore_uniq"),
+        ),
+    ]
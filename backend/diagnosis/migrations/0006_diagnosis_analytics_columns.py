@@ -0,0 +1,113 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0005_diagnosis_rescore"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="a_type",
+            field=models.CharField(blank=True, default="", max_length=16),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="b_type",
+            field=models.CharField(blank=True, default="", max_length=16),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q1",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q10",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q11",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q12",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q2",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q3",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q4",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q5",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q6",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q7",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q8",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="q9",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="score_combination",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="score_dry",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="score_environment",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="score_oily",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="score_sensitivity",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="score_stress",
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,156 @@
+# Generated by Django 4.2 on 2026-10-18
+"""
+0006 에서 추가한 분석용 컬럼을 기존 행에 채움 (pk 순서로 chunk 단위, chunk 마다 커밋).
+- q1..q12: answers 그대로
+- a_type/b_type/카테고리 점수: answers 를 v1 표로 다시 채점
+  (앱 코드가 바뀌어도 이 마이그레이션 결과가 바뀌지 않게 v1 표와 채점 규칙을 아래에 고정 복사)
+- skin_percentile: 예전 코드가 항상 None 으로 저장하던 값 → 같은 채점 결과의 percentile
+인덱스는 채운 뒤에 만들고 (채우는 동안 인덱스 갱신 비용 없음), result_code 단독 인덱스는 그 다음에 제거
+"""
+
+from django.db import migrations, models
+
+CHUNK = 2000
+N_QUESTIONS = 12
+SCORE_FIELDS = {
+    "sensitivity": "score_sensitivity",
+    "oily": "score_oily",
+    "dry": "score_dry",
+    "combination": "score_combination",
+    "stress": "score_stress",
+    "environment": "score_environment",
+}
+FIELDS = (
+    [f"q{i}" for i in range(1, N_QUESTIONS + 1)]
+    + ["a_type", "b_type", "skin_percentile"]
+    + list(SCORE_FIELDS.values())
+)
+
+# ---- v1 표 고정본 (quiz_logic.TABLES_VERSION = "v1" 시점) ----
+A_CATS = ["sensitivity", "oily", "dry", "combination"]
+B_CATS = ["stress", "environment"]
+TH_A = {"sensitivity": 4, "oily": 3, "dry": 4, "combination": 4}
+TH_B = {"stress": 2, "environment": 4}
+# 질문번호 -> 보기번호 -> {"A"|"B": {카테고리: 가점}} (v1 에는 "T" 가점 없음, 빈 칸은 생략)
+WEIGHTS = {
+    3: {1: {"A": {"oily": 2}}, 2: {"A": {"combination": 1}}, 3: {"A": {"dry": 2}}, 4: {"A": {"sensitivity": 1}}},
+    4: {1: {"A": {"dry": 2}}, 2: {"A": {"oily": 1}}, 3: {"A": {"combination": 1}}, 4: {"A": {"sensitivity": 1}}},
+    5: {1: {"A": {"sensitivity": 2}}, 2: {"A": {"sensitivity": 1}}, 3: {"A": {"combination": 1}}},
+    6: {1: {"B": {"environment": 2}}, 2: {"B": {"environment": 1}}, 3: {"B": {"stress": 1}}},
+    7: {1: {"B": {"environment": 1}, "A": {"dry": 1}}, 2: {"A": {"dry": 1}}},
+    8: {
+        1: {"A": {"oily": 1}, "B": {"environment": 1}},
+        2: {"A": {"sensitivity": 1}, "B": {"stress": 1}},
+        3: {"B": {"environment": 2}},
+        4: {"A": {"combination": 1}, "B": {"stress": 1}},
+    },
+    10: {
+        1: {"A": {"oily": 1}, "B": {"environment": 1}},
+        2: {"B": {"stress": 1}, "A": {"sensitivity": 1}},
+        3: {"A": {"combination": 1}},
+    },
+    11: {1: {"A": {"sensitivity": 2}}, 2: {"A": {"sensitivity": 1}}},
+    12: {1: {"A": {"oily": 1}}, 2: {"A": {"dry": 1}}, 3: {"B": {"environment": 1}}},
+}
+# (low, high, percentile) — "상위 X%" → X, "하위 Y%" → 100 - Y. 구간 밖은 50 ("상위 50%")
+PCT_TABLE = [
+    (18, 99, 5), (16, 17, 10), (15, 15, 15), (13, 14, 20), (12, 12, 25), (10, 11, 50),
+    (9, 9, 75), (8, 8, 80), (7, 7, 85), (6, 6, 90), (5, 5, 95),
+]
+
+
+def _pick(scores, threshold, order):
+    cand = [k for k in order if scores[k] >= threshold[k]]
+    if not cand:
+        return None
+    return max(cand, key=lambda k: (scores[k], -order.index(k)))
+
+
+def score_v1(answers):
+    """v1 채점 (a_type, b_type, scores, percentile). 형식이 안 맞으면 TypeError/ValueError"""
+    if not isinstance(answers, list) or len(answers) != N_QUESTIONS:
+        raise ValueError("answers must be a list of length 12")
+    arr = [int(x or 0) for x in answers]
+    if not all(0 <= x <= 4 for x in arr):
+        raise ValueError("answers values must be 0..4")
+    score_a = {k: 0 for k in A_CATS}
+    score_b = {k: 0 for k in B_CATS}
+    for q, ans in enumerate(arr, start=1):
+        cell = WEIGHTS.get(q, {}).get(ans, {})
+        for cat, v in cell.get("A", {}).items():
+            score_a[cat] += v
+        for cat, v in cell.get("B", {}).items():
+            score_b[cat] += v
+    total = sum(score_a.values()) + sum(score_b.values())
+    percentile = next((p for low, high, p in PCT_TABLE if low <= total <= high), 50)
+    return {
+        "a_type": _pick(score_a, TH_A, A_CATS),
+        "b_type": _pick(score_b, TH_B, B_CATS),
+        "scores": {"A": score_a, "B": score_b},
+        "percentile": percentile,
+    }
+
+
+def _fill(row, compute_result):
+    answers = row.answers if isinstance(row.answers, list) else []
+    for i, v in enumerate(answers[:N_QUESTIONS], start=1):
+        try:
+            setattr(row, f"q{i}", int(v or 0))
+        except (TypeError, ValueError):
+            pass
+    try:
+        res = compute_result(answers)
+    except (TypeError, ValueError):
+        return  # 형식이 안 맞는 옛 행은 q 컬럼만
+    row.a_type = res["a_type"] or ""
+    row.b_type = res["b_type"] or ""
+    for group in ("A", "B"):
+        for cat, v in res["scores"][group].items():
+            if cat in SCORE_FIELDS:
+                setattr(row, SCORE_FIELDS[cat], v)
+    if row.skin_percentile is None:
+        row.skin_percentile = res["percentile"]
+
+
+def backfill(apps, schema_editor):
+    DiagnosisResult = apps.get_model("diagnosis", "DiagnosisResult")
+    qs = DiagnosisResult.objects.order_by("pk").only("pk", "answers", "skin_percentile")
+    last_pk = None
+    while True:
+        page = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+        rows = list(page[:CHUNK])
+        if not rows:
+            break
+        last_pk = rows[-1].pk
+        for row in rows:
+            _fill(row, score_v1)
+        DiagnosisResult.objects.bulk_update(rows, FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("diagnosis", "0006_diagnosis_analytics_columns"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="diagnosisresult",
+            index=models.Index(fields=["result_code", "created_at"], name="diag_code_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="diagnosisresult",
+            index=models.Index(fields=["a_type", "b_type"], name="diag_ab_type_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="diagnosisresult",
+            index=models.Index(fields=["lang", "created_at"], name="diag_lang_created_idx"),
+        ),
+        migrations.RemoveIndex(
+            model_name="diagnosisresult",
+            name="diag_result_code_idx",
+        ),
+    ]
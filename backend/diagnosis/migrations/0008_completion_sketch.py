@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0007_backfill_analytics_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompletionSketch",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("day", models.DateField()),
+                ("lang", models.CharField(default="ENG", max_length=8)),
+                ("result_code", models.IntegerField(default=0)),
+                ("count", models.BigIntegerField(default=0)),
+                ("sketch", models.BinaryField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="completionsketch",
+            constraint=models.UniqueConstraint(fields=("day", "lang", "result_code"), name="completion_sketch_uniq"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0008_completion_sketch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="diagnosisresult",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
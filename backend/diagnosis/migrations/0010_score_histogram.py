@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0009_diagnosisresult_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreHistogramBin",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("scoring_version", models.CharField(max_length=32)),
+                ("total_score", models.IntegerField()),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="scorehistogrambin",
+            constraint=models.UniqueConstraint(fields=("scoring_version", "total_score"), name="score_histogram_uniq"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("diagnosis", "0010_score_histogram"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreHistogramSeed",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("scoring_version", models.CharField(max_length=32, unique=True)),
+                ("cutoff", models.DateTimeField()),
+            ],
+        ),
+    ]
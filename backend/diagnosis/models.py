@@ -5,6 +5,19 @@ import uuid
 from django.db import models
 
 
+N_QUESTIONS = 12
+
+# 채점 카테고리 → 점수 컬럼 (표에 없는 카테고리는 저장 안 함)
+SCORE_FIELDS = {
+    "sensitivity": "score_sensitivity",
+    "oily": "score_oily",
+    "dry": "score_dry",
+    "combination": "score_combination",
+    "stress": "score_stress",
+    "environment": "score_environment",
+}
+
+
 class DiagnosisResult(models.Model):
     """진단 결과 1건을 저장.
 
@@ -41,15 +54,61 @@ class DiagnosisResult(models.Model):
     score_b = models.IntegerField(null=True, blank=True)
     total_score = models.IntegerField(null=True, blank=True)
 
+    # 채점에 쓴 표 버전 (quiz_logic.TABLES_VERSION 또는 DIAG_SCORING_TABLES 파일의 version)
+    scoring_version = models.CharField(max_length=32, blank=True, default="")
+
+    # 재전송 중복 방지 키 (Idempotency-Key 헤더 또는 body 의 sha256, diagnosis/idempotency.py)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, unique=True)
+
+    # 분석용 비정규화 컬럼 (answers/채점 결과를 풀어서 저장 → JSON 파싱 없이 인덱스로 GROUP BY)
+    q1 = models.SmallIntegerField(null=True, blank=True)
+    q2 = models.SmallIntegerField(null=True, blank=True)
+    q3 = models.SmallIntegerField(null=True, blank=True)
+    q4 = models.SmallIntegerField(null=True, blank=True)
+    q5 = models.SmallIntegerField(null=True, blank=True)
+    q6 = models.SmallIntegerField(null=True, blank=True)
+    q7 = models.SmallIntegerField(null=True, blank=True)
+    q8 = models.SmallIntegerField(null=True, blank=True)
+    q9 = models.SmallIntegerField(null=True, blank=True)
+    q10 = models.SmallIntegerField(null=True, blank=True)
+    q11 = models.SmallIntegerField(null=True, blank=True)
+    q12 = models.SmallIntegerField(null=True, blank=True)
+
+    a_type = models.CharField(max_length=16, blank=True, default="")
+    b_type = models.CharField(max_length=16, blank=True, default="")
+
+    score_sensitivity = models.SmallIntegerField(null=True, blank=True)
+    score_oily = models.SmallIntegerField(null=True, blank=True)
+    score_dry = models.SmallIntegerField(null=True, blank=True)
+    score_combination = models.SmallIntegerField(null=True, blank=True)
+    score_stress = models.SmallIntegerField(null=True, blank=True)
+    score_environment = models.SmallIntegerField(null=True, blank=True)
+
     class Meta:
         indexes = [
             models.Index(fields=["created_at"], name="diag_created_at_idx"),
-            models.Index(fields=["result_code"], name="diag_result_code_idx"),
+            # result_code 단독 조회도 이 인덱스 앞부분으로 처리
+            models.Index(fields=["result_code", "created_at"], name="diag_code_created_idx"),
+            models.Index(fields=["a_type", "b_type"], name="diag_ab_type_idx"),
+            models.Index(fields=["lang", "created_at"], name="diag_lang_created_idx"),
         ]
 
     def __str__(self) -> str:
         return f"DiagnosisResult({self.id}, code={self.result_code})"
 
+    def set_analytics(self, answers, res) -> None:
+        """검증된 answers 와 compute_result 결과로 q1..q12 / a_type / b_type / 카테고리 점수 채움"""
+        for i, v in enumerate(list(answers or [])[:N_QUESTIONS], start=1):
+            setattr(self, f"q{i}", int(v or 0))
+        self.a_type = res.get("a_type") or ""
+        self.b_type = res.get("b_type") or ""
+        scores = res.get("scores") or {}
+        for group in ("A", "B"):
+            for cat, v in (scores.get(group) or {}).items():
+                field = SCORE_FIELDS.get(cat)
+                if field:
+                    setattr(self, field, v)
+
 
 class ButtonClick(models.Model):
     """결과 페이지 버튼 클릭 로그.
@@ -73,6 +132,9 @@ class ButtonClick(models.Model):
     button_key = models.CharField(max_length=32)
     lang = models.CharField(max_length=8, default="ENG")
 
+    # (선택) FE 에서 클릭 시점 (버퍼링 후 sendBeacon 으로 늦게 올 수 있음)
+    client_ts = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         indexes = [
             models.Index(fields=["created_at"], name="click_created_at_idx"),
@@ -81,3 +143,155 @@ class ButtonClick(models.Model):
 
     def __str__(self) -> str:
         return f"ButtonClick({self.id}, {self.button_key})"
+
+
+class DiagnosisHourlyStat(models.Model):
+    """DiagnosisResult 시간별 집계 (통계 조회용 롤업).
+
+    - 저장 시 diagnosis/rollups.py 가 워커 메모리에 모았다가 주기적으로 증분 갱신
+    - `manage.py rebuild_rollups` 로 원본에서 다시 계산 (멱등)
+    - result_code 없음(None)은 0 으로 저장 (NULL 은 unique 로 안 묶여서)
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    hour = models.DateTimeField()
+    result_code = models.IntegerField(default=0)
+    lang = models.CharField(max_length=8, default="ENG")
+
+    count = models.IntegerField(default=0)
+    sum_total_score = models.BigIntegerField(default=0)
+    sum_skin_age = models.BigIntegerField(default=0)
+    skin_age_count = models.IntegerField(default=0)  # skin_age 평균 계산용 (None 제외)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "result_code", "lang"], name="diag_hourly_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"DiagnosisHourlyStat({self.hour}, code={self.result_code}, {self.lang}, n={self.count})"
+
+
+class ClickHourlyStat(models.Model):
+    """ButtonClick 시간별 집계 (통계 조회용 롤업)."""
+
+    id = models.BigAutoField(primary_key=True)
+    hour = models.DateTimeField()
+    button_key = models.CharField(max_length=32)
+    lang = models.CharField(max_length=8, default="ENG")
+
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "button_key", "lang"], name="click_hourly_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ClickHourlyStat({self.hour}, {self.button_key}, {self.lang}, n={self.count})"
+
+
+class DiagnosisRescore(models.Model):
+    """후보 채점표로 과거 진단을 다시 채점한 결과 (shadow 테이블).
+
+    - `manage.py rescore_diagnoses --tables <json> --write` 가 chunk 단위 upsert
+    - (diagnosis, scoring_version) 당 1행 → 같은 후보로 다시 돌려도 덮어씀
+    - 운영 결과(DiagnosisResult)는 건드리지 않음
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    diagnosis = models.ForeignKey(
+        DiagnosisResult,
+        on_delete=models.CASCADE,
+        related_name="rescores",
+    )
+    scoring_version = models.CharField(max_length=32)
+    created_at = models.DateTimeField(auto_now=True)
+
+    result_code = models.IntegerField(null=True, blank=True)
+    skin_percentile = models.IntegerField(null=True, blank=True)
+    score_a = models.IntegerField(null=True, blank=True)
+    score_b = models.IntegerField(null=True, blank=True)
+    total_score = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["diagnosis", "scoring_version"], name="diag_rescore_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"DiagnosisRescore({self.diagnosis_id}, {self.scoring_version}, code={self.result_code})"
+
+
+class CompletionSketch(models.Model):
+    """퀴즈 완료 시간 분위수 스케치 (일 × lang × result_code).
+
+    - sketch: diagnosis/sketches.py DDSketch 직렬화 (bin 키 증분 varint → 보통 수백 바이트)
+    - 워커가 주기적으로 병합 저장, 조회 시 기간 내 행을 다시 병합
+    - result_code 없음(None)은 0
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    day = models.DateField()
+    lang = models.CharField(max_length=8, default="ENG")
+    result_code = models.IntegerField(default=0)
+
+    count = models.BigIntegerField(default=0)
+    sketch = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "lang", "result_code"], name="completion_sketch_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"CompletionSketch({self.day}, code={self.result_code}, {self.lang}, n={self.count})"
+
+
+class ScoreHistogramBin(models.Model):
+    """채점표 버전별 total_score 분포 (실제 사용자 기준 백분위용 공유 표).
+
+    - 버전당 total_score 값 개수만큼의 작은 표 (v1 은 18행 이하)
+    - 시드 cutoff 이전 진단은 원본 집계로, 이후는 워커가 메모리에 모은 증분을 주기적으로 더함
+      (diagnosis/score_histogram.py, ScoreHistogramSeed)
+    - `manage.py rebuild_score_histogram` 으로 원본에서 다시 계산 (멱등)
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    scoring_version = models.CharField(max_length=32)
+    total_score = models.IntegerField()
+
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scoring_version", "total_score"], name="score_histogram_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ScoreHistogramBin({self.scoring_version}, total={self.total_score}, n={self.count})"
+
+
+class ScoreHistogramSeed(models.Model):
+    """버전별 ScoreHistogramBin 시드 기준 시각.
+
+    - created_at < cutoff 인 진단은 시드(원본 집계)로, 이후 진단은 워커 증분으로만 셈 → 두 번 세지 않음
+    - 버전을 처음 동기화하는 워커가 만들고, `manage.py rebuild_score_histogram` 이 새 시각으로 다시 씀
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    scoring_version = models.CharField(max_length=32, unique=True)
+    cutoff = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"ScoreHistogramSeed({self.scoring_version}, cutoff={self.cutoff})"
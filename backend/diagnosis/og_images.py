@@ -0,0 +1,312 @@
+# diagnosis/og_images.py
+"""
+개인화 Open Graph 이미지 (결과 이미지 + 피부나이/백분위 문구).
+
+- 렌더: Pillow (선택 의존성). 없거나 원본 이미지가 없으면 None → 뷰는 고정 이미지로 redirect
+- 캐시: <DIAG_OG_CACHE_DIR>/<sha256[:2]>/<sha256>.png
+  키 = (RENDER_VERSION, code, lang, age, percentile, 원본 이미지 mtime, 폰트) → 같은 입력은 같은 파일
+  hit 시 mtime 갱신, 총 크기가 DIAG_OG_CACHE_MAX_BYTES 를 넘으면 mtime 오래된 것부터 삭제 (LRU)
+- 크롤러가 같은 링크를 몰아서 가져가도 첫 요청만 렌더, 나머지는 파일 그대로
+- 뷰는 캐시에 없을 때만 ratelimit "og_render" 한도를 씀 (넘으면 고정 이미지로 redirect)
+  → 조합(약 2만 개)을 훑어 캐시를 갈아엎는 요청을 IP 별로 막음
+- 응답은 open_image() 가 연 파일 핸들로 → 연 뒤에 evict 돼도 그대로 전송. 열기 전에 지워졌으면 다시 렌더
+- `manage.py warm_og_images`: 저장된 진단에서 많이 나온 조합을 미리 렌더
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from . import scoring_tables, share_pages
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # pragma: no cover - 선택 의존성
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+RENDER_VERSION = "1"
+SIZE = (1200, 630)  # OG 권장 크기
+MAX_AGE = 100
+
+Key = Tuple[int, str, int, int]  # (code, lang, age, percentile)
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def cache_dir() -> Path:
+    return Path(getattr(settings, "DIAG_OG_CACHE_DIR", Path(settings.BASE_DIR) / "og_cache"))
+
+
+def base_dir() -> Path:
+    default = Path(settings.BASE_DIR).parent / "frontend" / "public" / "assets"
+    return Path(getattr(settings, "DIAG_OG_BASE_DIR", default))
+
+
+def base_image(code: int, lang: str) -> Path:
+    suffix = "_eng" if lang == "ENG" else ""
+    return base_dir() / f"result-{int(code)}{suffix}.png"
+
+
+def static_url(code: int, lang: str) -> str:
+    return f"/assets/result-{int(code)}{'_eng' if lang == 'ENG' else ''}.png"
+
+
+def label_for(percentile: int, lang: str) -> str:
+    """percentile(상위 기준 숫자) → 표 라벨. 상위 X% ↔ X, 하위 Y% ↔ 100 - Y"""
+    if lang == "ENG":
+        return f"Top {percentile}%" if percentile <= 50 else f"Bottom {100 - percentile}%"
+    return f"상위 {percentile}%" if percentile <= 50 else f"하위 {100 - percentile}%"
+
+
+def allowed_percentiles() -> set:
+    """현재 채점표가 낼 수 있는 percentile 값만 허용 (임의 조합 렌더 방지)"""
+    t = scoring_tables.get_tables()
+    return {p for p, _, _ in t.pct_by_total} | {t.pct_default[0]}
+
+
+def parse_key(code, lang, age, pct) -> Optional[Key]:
+    """쿼리 값 검증. 개인화 불가(값 없음/범위 밖)면 None"""
+    try:
+        code, age, pct = int(code), int(age), int(pct)
+    except (TypeError, ValueError):
+        return None
+    if code not in share_pages.RESULT_CODES or not 0 < age <= MAX_AGE:
+        return None
+    if pct not in allowed_percentiles():
+        return None
+    return code, share_pages.normalize_lang(lang), age, pct
+
+
+def _font_path() -> str:
+    return getattr(settings, "DIAG_OG_FONT", "") or ""
+
+
+def _digest(key: Key) -> Optional[str]:
+    code, lang, age, pct = key
+    try:
+        mtime = base_image(code, lang).stat().st_mtime_ns
+    except OSError:
+        return None
+    raw = f"{RENDER_VERSION}|{code}|{lang}|{age}|{pct}|{mtime}|{_font_path()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _lines(key: Key) -> List[str]:
+    _, lang, age, pct = key
+    # 한글은 DIAG_OG_FONT (CJK 폰트) 가 있을 때만. 기본 폰트에는 한글 글리프가 없음
+    if lang == "KOR" and _font_path():
+        return [f"피부나이 {age}세", label_for(pct, "KOR")]
+    return [f"Skin age {age}", label_for(pct, "ENG")]
+
+
+def _font(size: int):
+    path = _font_path()
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            logger.warning(f"OG font not loadable: {path}")
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1: size 인자 없음 → 고정 크기 비트맵 폰트
+        return ImageFont.load_default()
+
+
+def render(key: Key) -> bytes:
+    """원본 결과 이미지를 왼쪽에, 문구를 오른쪽에 둔 1200×630 PNG"""
+    import io
+
+    code, lang, _, _ = key
+    with Image.open(base_image(code, lang)) as src:
+        src = src.convert("RGB")
+        w, h = SIZE
+        scale = h / src.height
+        thumb = src.resize((max(1, round(src.width * scale)), h), Image.LANCZOS)
+        bg = src.getpixel((0, 0))
+
+    canvas = Image.new("RGB", SIZE, bg)
+    canvas.paste(thumb, (0, 0))
+    draw = ImageDraw.Draw(canvas)
+    x = thumb.width + 60
+    y = 170
+    for i, text in enumerate(_lines(key)):
+        size = 84 if i == 0 else 64
+        draw.text((x, y), text, font=_font(size), fill=(34, 34, 34))
+        y += size + 50
+
+    buf = io.BytesIO()
+    canvas.save(buf, format="PNG", optimize=False)
+    return buf.getvalue()
+
+
+class DiskCache:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        # 키별 락은 누군가 쥐고 있는 동안만 남음 → 따로 비울 필요 없고, 쓰는 중인 락이 바뀌지 않음
+        self._key_locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._approx = None  # 대략적인 총 크기 (evict 때 다시 계산)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.png"
+
+    def get(self, digest: str) -> Optional[Path]:
+        p = self.path(digest)
+        try:
+            os.utime(p)  # LRU: 최근 사용 시각 = mtime
+        except OSError:
+            return None
+        return p
+
+    def put(self, digest: str, data: bytes) -> Path:
+        p = self.path(digest)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+        with self._lock:
+            if self._approx is None:
+                self._approx = self._scan_size()
+            self._approx += len(data)
+            over = self._approx > self.max_bytes
+        if over:
+            self.evict()
+        return p
+
+    def key_lock(self, digest: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(digest)
+            if lock is None:
+                lock = self._key_locks[digest] = threading.Lock()
+            return lock
+
+    def _files(self) -> Iterable[os.DirEntry]:
+        if not self.root.exists():
+            return []
+        out = []
+        for shard in os.scandir(self.root):
+            if shard.is_dir():
+                out.extend(e for e in os.scandir(shard.path) if e.name.endswith(".png"))
+        return out
+
+    def _scan_size(self) -> int:
+        return sum(e.stat().st_size for e in self._files())
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """오래 안 쓴 파일부터 지워 max_bytes * target_ratio 아래로. 지운 개수 반환"""
+        entries = []
+        for e in self._files():
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_bytes * target_ratio
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._approx = total
+        return removed
+
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    cache_dir(), getattr(settings, "DIAG_OG_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+                )
+    return _cache
+
+
+def get_image(key: Key, render_missing: bool = True) -> Optional[Tuple[Path, str]]:
+    """(캐시 파일 경로, digest). 렌더 불가면 (render_missing=False 면 캐시에 없어도) None"""
+    if not available():
+        return None
+    digest = _digest(key)
+    if digest is None:
+        return None
+    cache = get_cache()
+    hit = cache.get(digest)
+    if hit is not None:
+        return hit, digest
+    if not render_missing:
+        return None
+    # 같은 키 동시 요청(크롤러 몰림)은 한 번만 렌더
+    with cache.key_lock(digest):
+        hit = cache.get(digest)
+        if hit is not None:
+            return hit, digest
+        try:
+            data = render(key)
+        except Exception as e:
+            logger.error(f"Failed to render OG image {key}: {e}")
+            return None
+        return cache.put(digest, data), digest
+
+
+def open_image(key: Key, render_missing: bool = True) -> Optional[Tuple[BinaryIO, str]]:
+    """(열린 파일, digest). get_image 와 열기 사이에 evict 되면 한 번 더 (다시 렌더)"""
+    for _ in range(2):
+        hit = get_image(key, render_missing)
+        if hit is None:
+            return None
+        try:
+            return open(hit[0], "rb"), hit[1]
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def image_url(key: Key) -> str:
+    code, lang, age, pct = key
+    return f"/og/{code}.png?lang={lang}&age={age}&pct={pct}"
+
+
+def common_keys(limit: int = 500) -> List[Key]:
+    """저장된 진단에서 많이 나온 (code, lang, skin_age, percentile) 조합 순"""
+    from django.db.models import Count
+
+    from .models import DiagnosisResult
+
+    rows = (
+        DiagnosisResult.objects.filter(
+            result_code__isnull=False, skin_age__isnull=False, skin_percentile__isnull=False
+        )
+        .values("result_code", "lang", "skin_age", "skin_percentile")
+        .annotate(n=Count("pk"))
+        .order_by("-n")[:limit]
+    )
+    keys = []
+    for r in rows:
+        key = parse_key(r["result_code"], r["lang"], r["skin_age"], r["skin_percentile"])
+        if key is not None and key not in keys:
+            keys.append(key)
+    return keys
@@ -0,0 +1,270 @@
+# diagnosis/profiling.py
+"""
+운영 디버깅용 요청 단위 프로파일 (opt-in: DIAG_PROFILING=1).
+
+켜는 방법 (요청 하나만):
+  - 헤더 X-Diag-Profile: <DIAG_PROFILING_SECRET> 또는 쿼리 ?_profile=<secret>
+  - staff 로그인 세션(admin 배포)이면 ?_profile=1
+해당 요청만 cProfile + SQL(쿼리문/시간) 기록 → DIAG_PROFILING_DIR 에
+  <이름>.prof (pstats, snakeviz 등으로 열기) + <이름>.json (요청 정보 + SQL) 저장.
+응답에 X-Diag-Profile-Id 헤더. 최근 DIAG_PROFILING_KEEP 개만 유지.
+목록: /admin/diag-profiles/ (staff)
+
+꺼져 있으면 데코레이터는 설정값 확인 한 번만 하고 바로 원래 뷰 호출.
+async 뷰: cProfile 은 이벤트 루프 스레드만 보므로 sync_to_async 안의 DB 작업은 SQL 기록으로 확인.
+"""
+from __future__ import annotations
+
+import cProfile
+import datetime
+import functools
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+HEADER = "HTTP_X_DIAG_PROFILE"
+PARAM = "_profile"
+MAX_SQL = 500  # 요청 하나에서 기록할 최대 쿼리 수
+
+_cprofile_lock = threading.Lock()  # cProfile 은 프로세스에 하나만 활성화 가능
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DIAG_PROFILING", False))
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, "DIAG_PROFILING_DIR", Path(settings.BASE_DIR) / "profiles"))
+
+
+def requested(request) -> bool:
+    token = request.META.get(HEADER) or request.GET.get(PARAM) or ""
+    if not token:
+        return False
+    secret = getattr(settings, "DIAG_PROFILING_SECRET", "")
+    if secret and hmac.compare_digest(token.encode(), secret.encode()):
+        return True
+    user = getattr(request, "user", None)  # API 프로필에는 auth 미들웨어가 없음
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+class SqlRecorder:
+    """connection.execute_wrapper 용. 쿼리문/소요시간/실패 여부"""
+
+    def __init__(self):
+        self.queries: List[Dict] = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        error = None
+        try:
+            return execute(sql, params, many, context)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.total += 1
+            if len(self.queries) < MAX_SQL:
+                self.queries.append({
+                    "sql": sql,
+                    "ms": round((time.perf_counter() - t0) * 1000, 3),
+                    "many": many,
+                    "error": error,
+                })
+
+
+def _new_name(view_name: str) -> str:
+    now = datetime.datetime.now()
+    return f"{now:%Y%m%d-%H%M%S}{now.microsecond // 1000:03d}-{view_name}-{uuid.uuid4().hex[:8]}"
+
+
+def _save(name: str, prof: Optional[cProfile.Profile], meta: Dict) -> None:
+    try:
+        out = profile_dir()
+        out.mkdir(parents=True, exist_ok=True)
+        if prof is not None:
+            prof.dump_stats(str(out / f"{name}.prof"))
+        (out / f"{name}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+        _prune(out, int(getattr(settings, "DIAG_PROFILING_KEEP", 200)))
+    except Exception as e:
+        logger.error(f"Failed to save profile {name}: {e}")
+        logger.error(traceback.format_exc())
+
+
+def _prune(out: Path, keep: int) -> None:
+    metas = sorted(out.glob("*.json"))  # 이름이 시각으로 시작 → 이름순 = 시간순
+    for old in metas[: max(0, len(metas) - keep)]:
+        for p in (old, old.with_suffix(".prof")):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+
+def _path(request) -> str:
+    """기록용 경로. ?_profile=<secret> 은 빼고 (프로파일 파일/목록 페이지로 비밀값이 새지 않게)"""
+    query = request.GET.copy()
+    query.pop(PARAM, None)
+    return f"{request.path}?{query.urlencode()}" if query else request.path
+
+
+def _meta(request, view_name: str, response, wall: float, sql: SqlRecorder, profiled: bool) -> Dict:
+    return {
+        "view": view_name,
+        "method": request.method,
+        "path": _path(request),
+        "status": getattr(response, "status_code", 500),
+        "ms": round(wall * 1000, 3),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "pid": os.getpid(),
+        "cprofile": profiled,
+        "sql_count": sql.total,
+        "sql_ms": round(sum(q["ms"] for q in sql.queries), 3),
+        "sql": sql.queries,
+    }
+
+
+def _run_sync(view, view_name, request, args, kwargs):
+    name = _new_name(view_name)
+    sql = SqlRecorder()
+    # 다른 스레드가 이미 프로파일 중이면 SQL 만 기록
+    prof = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+    response = None
+    t0 = time.perf_counter()
+    try:
+        with connection.execute_wrapper(sql):
+            if prof is not None:
+                prof.enable()
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                if prof is not None:
+                    prof.disable()
+    finally:
+        wall = time.perf_counter() - t0
+        if prof is not None:
+            _cprofile_lock.release()
+        _save(name, prof, _meta(request, view_name, response, wall, sql, prof is not None))
+    response["X-Diag-Profile-Id"] = name
+    return response
+
+
+def _push_wrapper(sql):
+    connection.execute_wrappers.append(sql)
+
+
+def _pop_wrapper(sql):
+    try:
+        connection.execute_wrappers.remove(sql)
+    except ValueError:
+        pass
+
+
+async def _run_async(view, view_name, request, args, kwargs):
+    name = _new_name(view_name)
+    sql = SqlRecorder()
+    # 요청의 sync_to_async(thread_sensitive) 작업은 같은 스레드 → 그 스레드의 connection 에 등록
+    await sync_to_async(_push_wrapper)(sql)
+    prof = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+    response = None
+    t0 = time.perf_counter()
+    try:
+        if prof is not None:
+            prof.enable()
+        try:
+            response = await view(request, *args, **kwargs)
+        finally:
+            if prof is not None:
+                prof.disable()
+    finally:
+        wall = time.perf_counter() - t0
+        if prof is not None:
+            _cprofile_lock.release()
+        await sync_to_async(_pop_wrapper)(sql)
+        await sync_to_async(_save)(name, prof, _meta(request, view_name, response, wall, sql, prof is not None))
+    response["X-Diag-Profile-Id"] = name
+    return response
+
+
+def profiled(view_name: str):
+    """뷰 데코레이터 (sync/async 모두). 꺼져 있으면 설정 확인 한 번"""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if enabled() and requested(request):
+                    return await _run_async(view, view_name, request, args, kwargs)
+                return await view(request, *args, **kwargs)
+        else:
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if enabled() and requested(request):
+                    return _run_sync(view, view_name, request, args, kwargs)
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---- 조회 (admin 페이지) ----
+def _valid_name(name: str) -> bool:
+    return bool(name) and all(ch.isalnum() or ch in "-_" for ch in name)
+
+
+def recent(limit: int = 100) -> List[Dict]:
+    out = profile_dir()
+    if not out.exists():
+        return []
+    items = []
+    for p in sorted(out.glob("*.json"), reverse=True)[:limit]:
+        try:
+            meta = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        meta.pop("sql", None)
+        meta["name"] = p.stem
+        items.append(meta)
+    return items
+
+
+def load(name: str) -> Optional[Dict]:
+    if not _valid_name(name):
+        return None
+    path = profile_dir() / f"{name}.json"
+    try:
+        meta = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    meta["name"] = name
+    return meta
+
+
+def prof_path(name: str) -> Optional[Path]:
+    if not _valid_name(name):
+        return None
+    path = profile_dir() / f"{name}.prof"
+    return path if path.exists() else None
+
+
+def stats_text(name: str, sort: str = "cumulative", limit: int = 40) -> str:
+    path = prof_path(name)
+    if path is None:
+        return ""
+    buf = io.StringIO()
+    pstats.Stats(str(path), stream=buf).strip_dirs().sort_stats(sort).print_stats(limit)
+    return buf.getvalue()
@@ -4,6 +4,12 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import datetime
 
+from . import score_histogram, scoring_lut, scoring_tables
+
+# 아래 표들의 버전. 표를 바꾸면 같이 올려 주세요 (DiagnosisResult.scoring_version 으로 저장됨)
+# 배포 없이 바꾸려면 DIAG_SCORING_TABLES 로 JSON 파일 지정 (scoring_tables.py 참고)
+TABLES_VERSION = "v1"
+
 # === CLASS A / B ===
 A_CATS = ["sensitivity", "oily", "dry", "combination"]
 B_CATS = ["stress", "environment"]
@@ -125,16 +131,40 @@ def _derive_pct_age(total: int, birth_year: Optional[int]) -> Dict[str, int|floa
         "skin_age": skin_age
     }
 
-def compute_result(answers: List[int], birth_year: Optional[int] = None) -> Dict:
-    """
-    answers: 길이 12, 각 1..4 (Q2는 드롭다운이지만 자리 유지. 값은 0 또는 1..4여도 무시)
-    """
+def normalize_answers(answers: List[int]) -> List[int]:
+    """answers 검증 + 정수 변환 (단건/배치 채점 공용)"""
     if not isinstance(answers, list) or len(answers) != 12:
         raise ValueError("answers must be a list of length 12")
     arr = [int(x or 0) for x in answers]
     # 1~4 이외 값은 0으로 간주
     if not all(0 <= x <= 4 for x in arr):
         raise ValueError("answers values must be 0..4")
+    return arr
+
+def compute_result(answers: List[int], birth_year: Optional[int] = None, tables=None,
+                   live_percentile: bool = False) -> Dict:
+    """
+    answers: 길이 12, 각 1..4 (Q2는 드롭다운이지만 자리 유지. 값은 0 또는 1..4여도 무시)
+    tables: scoring_tables.ScoringTables (없으면 현재 로드된 표)
+    live_percentile: True 면 실제 사용자 total_score 분포 기준 백분위도 추가
+      (live_percentile / live_percentile_label, 아직 표본이 없으면 None. score_histogram.py 참고)
+    """
+    arr = normalize_answers(answers)
+    t = tables if tables is not None else scoring_tables.get_tables()
+    lut = scoring_lut.get_lut(t)  # 전체 답안 공간 lookup 파일이 있으면 O(1)
+    res = lut.score(arr, birth_year) if lut is not None else t.score(arr, birth_year)
+    if live_percentile:
+        pct = score_histogram.percentile(res["total_score"], t.version)
+        res["live_percentile"] = pct
+        res["live_percentile_label"] = score_histogram.label_for(pct) if pct is not None else None
+    return res
+
+def compute_result_reference(answers: List[int], birth_year: Optional[int] = None) -> Dict:
+    """
+    위 상수표를 dict 그대로 해석하는 원래 구현 (기준값/동등성 비교용).
+    compute_result 는 컴파일된 표로 같은 결과를 냄.
+    """
+    arr = normalize_answers(answers)
 
     scoreA = {k:0 for k in A_CATS}
     scoreB = {k:0 for k in B_CATS}
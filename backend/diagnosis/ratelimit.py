@@ -0,0 +1,189 @@
+# diagnosis/ratelimit.py
+"""
+쓰기 엔드포인트용 IP 별 token bucket (opt-in: DIAG_RATELIMIT=1).
+
+- 상태는 mmap 한 파일 하나 (기본 /dev/shm) → 같은 호스트의 gunicorn 워커가 모두 공유,
+  네트워크 왕복 없음
+- 슬롯 = blake2b(scope, ip) 로 고른 고정 크기 direct-mapped 테이블.
+  슬롯 하나 = (키 해시, 남은 토큰, 마지막 갱신 시각) 24바이트.
+  다른 키가 같은 슬롯에 오면 새 버킷으로 덮어씀 (그 IP 에게 잠깐 관대해질 뿐, 막지는 않음)
+- 슬롯 단위 fcntl.lockf 로 워커 간 read-modify-write 보호. 판단 비용은 수 µs
+- IP 는 client_ip(): 프록시 DIAG_TRUSTED_PROXY_COUNT 개를 믿고 X-Forwarded-For 의 오른쪽에서 그 번째 값
+  (0 이면 REMOTE_ADDR). 클라이언트가 보낸 X-Forwarded-For 앞부분은 무시 → 헤더 조작으로 버킷을 못 바꿈
+
+한도 형식: "<횟수>/<s|m|h>" (버스트 = 횟수, 그 기간 동안 고르게 다시 참). 빈 값이면 해당 엔드포인트 제한 없음
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+from . import metrics
+from .codec import JsonResponse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 개발 환경: 잠금 없이 동작
+    fcntl = None
+
+_SLOT = struct.Struct("<Qdd")  # key hash, tokens, last (monotonic)
+_PERIODS = {"s": 1.0, "m": 60.0, "h": 3600.0}
+
+DEFAULT_LIMITS = {
+    "result": "30/m",
+    "result_batch": "10/m",
+    "click": "120/m",
+    "click_batch": "60/m",
+    "og_render": "30/m",  # /og/<code>.png 캐시 miss (렌더) 만
+}
+
+metrics.REGISTRY.describe("diag_ratelimited_total", "Requests rejected with 429 by scope")
+
+
+def parse_rate(value: str) -> Optional[Tuple[float, float]]:
+    """'30/m' → (capacity 30, 초당 0.5). 빈 값/0 이면 None (제한 없음)"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    count, _, unit = value.partition("/")
+    n = float(count)
+    if n <= 0:
+        return None
+    period = _PERIODS.get(unit.strip().lower()[:1] or "s")
+    if period is None:
+        raise ValueError(f"invalid rate: {value}")
+    return n, n / period
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DIAG_RATELIMIT", False))
+
+
+def client_ip(request) -> str:
+    """믿는 프록시 수만큼 오른쪽에서 센 X-Forwarded-For 값. 홉이 모자라면 REMOTE_ADDR"""
+    remote = request.META.get("REMOTE_ADDR") or ""
+    proxies = int(getattr(settings, "DIAG_TRUSTED_PROXY_COUNT", 0) or 0)
+    if proxies <= 0:
+        return remote
+    hops = [h.strip() for h in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if h.strip()]
+    if len(hops) < proxies:
+        return remote
+    return hops[-proxies]
+
+
+def _default_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "diag-ratelimit")
+
+
+class SharedBuckets:
+    def __init__(self, path: str, slots: int = 65536):
+        self.path = path
+        self.slots = max(1, int(slots))
+        size = self.slots * _SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+
+    def _slot(self, scope: str, ip: str) -> Tuple[int, int]:
+        h = int.from_bytes(
+            hashlib.blake2b(f"{scope}\0{ip}".encode(), digest_size=8).digest(), "little"
+        )
+        return h, (h % self.slots) * _SLOT.size
+
+    def take(self, scope: str, ip: str, capacity: float, refill: float,
+             cost: float = 1.0) -> float:
+        """토큰 cost 개를 쓰면 0, 부족하면 다시 쓸 수 있을 때까지 남은 초"""
+        key, off = self._slot(scope, ip)
+        now = time.monotonic()
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, _SLOT.size, off)
+        try:
+            k, tokens, last = _SLOT.unpack_from(self._mm, off)
+            if k != key or now < last:
+                tokens = capacity  # 새 키 (또는 재부팅 등으로 시계가 되돌아감)
+            else:
+                tokens = min(capacity, tokens + (now - last) * refill)
+            if tokens >= cost:
+                _SLOT.pack_into(self._mm, off, key, tokens - cost, now)
+                return 0.0
+            _SLOT.pack_into(self._mm, off, key, tokens, now)
+            return (cost - tokens) / refill
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, _SLOT.size, off)
+
+
+_buckets: Optional[SharedBuckets] = None
+_buckets_pid: Optional[int] = None
+_lock = threading.Lock()
+_rates: Dict[str, Optional[Tuple[float, float]]] = {}
+
+
+def get_buckets() -> SharedBuckets:
+    global _buckets, _buckets_pid
+    if _buckets is None or _buckets_pid != os.getpid():
+        with _lock:
+            if _buckets is None or _buckets_pid != os.getpid():
+                _buckets = SharedBuckets(
+                    getattr(settings, "DIAG_RATELIMIT_FILE", "") or _default_path(),
+                    getattr(settings, "DIAG_RATELIMIT_SLOTS", 65536),
+                )
+                _buckets_pid = os.getpid()
+    return _buckets
+
+
+def rate_for(scope: str) -> Optional[Tuple[float, float]]:
+    if scope not in _rates:
+        limits = {**DEFAULT_LIMITS, **(getattr(settings, "DIAG_RATELIMITS", None) or {})}
+        _rates[scope] = parse_rate(limits.get(scope, ""))
+    return _rates[scope]
+
+
+def check(request, scope: str) -> Optional[JsonResponse]:
+    """제한에 걸리면 429 응답, 아니면 None"""
+    if not enabled() or request.method == "OPTIONS":
+        return None
+    rate = rate_for(scope)
+    if rate is None:
+        return None
+    wait = get_buckets().take(scope, client_ip(request) or "-", *rate)
+    if not wait:
+        return None
+    metrics.REGISTRY.inc("diag_ratelimited_total", scope=scope)
+    resp = JsonResponse({"detail": "Too many requests"}, status=429)
+    resp["Retry-After"] = str(max(1, math.ceil(wait)))
+    return resp
+
+
+def limit(scope: str):
+    """뷰 데코레이터 (sync/async 모두)"""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                denied = check(request, scope)
+                if denied is not None:
+                    return denied
+                return await view(request, *args, **kwargs)
+        else:
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                denied = check(request, scope)
+                if denied is not None:
+                    return denied
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,117 @@
+# diagnosis/rescoring.py
+"""
+후보 채점표로 저장된 DiagnosisResult 를 일괄 재채점 (rescore_diagnoses 커맨드).
+
+- pk keyset 페이지네이션으로 (pk, answers, result_code) 만 chunk 단위로 읽음 → 메모리 일정,
+  긴 서버측 커서 없이 중간에 쓰기(shadow upsert)도 안전
+- chunk 하나를 (N, 12) 행렬로 만들어 batch_scoring.score_matrix 로 한 번에 채점
+- 결과: 기존 result_code × 새 result_code 교차표 (+ 선택: DiagnosisRescore 에 upsert)
+- answers 가 형식에 안 맞는 옛 행은 건너뛰고 개수만 셈
+- NumPy 는 rescore() 안에서 import → 없는 환경에서도 모듈 import 는 됨 (커맨드가 CommandError 로 안내)
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from . import quiz_logic
+from .models import DiagnosisRescore, DiagnosisResult
+
+if TYPE_CHECKING:
+    from .batch_scoring import CompiledTables
+
+
+@dataclass
+class RescoreReport:
+    version: str
+    scored: int = 0
+    skipped: int = 0
+    written: int = 0
+    elapsed: float = 0.0
+    # (기존 code, 새 code) → 건수. 코드 없음은 0
+    confusion: Counter = field(default_factory=Counter)
+
+    @property
+    def changed(self) -> int:
+        return sum(n for (old, new), n in self.confusion.items() if old != new)
+
+    def matrix(self) -> Tuple[List[int], List[int], List[List[int]]]:
+        """(행=기존 code 목록, 열=새 code 목록, 건수 2차원 리스트)"""
+        olds = sorted({o for o, _ in self.confusion})
+        news = sorted({n for _, n in self.confusion})
+        return olds, news, [[self.confusion.get((o, n), 0) for n in news] for o in olds]
+
+
+def _valid_rows(rows) -> Tuple[list, list, list]:
+    pks, answers, old_codes = [], [], []
+    for pk, ans, code in rows:
+        try:
+            answers.append(quiz_logic.normalize_answers(ans))
+        except (TypeError, ValueError):
+            continue
+        pks.append(pk)
+        old_codes.append(code or 0)
+    return pks, answers, old_codes
+
+
+def _write_shadow(version: str, pks: list, cols) -> int:
+    codes = cols["code"].tolist()
+    pcts = cols["percentile"].tolist()
+    score_a = cols["score_a"].sum(axis=1).tolist()
+    score_b = cols["score_b"].sum(axis=1).tolist()
+    totals = cols["total_score"].tolist()
+    objs = [
+        DiagnosisRescore(
+            diagnosis_id=pk, scoring_version=version, result_code=codes[i] or None,
+            skin_percentile=pcts[i], score_a=score_a[i], score_b=score_b[i], total_score=totals[i],
+        )
+        for i, pk in enumerate(pks)
+    ]
+    DiagnosisRescore.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=["diagnosis", "scoring_version"],
+        update_fields=["created_at", "result_code", "skin_percentile", "score_a", "score_b", "total_score"],
+    )
+    return len(objs)
+
+
+def rescore(tables: CompiledTables, qs=None, chunk_size: int = 5000,
+            write: bool = False,
+            progress: Optional[Callable[[RescoreReport], None]] = None) -> RescoreReport:
+    """qs(기본: 전체) 의 answers 를 tables 로 재채점. write=True 면 DiagnosisRescore 에 upsert"""
+    import numpy as np
+
+    from . import batch_scoring
+
+    qs = (DiagnosisResult.objects.all() if qs is None else qs).order_by("pk")
+    report = RescoreReport(version=tables.version)
+    started = time.monotonic()
+    last_pk = None
+    while True:
+        page = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+        rows = list(page.values_list("pk", "answers", "result_code")[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        pks, answers, old_codes = _valid_rows(rows)
+        report.skipped += len(rows) - len(pks)
+        if pks:
+            cols = batch_scoring.score_matrix(np.array(answers, dtype=np.int64), None, tables)
+            pairs = np.stack([np.array(old_codes, dtype=np.int64), cols["code"]], axis=1)
+            uniq, counts = np.unique(pairs, axis=0, return_counts=True)
+            for (old, new), n in zip(uniq.tolist(), counts.tolist()):
+                report.confusion[(old, new)] += n
+            report.scored += len(pks)
+            if write:
+                report.written += _write_shadow(tables.version, pks, cols)
+
+        report.elapsed = time.monotonic() - started
+        if progress is not None:
+            progress(report)
+        if len(rows) < chunk_size:
+            break
+    return report
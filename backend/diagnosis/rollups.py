@@ -0,0 +1,255 @@
+# diagnosis/rollups.py
+"""
+시간별 롤업 테이블 (DiagnosisHourlyStat / ClickHourlyStat) 갱신.
+
+- record_diagnoses / record_clicks: 행 저장 직후 증분을 워커 메모리에 합산 (DIAG_ROLLUP_ON_WRITE, DB 접근 없음)
+  → 백그라운드 스레드가 DIAG_ROLLUP_FLUSH_INTERVAL 초마다 키별로 한 번씩 F() 더하기 (종료 시 flush)
+  요청마다 같은 (hour, code, lang) 행을 UPDATE 하지 않음. 통계는 최대 flush 주기만큼 늦음
+- rebuild: 원본 테이블에서 시간 구간을 다시 계산해서 덮어씀 (멱등, rebuild_rollups 커맨드)
+  롤업 표를 잠근 트랜잭션 안에서 집계 + 교체 → 그 사이 flush 는 기다렸다가 새 행에 더함
+"""
+from __future__ import annotations
+
+import atexit
+import datetime
+import logging
+import os
+import threading
+import traceback
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import ButtonClick, ClickHourlyStat, DiagnosisHourlyStat, DiagnosisResult
+
+logger = logging.getLogger(__name__)
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DIAG_ROLLUP_ON_WRITE", True))
+
+
+def truncate_hour(dt: datetime.datetime) -> datetime.datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert_add(model, key: Dict, incr: Dict[str, int]) -> None:
+    """key 행에 incr 을 더함. 없으면 생성 (동시 생성 충돌 시 다시 update)"""
+    updates = {f: F(f) + v for f, v in incr.items()}
+    with transaction.atomic():
+        if model.objects.filter(**key).update(**updates):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**key, **incr)
+            return
+        except IntegrityError:
+            pass
+        model.objects.filter(**key).update(**updates)
+
+
+def _safe(fn):
+    def wrapper(rows):
+        if not enabled():
+            return
+        try:
+            fn(rows)
+        except Exception as e:
+            # 롤업 실패가 원본 저장/응답을 막으면 안 됨 → rebuild_rollups 로 복구
+            logger.error(f"Failed to update rollup: {e}")
+            logger.error(traceback.format_exc())
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+# ---- 워커 메모리 누적 + 주기적 flush ----
+BufferKey = Tuple[type, Tuple[Tuple[str, object], ...]]
+
+
+class RollupBuffer:
+    def __init__(self, flush_interval: float = 5.0):
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.Lock()
+        self._pending: Dict[BufferKey, Dict[str, int]] = {}
+        self._stop = threading.Event()
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, model, key: Dict, incr: Dict[str, int]) -> None:
+        self._ensure_started()
+        with self._lock:
+            self._merge(self._pending, (model, tuple(sorted(key.items()))), incr)
+
+    @staticmethod
+    def _merge(dst: Dict[BufferKey, Dict[str, int]], k: BufferKey, incr: Dict[str, int]) -> None:
+        cur = dst.get(k)
+        if cur is None:
+            dst[k] = dict(incr)
+        else:
+            for f, v in incr.items():
+                cur[f] = cur.get(f, 0) + v
+
+    def _ensure_started(self) -> None:
+        # gunicorn --preload fork 후에는 스레드가 없으므로 pid 로 확인
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pending.clear()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="diag-rollup-flush", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        from django.db import close_old_connections
+
+        try:
+            while not self._stop.wait(self.flush_interval):
+                close_old_connections()  # DB 가 끊은 연결이면 새로 연결
+                self.flush()
+        finally:
+            connection.close()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        failed = {}
+        for (model, key), incr in pending.items():
+            try:
+                _upsert_add(model, dict(key), incr)
+            except Exception as e:
+                logger.error(f"Failed to flush rollup {model.__name__} {dict(key)}: {e}")
+                logger.error(traceback.format_exc())
+                failed[(model, key)] = incr
+        if failed:
+            # 다음 주기에 다시 시도
+            with self._lock:
+                for k, incr in failed.items():
+                    self._merge(self._pending, k, incr)
+        return len(pending) - len(failed)
+
+    def flush_and_stop(self) -> None:
+        self._stop.set()
+        if self._pid == os.getpid():
+            self.flush()
+
+
+_buffer: Optional[RollupBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> RollupBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = RollupBuffer(getattr(settings, "DIAG_ROLLUP_FLUSH_INTERVAL", 5.0))
+                atexit.register(_buffer.flush_and_stop)
+    return _buffer
+
+
+@_safe
+def record_diagnoses(rows: Iterable[DiagnosisResult]) -> None:
+    """저장 완료된 DiagnosisResult 들을 시간별 롤업 증분에 추가 (메모리만)"""
+    groups: Dict[Tuple, Dict[str, int]] = defaultdict(
+        lambda: {"count": 0, "sum_total_score": 0, "sum_skin_age": 0, "skin_age_count": 0}
+    )
+    for r in rows:
+        created = r.created_at or timezone.now()
+        g = groups[(truncate_hour(created), r.result_code or 0, r.lang)]
+        g["count"] += 1
+        g["sum_total_score"] += int(r.total_score or 0)
+        if r.skin_age is not None:
+            g["sum_skin_age"] += int(r.skin_age)
+            g["skin_age_count"] += 1
+    buf = get_buffer() if groups else None
+    for (hour, code, lang), incr in groups.items():
+        buf.add(DiagnosisHourlyStat, {"hour": hour, "result_code": code, "lang": lang}, incr)
+
+
+@_safe
+def record_clicks(rows: Iterable[ButtonClick]) -> None:
+    """저장 완료된 ButtonClick 들을 시간별 롤업 증분에 추가 (메모리만)"""
+    groups: Dict[Tuple, int] = defaultdict(int)
+    for r in rows:
+        created = r.created_at or timezone.now()
+        groups[(truncate_hour(created), r.button_key, r.lang)] += 1
+    buf = get_buffer() if groups else None
+    for (hour, key, lang), n in groups.items():
+        buf.add(ClickHourlyStat, {"hour": hour, "button_key": key, "lang": lang}, {"count": n})
+
+
+def _lock_tables(*models) -> None:
+    """트랜잭션 끝까지 롤업 표 쓰기를 막음 (PostgreSQL). SQLite 는 첫 쓰기에서 DB 전체 잠금"""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f'LOCK TABLE "{model._meta.db_table}" IN SHARE ROW EXCLUSIVE MODE')
+
+
+def rebuild(since: datetime.datetime, until: datetime.datetime) -> Tuple[int, int]:
+    """
+    [since, until) 를 시간 단위로 원본에서 다시 집계해 덮어씀. (진단 행 수, 클릭 행 수) 반환
+    잠금 → 삭제 → 집계 → 삽입을 한 트랜잭션에서 (그 사이 다른 워커의 flush 는 대기 후 새 행에 더함).
+    워커 메모리에 아직 flush 안 된 증분(최대 flush 주기 분량)은 반영 후 다시 더해질 수 있으므로
+    진행 중인 시간보다는 지난 구간을 다시 계산하는 용도
+    """
+    since = truncate_hour(since)
+    if truncate_hour(until) != until:
+        until = truncate_hour(until) + datetime.timedelta(hours=1)
+    rng = {"created_at__gte": since, "created_at__lt": until}
+    hour_rng = {"hour__gte": since, "hour__lt": until}
+    if _buffer is not None:
+        _buffer.flush()
+
+    with transaction.atomic():
+        _lock_tables(DiagnosisHourlyStat, ClickHourlyStat)
+        DiagnosisHourlyStat.objects.filter(**hour_rng).delete()
+        ClickHourlyStat.objects.filter(**hour_rng).delete()
+
+        diag_rows = (
+            DiagnosisResult.objects.filter(**rng)
+            .annotate(hour=TruncHour("created_at"))
+            .values("hour", "result_code", "lang")
+            .annotate(
+                count=Count("id"),
+                sum_total_score=Sum("total_score"),
+                sum_skin_age=Sum("skin_age"),
+                skin_age_count=Count("id", filter=Q(skin_age__isnull=False)),
+            )
+            .order_by()
+        )
+        # result_code None / 0 은 같은 버킷
+        merged: Dict[Tuple, Dict[str, int]] = defaultdict(
+            lambda: {"count": 0, "sum_total_score": 0, "sum_skin_age": 0, "skin_age_count": 0}
+        )
+        for r in diag_rows:
+            g = merged[(r["hour"], r["result_code"] or 0, r["lang"])]
+            for f in g:
+                g[f] += int(r[f] or 0)
+        diag_objs = [
+            DiagnosisHourlyStat(hour=h, result_code=c, lang=l, **v) for (h, c, l), v in merged.items()
+        ]
+
+        click_objs = [
+            ClickHourlyStat(hour=r["hour"], button_key=r["button_key"], lang=r["lang"], count=r["count"])
+            for r in (
+                ButtonClick.objects.filter(**rng)
+                .annotate(hour=TruncHour("created_at"))
+                .values("hour", "button_key", "lang")
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+        ]
+
+        DiagnosisHourlyStat.objects.bulk_create(diag_objs, batch_size=500)
+        ClickHourlyStat.objects.bulk_create(click_objs, batch_size=500)
+    return len(diag_objs), len(click_objs)
@@ -0,0 +1,310 @@
+# diagnosis/score_histogram.py
+"""
+total_score 실측 분포 → 실제 사용자 기준 백분위 (compute_result(..., live_percentile=True)).
+
+- total_score 는 작은 정수 범위 → 워커 메모리에 (채점표 버전, 점수) 별 개수만 모음 (저장 직후, DB 접근 없음)
+- 공유 표 ScoreHistogramBin (버전 × 점수 1행). 백그라운드 스레드가 DIAG_SCORE_HISTOGRAM_SYNC_INTERVAL 초마다
+  이 워커의 증분을 F() 로 더하고, 현재 채점표 버전의 분포 전체를 다시 읽어 점수 → 백분위 표를 새로 만듦
+- 조회는 그 표에서 dict 조회 한 번 (O(1)). 다른 워커/이 워커의 저장 모두 최대 sync 주기만큼 늦게 반영
+- 버전별 시드 기준 시각 ScoreHistogramSeed.cutoff: created_at < cutoff 인 진단은 원본 GROUP BY 로 한 번에,
+  그 뒤 진단은 워커 증분으로만 셈 → 두 번 세지 않음. 시드가 없는 버전은 처음 동기화하는 워커가 만듦
+  (배포/채점표 교체 직후에도 다음 동기화부터 백분위 제공). cutoff 직전에 아직 커밋 안 된 몇 건은 빠질 수 있음
+- 워커 첫 사용 시 바로 한 번 동기화 (그 전 요청은 None)
+- 기본값: DIAG_LIVE_PERCENTILE 을 켰을 때만 모음 (DIAG_SCORE_HISTOGRAM 으로 따로 켜고 끌 수 있음)
+- 표본이 DIAG_LIVE_PERCENTILE_MIN_SAMPLES 미만이거나 마지막 동기화가 MAX_STALENESS 초보다 오래되면 None
+- 백분위 = 점수가 더 높은 비율 + 같은 점수 비율의 절반 (상위 기준 숫자, PCT_AGE_TABLE 의 percentile 과 같은 방향)
+- 어긋났으면 `manage.py rebuild_score_histogram` 으로 원본에서 다시 계산 (새 cutoff 로 시드를 다시 씀)
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import scoring_tables
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, int]  # (scoring_version, total_score)
+PendingKey = Tuple[str, int, datetime]  # + created_at (시드 cutoff 와 비교)
+
+
+def enabled() -> bool:
+    return settings.configured and bool(getattr(settings, "DIAG_SCORE_HISTOGRAM", False))
+
+
+def live_enabled() -> bool:
+    """결과 응답에 live_percentile 포함 여부"""
+    return enabled() and bool(getattr(settings, "DIAG_LIVE_PERCENTILE", False))
+
+
+def percentiles(counts: Dict[int, int]) -> Dict[int, int]:
+    """{total_score: 개수} → {total_score: 상위 기준 백분위(1~99)}. 최소~최대 사이 빈 점수도 채움"""
+    n = sum(counts.values())
+    if not n:
+        return {}
+    out = {}
+    above = 0
+    for total in range(max(counts), min(counts) - 1, -1):
+        c = counts.get(total, 0)
+        out[total] = min(99, max(1, round((above + c / 2) * 100 / n)))
+        above += c
+    return out
+
+
+def label_for(percentile: int) -> str:
+    return f"상위 {percentile}%" if percentile <= 50 else f"하위 {100 - percentile}%"
+
+
+class _View:
+    """동기화 시점의 분포 (통째로 교체 → 조회 스레드는 잠금 없이 읽음)"""
+
+    __slots__ = ("version", "samples", "table", "lo", "hi", "synced_at")
+
+    def __init__(self, version: str, counts: Dict[int, int]):
+        self.version = version
+        self.samples = sum(counts.values())
+        self.table = percentiles(counts)
+        self.lo = min(self.table) if self.table else 0
+        self.hi = max(self.table) if self.table else 0
+        self.synced_at = time.monotonic()
+
+    def lookup(self, total: int) -> int:
+        if total > self.hi:
+            return 1
+        if total < self.lo:
+            return 99
+        return self.table[total]
+
+
+# ---- 워커 메모리 누적 + 주기적 동기화 ----
+class LiveHistogram:
+    def __init__(self, sync_interval: float = 30.0):
+        self.sync_interval = float(sync_interval)
+        self._lock = threading.Lock()
+        self._pending: Dict[PendingKey, int] = defaultdict(int)
+        self._view: Optional[_View] = None
+        self._stop = threading.Event()
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, version: str, total: int, created_at: datetime, n: int = 1) -> None:
+        self._ensure_started()
+        with self._lock:
+            self._pending[(version, int(total), created_at)] += n
+
+    def percentile(self, total: int, version: str) -> Optional[int]:
+        self._ensure_started()
+        view = self._view
+        if view is None or view.version != version:
+            return None
+        if view.samples < int(getattr(settings, "DIAG_LIVE_PERCENTILE_MIN_SAMPLES", 1000)):
+            return None
+        max_staleness = float(getattr(settings, "DIAG_LIVE_PERCENTILE_MAX_STALENESS", 600))
+        if time.monotonic() - view.synced_at > max_staleness:
+            return None
+        return view.lookup(int(total))
+
+    def _ensure_started(self) -> None:
+        # gunicorn --preload fork 후에는 스레드가 없으므로 pid 로 확인
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pending.clear()
+            self._view = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="diag-score-histogram", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        from django.db import close_old_connections, connection
+
+        try:
+            self.sync()  # 시작 시 바로 한 번
+            while not self._stop.wait(self.sync_interval):
+                close_old_connections()  # DB 가 끊은 연결이면 새로 연결
+                self.sync()
+        finally:
+            connection.close()
+
+    def sync(self, reload: bool = True) -> bool:
+        """
+        시드 cutoff 이후 진단의 증분만 공유 표에 더하고 (reload 면) 현재 버전 분포를 다시 읽음. 실패하면 False
+        (cutoff 이전 진단은 시드가 이미 셌으므로 버림)
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        try:
+            version = scoring_tables.get_tables().version
+            versions = {v for v, _, _ in pending}
+            if reload:
+                versions.add(version)
+            with transaction.atomic():
+                cutoffs = _cutoffs(versions)
+                deltas: Dict[Key, int] = defaultdict(int)
+                for (v, total, created_at), n in pending.items():
+                    if created_at >= cutoffs[v]:
+                        deltas[(v, total)] += n
+                for key, n in deltas.items():
+                    _add_to_db(key, n)
+            pending = {}
+            if reload:
+                self._view = _View(version, load(version))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to sync score histogram: {e}")
+            logger.error(traceback.format_exc())
+            # 못 더한 증분은 다음 주기에 다시
+            with self._lock:
+                for key, n in pending.items():
+                    self._pending[key] += n
+            return False
+
+    def flush_and_stop(self) -> None:
+        self._stop.set()
+        if self._pid == os.getpid():
+            self.sync(reload=False)
+
+
+def _cutoffs(versions: Set[str]) -> Dict[str, datetime]:
+    """버전별 시드 cutoff. 시드가 없는 버전은 지금 시각으로 시드 (트랜잭션 안에서 호출)"""
+    from .models import ScoreHistogramSeed
+
+    # 행 잠금 → 동시에 rebuild 가 cutoff 를 바꾸면 둘 중 하나가 기다림
+    out = dict(
+        ScoreHistogramSeed.objects.select_for_update()
+        .filter(scoring_version__in=versions)
+        .values_list("scoring_version", "cutoff")
+    )
+    for version in versions - out.keys():
+        out[version] = _seed(version)
+    return out
+
+
+def _seed(version: str) -> datetime:
+    """version 의 시드가 없으면 만들고 cutoff 이전 원본으로 분포를 채움. 이미 있으면 (다른 워커) 그 cutoff"""
+    from .models import ScoreHistogramSeed
+
+    with transaction.atomic():
+        seed, created = ScoreHistogramSeed.objects.get_or_create(
+            scoring_version=version, defaults={"cutoff": timezone.now()}
+        )
+        if created:
+            _replace_bins(version, seed.cutoff)
+    return seed.cutoff
+
+
+def _add_to_db(key: Key, n: int) -> None:
+    from .models import ScoreHistogramBin
+    from .rollups import _upsert_add
+
+    version, total = key
+    _upsert_add(ScoreHistogramBin, {"scoring_version": version, "total_score": total}, {"count": n})
+
+
+def load(version: str) -> Dict[int, int]:
+    """공유 표의 version 분포 {total_score: 개수}"""
+    from .models import ScoreHistogramBin
+
+    return dict(
+        ScoreHistogramBin.objects.filter(scoring_version=version, count__gt=0)
+        .values_list("total_score", "count")
+    )
+
+
+def _source_counts(version: str, before: datetime) -> Dict[int, int]:
+    from django.db.models import Count
+
+    from .models import DiagnosisResult
+
+    rows = (
+        DiagnosisResult.objects.filter(total_score__isnull=False, scoring_version=version, created_at__lt=before)
+        .values("total_score").annotate(n=Count("pk")).order_by()
+    )
+    return {r["total_score"]: r["n"] for r in rows}
+
+
+def _replace_bins(version: str, cutoff: datetime) -> int:
+    """version 의 분포를 created_at < cutoff 원본 집계로 교체. bin 수 반환"""
+    from .models import ScoreHistogramBin
+
+    objs = [
+        ScoreHistogramBin(scoring_version=version, total_score=t, count=n)
+        for t, n in _source_counts(version, cutoff).items()
+    ]
+    ScoreHistogramBin.objects.filter(scoring_version=version).delete()
+    ScoreHistogramBin.objects.bulk_create(objs, batch_size=500)
+    return len(objs)
+
+
+def rebuild(version: Optional[str] = None) -> int:
+    """
+    원본 DiagnosisResult 에서 분포를 다시 계산해 덮어씀 (version 없으면 전체). bin 수 반환
+    시드 cutoff 를 지금으로 바꿈 → 워커들이 아직 안 더한 증분 중 그 이전 진단은 버려져 겹치지 않음
+    """
+    from .models import DiagnosisResult, ScoreHistogramBin, ScoreHistogramSeed
+
+    if version is not None:
+        versions = {version}
+    else:
+        versions = set(DiagnosisResult.objects.filter(total_score__isnull=False)
+                       .values_list("scoring_version", flat=True).distinct())
+        versions |= set(ScoreHistogramBin.objects.values_list("scoring_version", flat=True).distinct())
+        versions |= set(ScoreHistogramSeed.objects.values_list("scoring_version", flat=True))
+    cutoff = timezone.now()
+    n = 0
+    with transaction.atomic():
+        for v in sorted(versions):
+            ScoreHistogramSeed.objects.update_or_create(scoring_version=v, defaults={"cutoff": cutoff})
+            n += _replace_bins(v, cutoff)
+    return n
+
+
+_histogram: Optional[LiveHistogram] = None
+_histogram_lock = threading.Lock()
+
+
+def get_histogram() -> LiveHistogram:
+    global _histogram
+    if _histogram is None:
+        with _histogram_lock:
+            if _histogram is None:
+                _histogram = LiveHistogram(getattr(settings, "DIAG_SCORE_HISTOGRAM_SYNC_INTERVAL", 30.0))
+                atexit.register(_histogram.flush_and_stop)
+    return _histogram
+
+
+def record_diagnoses(rows: Iterable) -> None:
+    """저장 완료된 DiagnosisResult 들의 total_score 를 분포에 추가 (메모리만, DB 접근 없음)"""
+    if not enabled():
+        return
+    try:
+        hist = None
+        for r in rows:
+            if r.total_score is None:
+                continue
+            hist = hist or get_histogram()
+            hist.add(r.scoring_version or "", r.total_score, r.created_at or timezone.now())
+    except Exception as e:
+        logger.error(f"Failed to record score histogram: {e}")
+        logger.error(traceback.format_exc())
+
+
+def percentile(total: int, version: str) -> Optional[int]:
+    """version 분포에서 total 의 상위 기준 백분위. 아직 모르면 None"""
+    if not enabled():
+        return None
+    return get_histogram().percentile(total, version)
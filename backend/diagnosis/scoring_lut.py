@@ -0,0 +1,211 @@
+# diagnosis/scoring_lut.py
+"""
+채점표 하나에 대한 전체 답안 공간 lookup 파일 (opt-in: DIAG_SCORING_LUT_DIR).
+
+가점이 하나도 없는 문항(Q1, Q2, Q9)은 결과에 영향이 없으므로 빼고,
+나머지 문항의 보기(0..4)를 mixed-radix 로 묶은 키 하나 → 고정 길이 레코드 하나.
+v1 기준 5^9 = 1,953,125 레코드.
+
+파일: <DIAG_SCORING_LUT_DIR>/<version>-<fingerprint 앞 16자>.lut
+  b"DIAGLUT1" | uint32 메타 길이 | 메타 JSON | 8바이트 정렬 패딩 | 레코드 × count
+  레코드 (little-endian, 패딩 없음): a_idx, b_idx (int8, 없으면 -1), code (int16, 없으면 0),
+  total_score (int16), A 카테고리별 점수, B 카테고리별 점수 (uint8 또는 int16)
+
+- 빌드: `manage.py build_scoring_lut` (NumPy 배치 채점으로 한 번에 계산)
+- 조회: mmap(ACCESS_READ) + struct.unpack_from → 워커들이 OS 페이지 캐시를 공유하고
+  워커별로 따로 올리는 메모리 없음. 조회 자체는 NumPy 불필요
+- 파일의 fingerprint 가 현재 채점표와 다르거나 파일이 없으면 None → compute_result 는 기존 경로
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from . import scoring_tables
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DIAGLUT1"
+N_OPT = scoring_tables.N_OPT
+
+
+def _pad(n: int) -> int:
+    return (-n) % 8
+
+
+def lut_dir() -> str:
+    if not settings.configured:
+        return ""
+    return str(getattr(settings, "DIAG_SCORING_LUT_DIR", "") or "")
+
+
+def file_name(tables: scoring_tables.ScoringTables) -> str:
+    return f"{tables.version}-{tables.fingerprint[:16]}.lut"
+
+
+def relevant_questions(tables: scoring_tables.ScoringTables) -> List[int]:
+    """가점이 있는 문항 (0-based). 키 순서 = 이 순서 (앞 문항이 상위 자리)"""
+    empty = ((), (), 0)
+    return [q for q, row in enumerate(tables.cells) if any(cell != empty for cell in row)]
+
+
+class ScoringLut:
+    def __init__(self, path: str, tables: scoring_tables.ScoringTables):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        if mm[:8] != MAGIC:
+            raise ValueError("bad magic")
+        (meta_len,) = struct.unpack_from("<I", mm, 8)
+        meta = json.loads(mm[12:12 + meta_len].decode("utf-8"))
+        if meta.get("fingerprint") != tables.fingerprint:
+            raise ValueError("fingerprint mismatch (built from other tables)")
+
+        self.tables = tables
+        self.path = path
+        self._fmt = struct.Struct(meta["fmt"])
+        self._offset = 12 + meta_len + _pad(12 + meta_len)
+        self._keys: List[Tuple[int, int]] = list(zip(meta["questions"], meta["strides"]))
+        self.count = meta["count"]
+        if len(mm) != self._offset + self.count * self._fmt.size:
+            raise ValueError("truncated file")
+        self._n_a = len(tables.a_cats)
+
+    def key(self, arr: List[int]) -> int:
+        k = 0
+        for q, stride in self._keys:
+            k += arr[q] * stride
+        return k
+
+    def score(self, arr: List[int], birth_year=None) -> Dict:
+        """검증된 answers(정수 12개) → compute_result 결과 dict (ScoringTables.score 와 동일)"""
+        t = self.tables
+        a, b, code, total, *scores = self._fmt.unpack_from(
+            self._mm, self._offset + self.key(arr) * self._fmt.size
+        )
+        pct, label, delta = t.pct_for(total)
+        n_a = self._n_a
+        return {
+            "a_type": t.a_cats[a] if a >= 0 else None,
+            "b_type": t.b_cats[b] if b >= 0 else None,
+            "code": code or None,
+            "scores": {"A": dict(zip(t.a_cats, scores[:n_a])), "B": dict(zip(t.b_cats, scores[n_a:]))},
+            "total_score": total,
+            "percentile": pct,
+            "percentile_label": label,
+            "skin_age": scoring_tables.skin_age_for(birth_year, delta),
+        }
+
+
+# ---- 워커별 캐시 (표 객체 1개당 1번만 파일 확인) ----
+_lock = threading.Lock()
+_cached: Tuple[Optional[scoring_tables.ScoringTables], Optional[ScoringLut]] = (None, None)
+
+
+def get_lut(tables: scoring_tables.ScoringTables) -> Optional[ScoringLut]:
+    """tables 용 lookup 파일. 꺼져 있거나 없거나 맞지 않으면 None"""
+    global _cached
+    cached_tables, lut = _cached
+    if cached_tables is tables:
+        return lut
+    base = lut_dir()
+    if not base:
+        return None
+    with _lock:
+        if _cached[0] is tables:
+            return _cached[1]
+        path = os.path.join(base, file_name(tables))
+        lut = None
+        if os.path.exists(path):
+            try:
+                lut = ScoringLut(path, tables)
+            except Exception as e:
+                logger.error(f"Failed to open scoring lut {path}: {e}")
+        else:
+            logger.warning(f"scoring lut not found for {tables.version}: {path} (run build_scoring_lut)")
+        _cached = (tables, lut)
+        return lut
+
+
+def reset() -> None:
+    global _cached
+    with _lock:
+        _cached = (None, None)
+
+
+# ---- 빌드 (NumPy 필요) ----
+def build(tables: scoring_tables.ScoringTables, out_dir: Optional[str] = None,
+          chunk_size: int = 5 ** 7) -> Path:
+    """tables 의 전체 답안 공간을 채점해서 lut 파일로 저장 (임시파일 → rename). 경로 반환"""
+    import numpy as np
+
+    from . import batch_scoring
+
+    compiled = batch_scoring.compile_tables(tables)
+    questions = relevant_questions(tables)
+    strides = [N_OPT ** (len(questions) - 1 - i) for i in range(len(questions))]
+    count = N_OPT ** len(questions)
+
+    # 점수 범위에 맞춰 레코드 폭 결정 (v1 은 전부 uint8)
+    max_per_q_a = compiled.w_a.max(axis=1).sum(axis=0)
+    max_per_q_b = compiled.w_b.max(axis=1).sum(axis=0)
+    min_a = compiled.w_a.min(axis=1).sum(axis=0)
+    min_b = compiled.w_b.min(axis=1).sum(axis=0)
+    small = min(min_a.min(), min_b.min()) >= 0 and max(max_per_q_a.max(), max_per_q_b.max()) <= 255
+    score_code, score_dt = ("B", "u1") if small else ("h", "<i2")
+    n_a, n_b = len(tables.a_cats), len(tables.b_cats)
+    fmt = "<bbhh" + score_code * (n_a + n_b)
+    dtype = np.dtype(
+        [("a", "i1"), ("b", "i1"), ("code", "<i2"), ("total", "<i2")]
+        + [(f"sa{i}", score_dt) for i in range(n_a)]
+        + [(f"sb{i}", score_dt) for i in range(n_b)]
+    )
+    assert dtype.itemsize == struct.calcsize(fmt)
+
+    meta = {
+        "version": tables.version,
+        "fingerprint": tables.fingerprint,
+        "questions": questions,
+        "strides": strides,
+        "fmt": fmt,
+        "count": count,
+    }
+    blob = json.dumps(meta).encode("utf-8")
+    header = MAGIC + struct.pack("<I", len(blob)) + blob
+    header += b"\0" * _pad(len(header))
+
+    out = Path(out_dir or lut_dir())
+    out.mkdir(parents=True, exist_ok=True)
+    final = out / file_name(tables)
+    tmp = final.with_name(final.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for start in range(0, count, chunk_size):
+            keys = np.arange(start, min(start + chunk_size, count), dtype=np.int64)
+            answers = np.zeros((keys.shape[0], scoring_tables.N_Q), dtype=np.int64)
+            for q, stride in zip(questions, strides):
+                answers[:, q] = (keys // stride) % N_OPT
+            cols = batch_scoring.score_matrix(answers, None, compiled)
+            total = cols["total_score"]
+            if total.min() < -32768 or total.max() > 32767:
+                raise ValueError("total_score does not fit in int16")
+            rec = np.empty(keys.shape[0], dtype=dtype)
+            rec["a"], rec["b"] = cols["a_idx"], cols["b_idx"]
+            rec["code"], rec["total"] = cols["code"], total
+            for i in range(n_a):
+                rec[f"sa{i}"] = cols["score_a"][:, i]
+            for i in range(n_b):
+                rec[f"sb{i}"] = cols["score_b"][:, i]
+            f.write(rec.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, final)
+    return final
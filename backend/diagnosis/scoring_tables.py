@@ -0,0 +1,341 @@
+# diagnosis/scoring_tables.py
+"""
+버전이 붙은 채점표 (가중치/임계값/결과코드/백분위표) 로드·검증·컴파일.
+
+- 기본값: quiz_logic.py 의 상수 (version = quiz_logic.TABLES_VERSION)
+- DIAG_SCORING_TABLES=<json 경로> 를 주면 그 파일을 사용하고,
+  파일이 바뀌면 (DIAG_SCORING_RELOAD_INTERVAL 초마다 mtime 확인) 새로 컴파일해서 통째로 교체
+  → 배포/워커 재시작 없이 가중치 변경. 잘못된 파일이면 에러 로그만 남기고 이전 표 유지
+- 같은 version 인데 내용이 다른 표는 거부 (저장된 scoring_version/히스토그램/rescore 가 버전으로 묶여 있음)
+- Django 설정 없이 (스크립트/노트북) 쓰면 내장 표
+- 컴파일 결과는 (문항, 보기) → 가점 목록, total_score → (percentile, label, delta) 배열 등
+  평평한 lookup 이라 compute_result 에서 dict 해석/선형 탐색이 없음
+
+JSON 형식 (diagnosis/scoring_tables_data/v1.json 참고, manage.py scoring_tables --dump 로 생성):
+{
+  "version": "v1",
+  "a_cats": [...], "b_cats": [...],
+  "th_a": {cat: int}, "th_b": {cat: int},
+  "result_map": [[a_cat, b_cat, code], ...],
+  "weights": {"3": {"1": {"A": {"oily": 2}}, ...}, ...},
+  "pct_age_table": [[low, high, label, delta], ...],
+  "pct_default": [label, delta]
+}
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+N_Q = 12
+N_OPT = 5  # 보기 0..4 (0 = 무응답)
+MAX_CAT_LEN = 16  # DiagnosisResult.a_type / b_type max_length
+
+
+class ScoringTablesError(ValueError):
+    pass
+
+
+def _label_percentile(label: str) -> int:
+    # "상위/하위 XX%" → 정수 퍼센트 (quiz_logic._derive_pct_age 와 같은 규칙)
+    m = re.search(r"(\d+)%", label)
+    pct = int(m.group(1)) if m else 50
+    return pct if ("상위" in label) else (100 - pct)
+
+
+def skin_age_for(birth_year, delta: float) -> Optional[int]:
+    if not birth_year:
+        return None
+    try:
+        real_age = max(0, datetime.date.today().year - int(birth_year))
+        return round(real_age * (1.0 + delta))
+    except Exception:
+        return None
+
+
+@dataclass(frozen=True)
+class ScoringTables:
+    version: str
+    raw: dict  # 검증된 원본 (batch_scoring 등 다른 컴파일러용)
+    a_cats: Tuple[str, ...]
+    b_cats: Tuple[str, ...]
+    th_a: Tuple[int, ...]
+    th_b: Tuple[int, ...]
+    result_map: Dict[Tuple[str, str], int]
+    # cells[q][ans] = (A 가점 [(idx, v)], B 가점 [(idx, v)], T 가점 합)
+    cells: Tuple[Tuple[Tuple[tuple, tuple, int], ...], ...]
+    # pct_by_total[total] = (percentile, label, delta), 범위 밖은 pct_default
+    pct_by_total: Tuple[Tuple[int, str, float], ...]
+    pct_default: Tuple[int, str, float]
+
+    def pct_for(self, total: int) -> Tuple[int, str, float]:
+        if 0 <= total < len(self.pct_by_total):
+            return self.pct_by_total[total]
+        return self.pct_default
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """표 내용 해시 (scoring_lut 파일이 이 표로 만든 것인지 확인용)"""
+        blob = json.dumps(self.raw, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pick(scores: List[int], th: Tuple[int, ...], cats: Tuple[str, ...]) -> Optional[str]:
+        # 임계값 이상 중 최고점, 동점이면 앞 순서 (quiz_logic._pick 과 동일)
+        best = -1
+        for i, s in enumerate(scores):
+            if s >= th[i] and (best < 0 or s > scores[best]):
+                best = i
+        return cats[best] if best >= 0 else None
+
+    def score(self, arr: List[int], birth_year=None) -> Dict:
+        """검증된 answers(정수 12개) → compute_result 결과 dict"""
+        sa = [0] * len(self.a_cats)
+        sb = [0] * len(self.b_cats)
+        total_score = 0
+        for q, ans in enumerate(arr):
+            a_add, b_add, t_add = self.cells[q][ans]
+            for i, v in a_add:
+                sa[i] += v
+            for i, v in b_add:
+                sb[i] += v
+            total_score += t_add
+
+        a_type = self._pick(sa, self.th_a, self.a_cats)
+        b_type = self._pick(sb, self.th_b, self.b_cats)
+        code = self.result_map.get((a_type, b_type)) if (a_type and b_type) else None
+
+        total_score += sum(sa) + sum(sb)
+        pct, label, delta = self.pct_for(total_score)
+
+        return {
+            "a_type": a_type,
+            "b_type": b_type,
+            "code": code,
+            "scores": {"A": dict(zip(self.a_cats, sa)), "B": dict(zip(self.b_cats, sb))},
+            "total_score": total_score,
+            "percentile": pct,
+            "percentile_label": label,
+            "skin_age": skin_age_for(birth_year, delta),
+        }
+
+
+# ---- 검증 + 컴파일 ----
+def _int(v, what: str) -> int:
+    if isinstance(v, bool) or not isinstance(v, int):
+        raise ScoringTablesError(f"{what} must be an integer")
+    return v
+
+
+def compile_tables(raw: dict) -> ScoringTables:
+    if not isinstance(raw, dict):
+        raise ScoringTablesError("tables must be an object")
+    version = raw.get("version")
+    if not isinstance(version, str) or not version or len(version) > 32:
+        raise ScoringTablesError("version must be a non-empty string (max 32)")
+
+    a_cats = tuple(raw.get("a_cats") or ())
+    b_cats = tuple(raw.get("b_cats") or ())
+    if not a_cats or not b_cats or len(set(a_cats)) != len(a_cats) or len(set(b_cats)) != len(b_cats):
+        raise ScoringTablesError("a_cats/b_cats must be non-empty unique lists")
+    for cat in a_cats + b_cats:
+        if not isinstance(cat, str) or not cat or len(cat) > MAX_CAT_LEN:
+            raise ScoringTablesError(f"category names must be non-empty strings (max {MAX_CAT_LEN}): {cat!r}")
+
+    def thresholds(key, cats):
+        th = raw.get(key) or {}
+        unknown = set(th) - set(cats)
+        if unknown:
+            raise ScoringTablesError(f"{key}: unknown categories {sorted(unknown)}")
+        # 임계값 없는 카테고리는 선택 불가
+        return tuple(_int(th[c], f"{key}.{c}") if c in th else 10**9 for c in cats)
+
+    th_a = thresholds("th_a", a_cats)
+    th_b = thresholds("th_b", b_cats)
+
+    result_map = {}
+    for item in raw.get("result_map") or ():
+        if not isinstance(item, (list, tuple)) or len(item) != 3:
+            raise ScoringTablesError("result_map entries must be [a_cat, b_cat, code]")
+        a, b, code = item
+        if a not in a_cats or b not in b_cats:
+            raise ScoringTablesError(f"result_map: unknown pair ({a}, {b})")
+        result_map[(a, b)] = _int(code, "result_map code")
+
+    weights = raw.get("weights") or {}
+    cells = []
+    max_total = 0
+    for q in range(1, N_Q + 1):
+        row = weights.get(str(q)) or {}
+        if set(row) - {str(o) for o in range(N_OPT)}:
+            raise ScoringTablesError(f"weights.{q}: options must be 0..{N_OPT - 1}")
+        q_cells = []
+        q_max = 0
+        for o in range(N_OPT):
+            cell = row.get(str(o)) or {}
+            if set(cell) - {"A", "B", "T"}:
+                raise ScoringTablesError(f"weights.{q}.{o}: keys must be A/B/T")
+            adds = []
+            for key, cats in (("A", a_cats), ("B", b_cats)):
+                acc = {}
+                for cat, v in (cell.get(key) or {}).items():
+                    if cat not in cats:
+                        raise ScoringTablesError(f"weights.{q}.{o}.{key}: unknown category {cat}")
+                    acc[cats.index(cat)] = acc.get(cats.index(cat), 0) + _int(v, f"weights.{q}.{o}.{key}.{cat}")
+                adds.append(tuple(sorted(acc.items())))
+            t_add = sum(_int(v, f"weights.{q}.{o}.T") for v in (cell.get("T") or {}).values())
+            q_cells.append((adds[0], adds[1], t_add))
+            q_max = max(q_max, sum(v for _, v in adds[0]) + sum(v for _, v in adds[1]) + t_add)
+        cells.append(tuple(q_cells))
+        max_total += q_max
+    unknown_q = set(weights) - {str(q) for q in range(1, N_Q + 1)}
+    if unknown_q:
+        raise ScoringTablesError(f"weights: unknown questions {sorted(unknown_q)}")
+
+    default = raw.get("pct_default") or ["상위 50%", -0.01]
+    if not isinstance(default, (list, tuple)) or len(default) != 2 or not isinstance(default[0], str) \
+            or isinstance(default[1], bool) or not isinstance(default[1], (int, float)):
+        raise ScoringTablesError("pct_default must be [label, delta]")
+    if not -1.0 < float(default[1]) < 1.0:
+        raise ScoringTablesError(f"pct_default: delta out of range {default}")
+    pct_default = (_label_percentile(default[0]), default[0], float(default[1]))
+
+    ranges = []
+    for item in raw.get("pct_age_table") or ():
+        if not isinstance(item, (list, tuple)) or len(item) != 4:
+            raise ScoringTablesError("pct_age_table entries must be [low, high, label, delta]")
+        low, high, label, delta = item
+        low, high = _int(low, "pct low"), _int(high, "pct high")
+        if low > high or not isinstance(label, str) or isinstance(delta, bool) \
+                or not isinstance(delta, (int, float)):
+            raise ScoringTablesError(f"pct_age_table: bad entry {item}")
+        if not -1.0 < float(delta) < 1.0:
+            raise ScoringTablesError(f"pct_age_table: delta out of range {item}")
+        ranges.append((low, high, (_label_percentile(label), label, float(delta))))
+
+    # total_score → 값 직접 조회 배열 (위에서부터 첫 매칭 구간 우선)
+    pct_by_total = []
+    for total in range(max_total + 1):
+        hit = next((v for low, high, v in ranges if low <= total <= high), pct_default)
+        pct_by_total.append(hit)
+
+    return ScoringTables(
+        version=version,
+        raw=raw,
+        a_cats=a_cats,
+        b_cats=b_cats,
+        th_a=th_a,
+        th_b=th_b,
+        result_map=result_map,
+        cells=tuple(cells),
+        pct_by_total=tuple(pct_by_total),
+        pct_default=pct_default,
+    )
+
+
+def builtin_raw() -> dict:
+    """quiz_logic 상수 → JSON 형식 dict"""
+    from . import quiz_logic as ql
+
+    return {
+        "version": ql.TABLES_VERSION,
+        "a_cats": list(ql.A_CATS),
+        "b_cats": list(ql.B_CATS),
+        "th_a": dict(ql.TH_A),
+        "th_b": dict(ql.TH_B),
+        "result_map": [[a, b, code] for (a, b), code in ql.RESULT_MAP.items()],
+        "weights": {
+            str(q): {str(o): {k: dict(v) for k, v in cell.items()} for o, cell in row.items()}
+            for q, row in ql.WEIGHTS.items()
+        },
+        "pct_age_table": [[low, high, label, delta] for (low, high), label, delta in ql.PCT_AGE_TABLE],
+        "pct_default": ["상위 50%", -0.01],
+    }
+
+
+def load_file(path: str) -> ScoringTables:
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_tables(json.load(f))
+
+
+# ---- 현재 표 (워커별) ----
+_lock = threading.Lock()
+_current: Optional[ScoringTables] = None
+_source: Optional[Tuple[str, float]] = None  # (경로, mtime)
+_next_check = 0.0
+
+
+_builtin: Optional[ScoringTables] = None
+
+
+def builtin_tables() -> ScoringTables:
+    global _builtin
+    if _builtin is None:
+        _builtin = compile_tables(builtin_raw())
+    return _builtin
+
+
+def _path() -> str:
+    if not settings.configured:
+        return ""
+    return getattr(settings, "DIAG_SCORING_TABLES", "") or ""
+
+
+def check_version(tables: ScoringTables, previous: Optional[ScoringTables] = None) -> None:
+    """같은 version 인데 내용이 다르면 ScoringTablesError (내장 표, 직전에 쓰던 표와 비교)"""
+    for other in (builtin_tables(), previous):
+        if other is not None and other.version == tables.version and other.fingerprint != tables.fingerprint:
+            raise ScoringTablesError(
+                f"version {tables.version} already used with different content; bump the version"
+            )
+
+
+def get_tables() -> ScoringTables:
+    """현재 채점표. 파일 모드면 주기적으로 mtime 확인 후 바뀌었으면 교체"""
+    global _current, _source, _next_check
+    current = _current
+    path = _path()
+    if current is not None and (not path or time.monotonic() < _next_check):
+        return current
+
+    with _lock:
+        if _current is not None and path and time.monotonic() < _next_check:
+            return _current
+        if not path:
+            if _current is None or _source is not None:
+                _current, _source = builtin_tables(), None
+            return _current
+        _next_check = time.monotonic() + float(getattr(settings, "DIAG_SCORING_RELOAD_INTERVAL", 5.0))
+        try:
+            mtime = os.stat(path).st_mtime
+            if _current is None or _source != (path, mtime):
+                tables = load_file(path)
+                check_version(tables, _current)
+                if _current is not None and tables.version != _current.version:
+                    logger.info(f"scoring tables reloaded: {_current.version} -> {tables.version}")
+                _current, _source = tables, (path, mtime)  # 참조 1회 대입 = 원자적 교체
+        except Exception as e:
+            logger.error(f"Failed to load scoring tables from {path}: {e}")
+            if _current is None:
+                _current = builtin_tables()
+        return _current
+
+
+def reset() -> None:
+    """다음 get_tables() 때 다시 로드 (설정 변경/테스트용)"""
+    global _current, _source, _next_check
+    with _lock:
+        _current, _source, _next_check = None, None, 0.0
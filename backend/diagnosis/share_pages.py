@@ -0,0 +1,91 @@
+# diagnosis/share_pages.py
+"""
+/share/<code> 페이지 사전 렌더링.
+
+결과코드 8개 × 언어 2개 = 16개뿐이라 import 시점에 bytes + ETag 로 만들어 두고
+share_view 는 dict 조회만 함. (`manage.py build_share_pages` 로 정적 파일도 생성)
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+from typing import Dict, NamedTuple, Optional, Tuple
+
+RESULT_CODES = range(1, 9)
+LANGS = ("KOR", "ENG")
+
+
+class SharePage(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def normalize_lang(lang: str) -> str:
+    # 기존 동작: ENG 만 _eng 이미지, 나머지는 전부 KOR
+    return "ENG" if (lang or "").upper() == "ENG" else "KOR"
+
+
+def render_html(code: int, lang: str, image: Optional[str] = None) -> str:
+    img = f"/assets/result-{int(code)}.png"
+    if lang == "ENG":
+        img = img.replace(".png", "_eng.png")
+    # 개인화 og:image (og_images.image_url). 본문 <img> 는 그대로 원본
+    og_img = (image or img).replace("&", "&amp;")
+
+    title = "Spot Eraser"
+    desc = "Acne diagnosis result"
+    return f"""<!doctype html>
+<html>
+<head>
+<meta charset="utf-8" />
+<title>{title}</title>
+<meta property="og:title" content="{title}" />
+<meta property="og:description" content="{desc}" />
+<meta property="og:image" content="{og_img}" />
+<meta property="og:type" content="website" />
+<meta name="twitter:card" content="summary_large_image" />
+<meta name="twitter:image" content="{og_img}" />
+</head>
+<body>
+<p>Result #{code}</p>
+<img src="{img}" alt="result" style="max-width:600px;width:100%" />
+</body>
+</html>"""
+
+
+def _build(code: int, lang: str, image: Optional[str] = None) -> SharePage:
+    body = render_html(code, lang, image).encode("utf-8")
+    return SharePage(body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+
+
+_PAGES: Dict[Tuple[int, str], SharePage] = {
+    (code, lang): _build(code, lang) for code in RESULT_CODES for lang in LANGS
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _personalized(code: int, lang: str, image: str) -> SharePage:
+    return _build(code, lang, image)
+
+
+def get_page(code: int, lang: str, image: Optional[str] = None) -> SharePage:
+    lang = normalize_lang(lang)
+    if image:
+        return _personalized(int(code), lang, image)
+    page = _PAGES.get((int(code), lang))
+    # 범위 밖 코드는 URL 로만 들어옴 → 그때그때 렌더 (캐시에는 안 넣음)
+    return page if page is not None else _build(code, lang)
+
+
+def all_pages() -> Dict[Tuple[int, str], SharePage]:
+    return dict(_PAGES)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # W/ 접두어는 비교에서 무시 (If-None-Match 는 weak 비교)
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in tags
@@ -0,0 +1,366 @@
+# diagnosis/sketches.py
+"""
+퀴즈 완료 시간 (client_submitted_at - client_started_at) 분위수 스케치.
+
+- DDSketch: 상대오차 relative_accuracy 이내 분위수, merge 가능 (같은 키 bin 끼리 더하기만)
+- 워커 메모리에 (day, lang, result_code) 별로 모았다가 DIAG_SKETCH_FLUSH_INTERVAL 초마다
+  CompletionSketch 테이블에 병합 저장 (백그라운드 스레드, 종료 시 flush)
+- 조회: 기간 내 행들 + 이 워커의 아직 flush 안 된 스케치를 병합 → p50/p90/p99
+  원본 테이블 스캔 없음 (일 단위 행 수 × 키 수 만큼만 읽음)
+- DIAG_SKETCH_ACCURACY 를 바꾸면 기존 행은 병합/조회 시 새 정확도로 변환 (정확히 하려면 rebuild)
+- rebuild(): 원본에서 일 단위로 다시 계산 (rebuild_completion_sketches 커맨드)
+"""
+from __future__ import annotations
+
+import atexit
+import datetime
+import logging
+import math
+import os
+import struct
+import threading
+import traceback
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+# 1일 넘게 걸린 건 탭을 열어둔 채 방치한 것 → 제외
+MAX_DURATION = 24 * 3600.0
+MIN_INDEXABLE = 1e-3  # 이보다 작으면 zero bucket
+MAX_BINS = 2048
+
+
+def _varint(out: bytearray, n: int) -> None:
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+
+class DDSketch:
+    _HEADER = struct.Struct("<dQdd")  # relative_accuracy, zero_count, min, max
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value: float, n: int = 1) -> None:
+        if value < 0:
+            raise ValueError("DDSketch only accepts non-negative values")
+        if value < MIN_INDEXABLE:
+            self.zero_count += n
+        else:
+            self.bins[math.ceil(math.log(value) / self._log_gamma)] += n
+            if len(self.bins) > MAX_BINS:
+                self._collapse()
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        # 가장 낮은 bin 들을 하나로 (높은 분위수 정확도 유지)
+        keys = sorted(self.bins)
+        excess = keys[: len(keys) - MAX_BINS + 1]
+        total = sum(self.bins.pop(k) for k in excess)
+        self.bins[excess[-1]] += total
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for k, n in other.bins.items():
+            self.bins[k] += n
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+
+    def with_accuracy(self, relative_accuracy: float) -> "DDSketch":
+        """relative_accuracy 가 다르면 각 bin 대표값으로 다시 담은 사본 (오차는 두 정확도 합 이내). 같으면 self"""
+        if relative_accuracy == self.relative_accuracy:
+            return self
+        out = DDSketch(relative_accuracy)
+        for k, n in self.bins.items():
+            out.add(2 * self.gamma ** k / (self.gamma + 1), n)
+        out.zero_count += self.zero_count
+        out.min, out.max = self.min, self.max
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return self.min
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if seen > rank:
+                value = 2 * self.gamma ** k / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(self._HEADER.pack(self.relative_accuracy, self.zero_count, self.min, self.max))
+        prev = None
+        for k in sorted(self.bins):
+            # 첫 키는 zigzag, 이후는 증가분
+            delta = ((k << 1) ^ (k >> 63)) if prev is None else k - prev
+            _varint(out, delta)
+            _varint(out, self.bins[k])
+            prev = k
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DDSketch":
+        data = bytes(data)
+        acc, zero, lo, hi = cls._HEADER.unpack_from(data, 0)
+        sk = cls(acc)
+        sk.zero_count, sk.min, sk.max = zero, lo, hi
+        pos, prev = cls._HEADER.size, None
+        while pos < len(data):
+            delta, pos = _read_varint(data, pos)
+            n, pos = _read_varint(data, pos)
+            k = ((delta >> 1) ^ -(delta & 1)) if prev is None else prev + delta
+            sk.bins[k] += n
+            prev = k
+        return sk
+
+
+def completion_seconds(row) -> Optional[float]:
+    start, end = row.client_started_at, row.client_submitted_at
+    if start is None or end is None:
+        return None
+    if (start.tzinfo is None) != (end.tzinfo is None):
+        return None
+    seconds = (end - start).total_seconds()
+    if seconds < 0 or seconds > MAX_DURATION:
+        return None
+    return seconds
+
+
+def _accuracy() -> float:
+    return float(getattr(settings, "DIAG_SKETCH_ACCURACY", 0.01))
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DIAG_COMPLETION_SKETCHES", True))
+
+
+Key = Tuple[datetime.date, str, int]
+
+
+# ---- 워커 메모리 누적 + 주기적 flush ----
+class SketchBuffer:
+    def __init__(self, flush_interval: float = 30.0):
+        self.flush_interval = float(flush_interval)
+        self._lock = threading.Lock()
+        self._pending: Dict[Key, DDSketch] = {}
+        self._stop = threading.Event()
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, key: Key, seconds: float) -> None:
+        self._ensure_started()
+        with self._lock:
+            sk = self._pending.get(key)
+            if sk is None:
+                sk = self._pending[key] = DDSketch(_accuracy())
+            sk.add(seconds)
+
+    def snapshot(self) -> Dict[Key, DDSketch]:
+        """아직 flush 안 된 스케치 복사본 (조회 시 병합용)"""
+        with self._lock:
+            return {k: DDSketch.from_bytes(v.to_bytes()) for k, v in self._pending.items()}
+
+    def _ensure_started(self) -> None:
+        # gunicorn --preload fork 후에는 스레드가 없으므로 pid 로 확인
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pending.clear()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="diag-sketch-flush", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        from django.db import close_old_connections, connection
+
+        try:
+            while not self._stop.wait(self.flush_interval):
+                close_old_connections()  # DB 가 끊은 연결이면 새로 연결
+                self.flush()
+        finally:
+            connection.close()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        failed = {}
+        for key, sk in pending.items():
+            try:
+                _merge_into_db(key, sk)
+            except Exception as e:
+                logger.error(f"Failed to flush completion sketch {key}: {e}")
+                logger.error(traceback.format_exc())
+                failed[key] = sk
+        if failed:
+            # 다음 주기에 다시 시도
+            with self._lock:
+                for key, sk in failed.items():
+                    cur = self._pending.get(key)
+                    if cur is None:
+                        self._pending[key] = sk
+                    else:
+                        cur.merge(sk.with_accuracy(cur.relative_accuracy))
+        return len(pending) - len(failed)
+
+    def flush_and_stop(self) -> None:
+        self._stop.set()
+        if self._pid == os.getpid():
+            self.flush()
+
+
+def _merge_into_db(key: Key, sk: DDSketch) -> None:
+    from .models import CompletionSketch
+
+    day, lang, code = key
+    lookup = {"day": day, "lang": lang, "result_code": code}
+    for _ in range(2):
+        with transaction.atomic():
+            row = CompletionSketch.objects.select_for_update().filter(**lookup).first()
+            if row is not None:
+                # 설정이 바뀐 뒤면 저장된 쪽을 현재 정확도로 변환해서 병합
+                merged = DDSketch.from_bytes(row.sketch).with_accuracy(sk.relative_accuracy)
+                merged.merge(sk)
+                row.sketch, row.count = merged.to_bytes(), merged.count
+                row.save(update_fields=["sketch", "count"])
+                return
+            try:
+                with transaction.atomic():
+                    CompletionSketch.objects.create(**lookup, sketch=sk.to_bytes(), count=sk.count)
+                return
+            except IntegrityError:
+                pass  # 다른 워커가 먼저 생성 → 다시 병합
+
+
+_buffer: Optional[SketchBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> SketchBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = SketchBuffer(getattr(settings, "DIAG_SKETCH_FLUSH_INTERVAL", 30.0))
+                atexit.register(_buffer.flush_and_stop)
+    return _buffer
+
+
+def record_diagnoses(rows: Iterable) -> None:
+    """저장 완료된 DiagnosisResult 들의 완료 시간을 스케치에 추가 (메모리만, DB 접근 없음)"""
+    if not enabled():
+        return
+    try:
+        buf = None
+        for r in rows:
+            seconds = completion_seconds(r)
+            if seconds is None:
+                continue
+            buf = buf or get_buffer()
+            created = r.created_at or datetime.datetime.now()
+            buf.add((created.date(), r.lang, r.result_code or 0), seconds)
+    except Exception as e:
+        logger.error(f"Failed to record completion sketch: {e}")
+        logger.error(traceback.format_exc())
+
+
+# ---- 조회 ----
+def query(since: datetime.date, until: datetime.date, lang: Optional[str] = None,
+          result_code: Optional[int] = None, include_pending: bool = True,
+          using: Optional[str] = None) -> DDSketch:
+    """[since, until] (날짜 포함) 스케치 병합 결과"""
+    from .models import CompletionSketch
+
+    qs = CompletionSketch.objects.using(using or "default").filter(day__gte=since, day__lte=until)
+    if lang:
+        qs = qs.filter(lang=lang)
+    if result_code is not None:
+        qs = qs.filter(result_code=result_code)
+
+    out = DDSketch(_accuracy())
+    for blob in qs.values_list("sketch", flat=True).iterator():
+        out.merge(DDSketch.from_bytes(blob).with_accuracy(out.relative_accuracy))
+    if include_pending and _buffer is not None:
+        for (day, l, code), sk in _buffer.snapshot().items():
+            if since <= day <= until and (not lang or l == lang) \
+                    and (result_code is None or code == result_code):
+                out.merge(sk.with_accuracy(out.relative_accuracy))
+    return out
+
+
+def rebuild(since: datetime.date, until: datetime.date, chunk_size: int = 2000) -> int:
+    """[since, until] 날짜를 원본 DiagnosisResult 에서 다시 계산해 덮어씀. 행(키) 수 반환"""
+    from .models import CompletionSketch, DiagnosisResult
+
+    start = datetime.datetime.combine(since, datetime.time.min)
+    end = datetime.datetime.combine(until + datetime.timedelta(days=1), datetime.time.min)
+    rows = (
+        DiagnosisResult.objects.filter(
+            created_at__gte=start, created_at__lt=end,
+            client_started_at__isnull=False, client_submitted_at__isnull=False,
+        )
+        .only("created_at", "lang", "result_code", "client_started_at", "client_submitted_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    sketches: Dict[Key, DDSketch] = {}
+    for r in rows:
+        seconds = completion_seconds(r)
+        if seconds is None:
+            continue
+        key = (r.created_at.date(), r.lang, r.result_code or 0)
+        sk = sketches.get(key)
+        if sk is None:
+            sk = sketches[key] = DDSketch(_accuracy())
+        sk.add(seconds)
+
+    objs = [
+        CompletionSketch(day=day, lang=lang, result_code=code, sketch=sk.to_bytes(), count=sk.count)
+        for (day, lang, code), sk in sketches.items()
+    ]
+    with transaction.atomic():
+        CompletionSketch.objects.filter(day__gte=since, day__lte=until).delete()
+        CompletionSketch.objects.bulk_create(objs, batch_size=500)
+    return len(objs)
@@ -0,0 +1,32 @@
+# diagnosis/tests/helpers.py
+"""테스트 공용: 예시 답안, JSON POST, 백그라운드 스레드를 끄는 설정"""
+import json
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+ANSWERS = [1, 1, 2, 3, 1, 2, 1, 2, 3, 1, 2, 1]
+
+# 백그라운드 flush 스레드(write-behind/롤업/스케치/히스토그램)는 끄고 요청 스레드 안에서만 저장
+QUIET = dict(
+    DIAG_WRITE_BEHIND=False,
+    DIAG_ROLLUP_ON_WRITE=False,
+    DIAG_COMPLETION_SKETCHES=False,
+    DIAG_SCORE_HISTOGRAM=False,
+    DIAG_RATELIMIT=False,
+    DIAG_LOG_RESULT_SAMPLE=0,
+)
+
+
+class JsonPostMixin:
+    def post(self, url, data, **extra):
+        return self.client.post(url, json.dumps(data), content_type="application/json", **extra)
+
+
+@override_settings(**QUIET)
+class ApiTestCase(JsonPostMixin, TestCase):
+    pass
+
+
+@override_settings(**QUIET)
+class ApiTransactionTestCase(JsonPostMixin, TransactionTestCase):
+    """FK 제약을 문장마다 확인해야 하는 경우 (SQLite 는 TestCase 트랜잭션 안에서 커밋 때까지 미룸)"""
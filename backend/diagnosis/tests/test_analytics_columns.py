@@ -0,0 +1,41 @@
+import importlib
+import random
+
+from django.apps import apps
+
+from .. import quiz_logic
+from ..models import DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+backfill_migration = importlib.import_module("diagnosis.migrations.0007_backfill_analytics_columns")
+
+
+class AnalyticsColumnTests(ApiTestCase):
+    def assert_columns(self, row, answers):
+        expected = quiz_logic.compute_result(answers)
+        self.assertEqual([getattr(row, f"q{i}") for i in range(1, 13)], answers)
+        self.assertEqual((row.a_type, row.b_type), (expected["a_type"] or "", expected["b_type"] or ""))
+        self.assertEqual(row.skin_percentile, expected["percentile"])
+        self.assertEqual(row.score_oily, expected["scores"]["A"]["oily"])
+        self.assertEqual(row.score_stress, expected["scores"]["B"]["stress"])
+
+    def test_result_view_fills_columns(self):
+        diag_id = self.post("/api/result", {"answers": ANSWERS, "birth_year": 1995}).json()["diagnosis_id"]
+        self.assert_columns(DiagnosisResult.objects.get(pk=diag_id), ANSWERS)
+
+    def test_backfill_fills_old_rows(self):
+        old = DiagnosisResult.objects.create(answers=ANSWERS)
+        broken = DiagnosisResult.objects.create(answers=[1, "x"])
+        backfill_migration.backfill(apps, None)
+        self.assert_columns(DiagnosisResult.objects.get(pk=old.pk), ANSWERS)
+        broken = DiagnosisResult.objects.get(pk=broken.pk)
+        self.assertEqual((broken.q1, broken.q2, broken.a_type), (1, None, ""))
+
+    def test_backfill_scorer_is_frozen_v1(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            answers = [rng.randint(0, 4) for _ in range(12)]
+            got = backfill_migration.score_v1(answers)
+            ref = quiz_logic.compute_result_reference(answers)
+            for field in ("a_type", "b_type", "scores", "percentile"):
+                self.assertEqual(got[field], ref[field], answers)
@@ -0,0 +1,84 @@
+import datetime
+import gzip
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+
+from .. import archive
+from ..models import ButtonClick, DiagnosisRescore, DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+OLD = datetime.datetime(2025, 1, 15, 12)
+
+
+class ArchiveTests(ApiTestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    @staticmethod
+    def aged(model, created_at, **fields):
+        row = model.objects.create(**fields)
+        model.objects.filter(pk=row.pk).update(created_at=created_at)
+        return row
+
+    def run_command(self, before="2025-02-01T00:00:00"):
+        out = io.StringIO()
+        with self.settings(DIAG_ARCHIVE_DIR=self.dir):
+            call_command("archive_diagnoses", "--before", before, stdout=out)
+        return out.getvalue()
+
+    def test_archive_moves_rows_and_iterators_read_both(self):
+        old = self.aged(DiagnosisResult, OLD, answers=ANSWERS, result_code=3, lang="KOR", total_score=12)
+        self.aged(ButtonClick, OLD, button_key="share", diagnosis=old)
+        DiagnosisRescore.objects.create(diagnosis=old, scoring_version="v2", result_code=4)
+        hot = DiagnosisResult.objects.create(answers=ANSWERS, result_code=3, lang="KOR")
+
+        self.assertIn("2025-01: archived 1 diagnoses, 1 clicks, 1 rescores", self.run_command())
+        self.assertEqual(list(DiagnosisResult.objects.values_list("pk", flat=True)), [hot.pk])
+        self.assertFalse(ButtonClick.objects.exists())
+        self.assertFalse(DiagnosisRescore.objects.exists())
+        files = sorted(p.name.split("-2025-01-")[0] for p in self.dir.glob("*.ndjson.gz"))
+        self.assertEqual(files, ["clicks", "diagnoses", "rescores"])
+
+        with self.settings(DIAG_ARCHIVE_DIR=self.dir):
+            rows = list(archive.iter_diagnoses(result_code=3, lang="KOR"))
+            self.assertEqual([r["id"] for r in rows], [str(old.pk), str(hot.pk)])
+            self.assertEqual(set(rows[0]), set(rows[1]))
+            self.assertEqual(set(rows[0]), set(archive.DIAG_FIELDS))
+            self.assertEqual(rows[0]["created_at"], OLD)
+            self.assertEqual(rows[0]["total_score"], 12)
+            self.assertEqual(list(archive.iter_diagnoses(since=datetime.datetime(2025, 2, 1))), rows[1:])
+            clicks = list(archive.iter_clicks(button_key="share"))
+            self.assertEqual(clicks[0]["diagnosis_id"], str(old.pk))
+            rescores = list(archive.iter_archived("rescores"))
+            self.assertEqual(rescores[0]["result_code"], 4)
+
+        self.assertIn("nothing older than", self.run_command())
+
+    def test_keeps_diagnoses_with_hot_clicks(self):
+        old = self.aged(DiagnosisResult, OLD, answers=ANSWERS)
+        click = ButtonClick.objects.create(button_key="share", diagnosis=old)  # 이번 달 클릭
+
+        self.assertIn("archived 0 diagnoses", self.run_command())
+        click.refresh_from_db()
+        self.assertEqual(click.diagnosis_id, old.pk)
+
+    def test_dry_run_counts_only(self):
+        self.aged(DiagnosisResult, OLD, answers=ANSWERS)
+        with self.settings(DIAG_ARCHIVE_DIR=self.dir):
+            out = io.StringIO()
+            call_command("archive_diagnoses", "--before", "2025-02-01T00:00:00", "--dry-run", stdout=out)
+        self.assertIn("would archive 1 diagnoses", out.getvalue())
+        self.assertEqual(DiagnosisResult.objects.count(), 1)
+        self.assertEqual(list(self.dir.glob("*")), [])
+
+    def test_archive_file_is_gzip_ndjson(self):
+        self.aged(DiagnosisResult, OLD, answers=ANSWERS)
+        self.run_command()
+        (path,) = self.dir.glob("diagnoses-*.ndjson.gz")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
@@ -0,0 +1,37 @@
+import random
+
+from django.test import SimpleTestCase
+
+from .. import batch_scoring, quiz_logic
+from .helpers import ANSWERS, ApiTestCase
+
+
+class ComputeResultsTests(SimpleTestCase):
+    def test_matches_compute_result(self):
+        rng = random.Random(1)
+        rows = [[rng.randint(0, 4) for _ in range(12)] for _ in range(300)]
+        years = [rng.choice([None, 1950, 1995, 2010, "1988"]) for _ in rows]
+        for answers, year, res in zip(rows, years, batch_scoring.compute_results(rows, years)):
+            expected = quiz_logic.compute_result(answers, year)
+            self.assertEqual({k: res[k] for k in expected}, expected, (answers, year))
+
+
+class ResultBatchViewTests(ApiTestCase):
+    def test_matches_compute_result(self):
+        years = [1990, "0", -1, 10000, 10 ** 20, None, "abc"]
+        resp = self.post("/api/result/batch", {"items": [
+            *({"answers": ANSWERS, "birth_year": y} for y in years),
+            {"answers": [1]},
+        ]})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.json()["results"]
+        for y, res in zip(years, results):
+            expected = quiz_logic.compute_result(ANSWERS, y)
+            self.assertEqual({k: res[k] for k in expected}, expected, y)
+        self.assertIn("detail", results[-1])
+
+    def test_rejects_bad_body(self):
+        self.assertEqual(self.post("/api/result/batch", {"items": "x"}).status_code, 400)
+        with self.settings(DIAG_BATCH_MAX_ITEMS=2):
+            resp = self.post("/api/result/batch", {"items": [{"answers": ANSWERS}] * 3})
+        self.assertEqual(resp.status_code, 400)
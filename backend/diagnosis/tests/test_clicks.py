@@ -0,0 +1,42 @@
+import uuid
+
+from ..models import ButtonClick
+from .helpers import ANSWERS, ApiTestCase, ApiTransactionTestCase
+
+
+class TrackClickTests(ApiTestCase):
+    def test_single_and_batch(self):
+        diag_id = self.post("/api/result", {"answers": ANSWERS}).json()["diagnosis_id"]
+        resp = self.post("/api/track-click", {"button_key": "share", "diagnosis_id": diag_id})
+        self.assertEqual(resp.status_code, 200)
+        resp = self.post("/api/track-click/batch", [
+            {"button_key": "retry", "client_ts": 1792300000000},
+            {"button_key": ""},
+        ])
+        self.assertEqual(resp.json(), {"ok": True, "saved": 1, "rejected": 1})
+        self.assertEqual(ButtonClick.objects.filter(diagnosis_id=diag_id).count(), 1)
+        self.assertIsNotNone(ButtonClick.objects.get(button_key="retry").client_ts)
+
+    def test_rejects_bad_body(self):
+        self.assertEqual(self.post("/api/track-click", {"lang": "ENG"}).status_code, 400)
+        self.assertEqual(self.post("/api/track-click/batch", {"events": "x"}).status_code, 400)
+        with self.settings(DIAG_CLICK_BATCH_MAX_EVENTS=2):
+            resp = self.post("/api/track-click/batch", [{"button_key": "a"}] * 3)
+        self.assertEqual(resp.status_code, 400)
+
+
+class UnknownDiagnosisClickTests(ApiTransactionTestCase):
+    def test_unknown_diagnosis_id_saved_unlinked(self):
+        known = self.post("/api/result", {"answers": ANSWERS}).json()["diagnosis_id"]
+        unknown = str(uuid.uuid4())
+        resp = self.post("/api/track-click", {"button_key": "share", "diagnosis_id": unknown})
+        self.assertEqual(resp.status_code, 200)
+        resp = self.post("/api/track-click/batch", {"events": [
+            {"button_key": "retry", "diagnosis_id": known},
+            {"button_key": "retry", "diagnosis_id": unknown},
+            {"button_key": "retry", "diagnosis_id": "not-a-uuid"},
+        ]})
+        self.assertEqual(resp.json()["saved"], 3)
+        self.assertEqual(ButtonClick.objects.count(), 4)
+        self.assertEqual(ButtonClick.objects.filter(diagnosis_id=known).count(), 1)
+        self.assertEqual(ButtonClick.objects.filter(diagnosis__isnull=True).count(), 3)
@@ -0,0 +1,54 @@
+import datetime
+import json
+import random
+import unittest
+import uuid
+
+from django.test import SimpleTestCase
+
+from .. import codec, quiz_logic
+from .helpers import ANSWERS, ApiTestCase
+
+
+class CodecTests(SimpleTestCase):
+    def test_roundtrip(self):
+        value = {"a": [1, 2.5, None, True], "k": "한글", "id": uuid.UUID(int=1)}
+        out = codec.dumps(value)
+        self.assertIsInstance(out, bytes)
+        self.assertEqual(codec.loads(out), {**value, "id": str(value["id"])})
+        self.assertEqual(codec.loads(out.decode()), codec.loads(out))
+        self.assertIn("한글".encode(), out)
+
+    def test_json_response(self):
+        resp = codec.JsonResponse([1, {"x": 2}], status=201)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertEqual(resp.content, b'[1,{"x":2}]')
+
+
+@unittest.skipIf(codec.orjson is None, "orjson not installed")
+class BackendParityTests(ApiTestCase):
+    def test_backends_match_on_result_payloads(self):
+        rng = random.Random(3)
+        years = [None, 1990, "0", -1, 10000]
+        for i in range(60):
+            answers = [rng.randint(0, 4) for _ in range(12)]
+            resp = self.post("/api/result", {"answers": answers, "birth_year": years[i % len(years)]})
+            payload = json.loads(resp.content)
+            self.assertEqual(codec._orjson_dumps(payload), codec._stdlib_dumps(payload))
+            self.assertEqual(resp.content, codec._stdlib_dumps(payload))
+        # 저장 못 하는 크기의 skin_age (int64 밖) 도 같은 바이트
+        for year in (10 ** 20, -10 ** 30):
+            payload = quiz_logic.compute_result(ANSWERS, year)
+            self.assertEqual(codec._orjson_dumps(payload), codec._stdlib_dumps(payload))
+
+    def test_backends_match_on_edge_values(self):
+        for value in (1e16, 1e-7, 1e-5, 0.0001, 151.48240112472098, -0.0, 2 ** 70, -(2 ** 64),
+                      {"a": [None, 1.5, "1e5"]}, datetime.datetime(2026, 1, 1, 1, 2, 3, 456789)):
+            self.assertEqual(codec._orjson_dumps(value), codec._stdlib_dumps(value), value)
+
+    def test_nonfinite_rejected_by_both(self):
+        for dumps in (codec._orjson_dumps, codec._stdlib_dumps):
+            for value in (float("nan"), {"x": [None, float("inf")]}):
+                with self.assertRaises(ValueError):
+                    dumps(value)
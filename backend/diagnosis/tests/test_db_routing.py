@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db.utils import ConnectionDoesNotExist
+from django.test import SimpleTestCase
+
+from .. import db_routing, export, views
+from ..models import DiagnosisResult
+from .helpers import ApiTestCase
+
+
+class RouterTests(SimpleTestCase):
+    def test_reads_and_writes_go_to_primary(self):
+        router = db_routing.PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(DiagnosisResult), "default")
+        self.assertEqual(router.db_for_write(DiagnosisResult), "default")
+        row = DiagnosisResult()
+        row._state.db = "replica"
+        self.assertEqual(router.db_for_read(DiagnosisResult, instance=row), "replica")
+        other = DiagnosisResult()
+        other._state.db = "default"
+        self.assertTrue(router.allow_relation(row, other))
+
+    def test_analytics_db_uses_replica_when_configured(self):
+        self.assertEqual(db_routing.analytics_db(), "default")
+        with mock.patch.dict(settings.DATABASES, replica=settings.DATABASES["default"]):
+            self.assertEqual(db_routing.analytics_db(), "replica")
+
+
+class AnalyticsReadsTests(ApiTestCase):
+    """통계/export 는 analytics_db() 로 읽음 (없는 alias 를 돌려주면 거기서 실패)"""
+
+    def test_stats_read_analytics_db(self):
+        with mock.patch.object(views, "analytics_db", return_value="missing"), \
+                self.assertLogs("django.request", "ERROR"):
+            for url in ("/api/stats", "/api/stats/completion"):
+                with self.assertRaises(ConnectionDoesNotExist):
+                    self.client.get(url)
+
+    def test_export_reads_analytics_db(self):
+        with mock.patch.object(export, "analytics_db", return_value="missing"):
+            with self.assertRaises(ConnectionDoesNotExist):
+                list(export.stream("diagnoses", "csv"))
@@ -0,0 +1,57 @@
+import io
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from .. import equivalence, scoring_lut
+
+
+class ScoringEquivalenceTests(SimpleTestCase):
+    """채점 구현 전부 (reference/tables/compute_result/batch/lut) 를 golden corpus + 무작위 입력으로 비교"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lut_dir = tempfile.mkdtemp()
+        scoring_lut.build(equivalence.builtin_tables(), cls.lut_dir)
+        cls.impls = equivalence.implementations(cls.lut_dir)
+        cls.cases = equivalence.load_golden()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.lut_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def _assert_ok(self, report):
+        self.assertTrue(report.ok, "\n".join(
+            f"{f.source}: answers={f.answers!r} birth_year={f.birth_year!r} expected={f.expected} got={f.got}"
+            for f in report.failures
+        ))
+
+    def test_all_implementations_present(self):
+        self.assertEqual(set(self.impls), {"reference", "tables", "compute_result", "batch", "lut"})
+
+    def test_golden_corpus(self):
+        self.assertTrue(self.cases)
+        for name, fn in self.impls.items():
+            with self.subTest(impl=name):
+                report = equivalence.Report(name)
+                equivalence.check_golden(fn, self.cases, report)
+                self.assertEqual(report.golden, len(self.cases))
+                self._assert_ok(report)
+
+    def test_random_inputs(self):
+        for name, fn in self.impls.items():
+            with self.subTest(impl=name):
+                report = equivalence.Report(name)
+                equivalence.check_random(fn, 500, 1234, report)
+                self._assert_ok(report)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("check_scoring_equivalence", "--cases", "50", "--lut-dir", self.lut_dir, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), len(self.impls))
+        self.assertTrue(all(line.endswith(" ok") for line in lines), lines)
@@ -0,0 +1,59 @@
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from .. import export
+from ..models import ButtonClick
+from .helpers import ANSWERS, ApiTestCase
+
+
+class ExportTests(ApiTestCase):
+    def setUp(self):
+        self.ids = [self.post("/api/result", {"answers": ANSWERS, "lang": lang}).json()["diagnosis_id"]
+                    for lang in ("KOR", "ENG", "KOR")]
+        ButtonClick.objects.create(button_key="share", diagnosis_id=self.ids[0], lang="KOR")
+
+    def test_csv_stream(self):
+        chunks = list(export.stream("diagnoses", "csv", lang="kor"))
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        self.assertEqual(rows[0], export.header("diagnoses"))
+        self.assertEqual([r[0] for r in rows[1:]], [self.ids[0], self.ids[2]])
+        q = rows[0].index("q1")
+        self.assertEqual([int(v) for v in rows[1][q:q + 12]], ANSWERS)
+
+    def test_ndjson_stream_in_batches(self):
+        rows = export.iter_rows("diagnoses", chunk_size=1)
+        chunks = list(export.ndjson_lines(export.header("diagnoses"), rows, batch=2))
+        self.assertEqual(len(chunks), 2)
+        lines = "".join(chunks).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], self.ids)
+        future = datetime.datetime.now() + datetime.timedelta(days=1)
+        self.assertEqual(list(export.stream("clicks", "ndjson", since=future)), [])
+
+    def test_command_writes_file(self):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        call_command("export_diagnoses", "--kind", "clicks", "--format", "ndjson", "--out", path)
+        with open(path, encoding="utf-8") as f:
+            (row,) = [json.loads(line) for line in f]
+        self.assertEqual(row["diagnosis_id"], self.ids[0])
+
+    def test_staff_endpoint_streams(self):
+        url = "/api/export/diagnoses.csv?lang=ENG"
+        self.assertEqual(self.client.get(url).status_code, 302)  # admin 로그인으로
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertIn("attachment;", resp["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode())))
+        self.assertEqual([r[0] for r in rows[1:]], [self.ids[1]])
+        self.assertEqual(self.client.get("/api/export/users.csv").status_code, 404)
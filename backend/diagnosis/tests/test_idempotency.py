@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+
+from .. import idempotency
+from ..models import DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = idempotency.BloomFilter(bits=1 << 12, hashes=5)
+        keys = [f"k{i}" for i in range(200)]
+        for k in keys:
+            bloom.add(k)
+        self.assertTrue(all(k in bloom for k in keys))
+        self.assertLess(sum(f"x{i}" in bloom for i in range(1000)), 100)
+
+
+class IdempotentResultTests(ApiTestCase):
+    def setUp(self):
+        idempotency._recent = None
+        self.addCleanup(setattr, idempotency, "_recent", None)
+
+    def test_replays_idempotency_key_per_client(self):
+        headers = {"HTTP_IDEMPOTENCY_KEY": "k1", "HTTP_USER_AGENT": "ua1"}
+        first = self.post("/api/result", {"answers": ANSWERS}, **headers).json()
+        again = self.post("/api/result", {"answers": ANSWERS}, **headers)
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(again.json()["diagnosis_id"], first["diagnosis_id"])
+
+        other_client = self.post("/api/result", {"answers": ANSWERS}, HTTP_IDEMPOTENCY_KEY="k1", HTTP_USER_AGENT="ua2")
+        self.assertNotEqual(other_client.json()["diagnosis_id"], first["diagnosis_id"])
+        self.assertEqual(DiagnosisResult.objects.count(), 2)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        ids = {self.post("/api/result", {"answers": ANSWERS}).json()["diagnosis_id"] for _ in range(2)}
+        self.assertEqual(len(ids), 2)
+
+    def test_other_worker_replays_stored_row(self):
+        headers = {"HTTP_IDEMPOTENCY_KEY": "k2", "HTTP_USER_AGENT": "ua1"}
+        first = self.post("/api/result", {"answers": ANSWERS, "birth_year": 1990}, **headers).json()
+        idempotency._recent = None  # 다른 워커 → LRU 없이 저장된 행 기준 응답
+        self.assertEqual(self.post("/api/result", {"answers": ANSWERS, "birth_year": 1990}, **headers).json(), first)
+        self.assertEqual(DiagnosisResult.objects.count(), 1)
@@ -0,0 +1,36 @@
+import json
+import logging
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .. import logging_utils, quiz_logic
+from .helpers import ANSWERS
+
+
+class ResultLogTests(SimpleTestCase):
+    def line(self):
+        request = RequestFactory().post("/api/result", HTTP_USER_AGENT="ua", REMOTE_ADDR="10.0.0.1")
+        return logging_utils.ResultLogLine(request, ANSWERS, quiz_logic.compute_result(ANSWERS, 1995))
+
+    def test_json_formatter_uses_fields(self):
+        line = self.line()
+        record = logging.LogRecord("diagnosis.views", logging.INFO, __file__, 1, "%s", (line,), None)
+        record.diag = line
+        out = json.loads(logging_utils.JsonFormatter().format(record))
+        self.assertEqual(out["event"], "diagnosis_result")
+        self.assertEqual(out["answers"], ANSWERS)
+        self.assertEqual(out["ip"], "10.0.0.1")
+
+    def test_text_format_is_lazy(self):
+        line = self.line()
+        with mock.patch.object(logging_utils.ResultLogLine, "__str__", return_value="x") as fmt:
+            logging.getLogger("diagnosis.tests.silent").debug("%s", line)
+        fmt.assert_not_called()
+        self.assertIn("IP=10.0.0.1 UA=ua", str(line))
+
+    def test_sampling(self):
+        with override_settings(DIAG_LOG_RESULT_SAMPLE=0):
+            self.assertFalse(any(logging_utils.should_sample() for _ in range(100)))
+        with override_settings(DIAG_LOG_RESULT_SAMPLE=1.0):
+            self.assertTrue(all(logging_utils.should_sample() for _ in range(100)))
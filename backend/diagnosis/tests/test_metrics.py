@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from .. import metrics
+from .helpers import ANSWERS, ApiTestCase
+
+
+class RegistryTests(SimpleTestCase):
+    def test_render(self):
+        reg = metrics.Registry()
+        reg.describe("t_seconds", "test")
+        reg.observe("t_seconds", 0.003, view="a")
+        reg.observe("t_seconds", 7, view="a")
+        reg.inc("t_total", view='q"x')
+        text = reg.render()
+        self.assertIn("# HELP t_seconds test", text)
+        self.assertIn('t_seconds_bucket{view="a",le="0.005"} 1', text)
+        self.assertIn('t_seconds_bucket{view="a",le="+Inf"} 2', text)
+        self.assertIn('t_total{view="q\\"x"} 1', text)
+
+
+class MetricsViewTests(ApiTestCase):
+    def test_server_timing(self):
+        resp = self.post("/api/result", {"answers": ANSWERS})
+        stages = [part.split(";")[0] for part in resp["Server-Timing"].split(", ")]
+        self.assertIn("compute", stages)
+        self.assertEqual(stages[-1], "total")
+        with self.settings(DIAG_SERVER_TIMING=False):
+            self.assertNotIn("Server-Timing", self.post("/api/result", {"answers": ANSWERS}))
+
+    def test_metrics(self):
+        self.post("/api/result", {"answers": ANSWERS})
+        self.assertEqual(self.client.get("/metrics").status_code, 403)  # 토큰 없음 + DEBUG=False
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
+        with self.settings(DIAG_METRICS_TOKEN="s3cret"):
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer nope").status_code, 403)
+            resp = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn(b'diag_requests_total{status="200",view="api_result"}', resp.content)
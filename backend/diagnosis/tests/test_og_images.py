@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from .. import og_images
+from .helpers import ApiTestCase
+
+
+class DiskCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, True)
+
+    def test_evicts_least_recently_used(self):
+        cache = og_images.DiskCache(self.root, 250)
+        for i, digest in enumerate(("aa01", "bb02")):
+            path = cache.put(digest, b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+        self.assertIsNotNone(cache.get("aa01"))  # 최근 사용 → bb02 가 가장 오래됨
+        cache.put("cc03", b"x" * 100)
+        self.assertIsNone(cache.get("bb02"))
+        self.assertIsNotNone(cache.get("aa01"))
+        self.assertIsNotNone(cache.get("cc03"))
+
+    def test_key_lock_lives_while_held(self):
+        cache = og_images.DiskCache(self.root, 1 << 20)
+        held = cache.key_lock("a")
+        with held:
+            for i in range(2000):
+                cache.key_lock(f"x{i}")
+            self.assertIs(cache.key_lock("a"), held)
+        del held
+        self.assertNotIn("a", cache._key_locks)
+
+    @unittest.skipUnless(og_images.available(), "Pillow not installed")
+    def test_font_without_size_support(self):
+        def old_load_default(**kwargs):
+            if kwargs:
+                raise TypeError("load_default() got an unexpected keyword argument 'size'")
+            return "bitmap"
+        with mock.patch.object(og_images.ImageFont, "load_default", old_load_default), \
+                self.settings(DIAG_OG_FONT=""):
+            self.assertEqual(og_images._font(40), "bitmap")
+
+
+class OgImageViewTests(ApiTestCase):
+    def setUp(self):
+        cache = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache, True)
+        og_images._cache = None
+        self.addCleanup(setattr, og_images, "_cache", None)
+        settings = self.settings(DIAG_OG_CACHE_DIR=cache)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.pct = sorted(og_images.allowed_percentiles())[0]
+
+    def test_parse_key_rejects_unrenderable_values(self):
+        self.assertEqual(og_images.parse_key(1, "ENG", "30", str(self.pct)), (1, "ENG", 30, self.pct))
+        for age, pct in (("999", self.pct), ("30", "1"), ("x", self.pct), (None, self.pct)):
+            self.assertIsNone(og_images.parse_key(1, "ENG", age, None if pct is None else str(pct)))
+
+    def test_og_image(self):
+        resp = self.client.get(f"/og/1.png?lang=ENG&age=30&pct={self.pct}")
+        if og_images.available():
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp["Content-Type"], "image/png")
+            self.assertTrue(b"".join(resp.streaming_content).startswith(b"\x89PNG"))
+        else:
+            self.assertEqual(resp.status_code, 302)
+        # 개인화 불가 값은 원본 이미지로
+        resp = self.client.get("/og/1.png?lang=ENG&age=999&pct=1")
+        self.assertEqual(resp.status_code, 302)
+
+    def test_share_page_points_at_personalized_image(self):
+        resp = self.client.get(f"/share/1?lang=ENG&age=30&pct={self.pct}")
+        self.assertEqual(resp.status_code, 200)
+        if og_images.available():
+            self.assertIn(f"/og/1.png?lang=ENG&amp;age=30&amp;pct={self.pct}", resp.content.decode())
+
+    @unittest.skipUnless(og_images.available(), "Pillow not installed")
+    def test_render_rate_limited_but_cache_hits_not(self):
+        from .. import ratelimit
+
+        def reset():
+            ratelimit._rates.clear()
+            ratelimit._buckets = None
+        reset()
+        self.addCleanup(reset)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        with self.settings(DIAG_RATELIMIT=True, DIAG_RATELIMIT_FILE=f"{tmp}/buckets",
+                           DIAG_RATELIMITS={"og_render": "1/h"}):
+            url = f"/og/1.png?lang=ENG&age=30&pct={self.pct}"
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(self.client.get(url).status_code, 200)  # 캐시
+            self.assertEqual(self.client.get(f"/og/1.png?lang=ENG&age=31&pct={self.pct}").status_code, 302)
+
+    @unittest.skipUnless(og_images.available(), "Pillow not installed")
+    def test_open_image_rerenders_after_eviction(self):
+        key = (1, "ENG", 30, self.pct)
+        path, digest = og_images.get_image(key)
+        real_get = og_images.DiskCache.get
+        calls = []
+
+        def evicted_once(cache, d):
+            hit = real_get(cache, d)
+            if hit is not None and not calls:
+                calls.append(d)
+                os.unlink(hit)  # 찾은 직후 다른 워커가 evict
+            return hit
+
+        with mock.patch.object(og_images.DiskCache, "get", evicted_once):
+            f, got = og_images.open_image(key)
+        with f:
+            self.assertTrue(f.read().startswith(b"\x89PNG"))
+        self.assertEqual(got, digest)
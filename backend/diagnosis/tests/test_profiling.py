@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+
+from .. import profiling
+from .helpers import ANSWERS, ApiTestCase
+
+
+class ProfilingTests(ApiTestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        settings = self.settings(DIAG_PROFILING=True, DIAG_PROFILING_SECRET="s3cret", DIAG_PROFILING_DIR=self.dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def result(self, url="/api/result", **extra):
+        return self.post(url, {"answers": ANSWERS}, **extra)
+
+    def test_not_profiled_without_matching_secret(self):
+        self.assertNotIn("X-Diag-Profile-Id", self.result())
+        self.assertNotIn("X-Diag-Profile-Id", self.result(HTTP_X_DIAG_PROFILE="nope"))
+        self.assertNotIn("X-Diag-Profile-Id", self.result(HTTP_X_DIAG_PROFILE="1"))
+        with self.settings(DIAG_PROFILING=False):
+            self.assertNotIn("X-Diag-Profile-Id", self.result(HTTP_X_DIAG_PROFILE="s3cret"))
+        with self.settings(DIAG_PROFILING_SECRET=""):
+            self.assertNotIn("X-Diag-Profile-Id", self.result(HTTP_X_DIAG_PROFILE=""))
+        self.assertFalse(list(self.dir.iterdir()))
+
+    def test_header_secret_records_profile_and_sql(self):
+        resp = self.result(HTTP_X_DIAG_PROFILE="s3cret")
+        self.assertEqual(resp.status_code, 200)
+        name = resp["X-Diag-Profile-Id"]
+        self.assertTrue((self.dir / f"{name}.prof").exists())
+        meta = profiling.load(name)
+        self.assertEqual((meta["view"], meta["method"], meta["status"]), ("result", "POST", 200))
+        self.assertGreaterEqual(meta["sql_count"], 1)
+        self.assertTrue(any("INSERT" in q["sql"] for q in meta["sql"]))
+        self.assertIn("cumulative", profiling.stats_text(name))
+        self.assertIsNone(profiling.load("../etc"))
+
+    def test_query_secret_not_recorded(self):
+        name = self.result("/api/result?_profile=s3cret&lang=KOR")["X-Diag-Profile-Id"]
+        self.assertEqual(profiling.load(name)["path"], "/api/result?lang=KOR")
+        for p in self.dir.iterdir():
+            self.assertNotIn(b"s3cret", p.read_bytes())
+
+    def test_keeps_newest_profiles(self):
+        with self.settings(DIAG_PROFILING_KEEP=2):
+            names = [self.result(HTTP_X_DIAG_PROFILE="s3cret")["X-Diag-Profile-Id"] for _ in range(3)]
+        self.assertEqual([p["name"] for p in profiling.recent()], names[:0:-1])
+
+    def test_staff_pages(self):
+        name = self.result(HTTP_X_DIAG_PROFILE="s3cret")["X-Diag-Profile-Id"]
+        self.assertEqual(self.client.get("/admin/diag-profiles/").status_code, 302)
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertContains(self.client.get("/admin/diag-profiles/"), name)
+        self.assertContains(self.client.get(f"/admin/diag-profiles/{name}"), "INSERT")
+        download = self.client.get(f"/admin/diag-profiles/{name}?download=1")
+        self.assertEqual(download.status_code, 200)
+        self.assertIn("attachment;", download["Content-Disposition"])
+        download.close()
+        self.assertEqual(self.client.get("/admin/diag-profiles/missing").status_code, 404)
@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from .. import ratelimit
+from .helpers import ANSWERS, ApiTestCase
+
+
+class BucketTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate("30/m"), (30.0, 0.5))
+        self.assertEqual(ratelimit.parse_rate("2/S"), (2.0, 2.0))
+        self.assertIsNone(ratelimit.parse_rate(""))
+        self.assertIsNone(ratelimit.parse_rate("0/m"))
+        with self.assertRaises(ValueError):
+            ratelimit.parse_rate("3/d")
+
+    def test_buckets_shared_between_mappings(self):
+        path = f"{self.tmp}/buckets"
+        a, b = ratelimit.SharedBuckets(path, 64), ratelimit.SharedBuckets(path, 64)
+        self.assertEqual(a.take("result", "1.2.3.4", 2, 1 / 60), 0)
+        self.assertEqual(b.take("result", "1.2.3.4", 2, 1 / 60), 0)
+        self.assertAlmostEqual(a.take("result", "1.2.3.4", 2, 1 / 60), 60, delta=1)
+        self.assertEqual(b.take("result", "5.6.7.8", 2, 1 / 60), 0)
+        self.assertEqual(b.take("click", "1.2.3.4", 2, 1 / 60), 0)
+
+
+class RateLimitedViewTests(ApiTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.reset()
+        self.addCleanup(self.reset)
+        limited = self.settings(DIAG_RATELIMIT=True, DIAG_RATELIMIT_FILE=f"{tmp}/buckets",
+                                DIAG_RATELIMITS={"result": "2/m", "click": ""})
+        limited.enable()
+        self.addCleanup(limited.disable)
+
+    @staticmethod
+    def reset():
+        ratelimit._rates.clear()
+        ratelimit._buckets = None
+
+    def test_over_limit_gets_429(self):
+        codes = [self.post("/api/result", {"answers": ANSWERS}).status_code for _ in range(2)]
+        self.assertEqual(codes, [200, 200])
+        resp = self.post("/api/result", {"answers": ANSWERS})
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp["Retry-After"], "30")
+        other = self.post("/api/result", {"answers": ANSWERS}, REMOTE_ADDR="198.51.100.7")
+        self.assertEqual(other.status_code, 200)
+
+    def test_empty_rate_means_unlimited(self):
+        for _ in range(5):
+            self.assertEqual(self.post("/api/track-click", {"button_key": "share"}).status_code, 200)
+
+    def test_forwarded_for_uses_trusted_hop(self):
+        with self.settings(DIAG_TRUSTED_PROXY_COUNT=1):
+            codes = [
+                self.post("/api/result", {"answers": ANSWERS},
+                          HTTP_X_FORWARDED_FOR=f"10.0.0.{i}, 203.0.113.9").status_code
+                for i in range(3)
+            ]
+            self.assertEqual(codes, [200, 200, 429])
+            other = self.post("/api/result", {"answers": ANSWERS}, HTTP_X_FORWARDED_FOR="203.0.113.10")
+            self.assertEqual(other.status_code, 200)
+        # 믿는 프록시가 없으면 헤더는 무시하고 REMOTE_ADDR
+        spoofed = self.post("/api/result", {"answers": ANSWERS}, HTTP_X_FORWARDED_FOR="192.0.2.1")
+        self.assertEqual(spoofed.status_code, 200)
+        self.assertEqual(self.post("/api/result", {"answers": ANSWERS},
+                                   HTTP_X_FORWARDED_FOR="192.0.2.2").status_code, 200)
+        self.assertEqual(self.post("/api/result", {"answers": ANSWERS},
+                                   HTTP_X_FORWARDED_FOR="192.0.2.3").status_code, 429)
@@ -0,0 +1,72 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+
+from .. import batch_scoring, quiz_logic, rescoring, scoring_tables
+from ..models import DiagnosisRescore, DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+OTHER = [4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4]
+
+
+class RescoreTests(ApiTestCase):
+    def diagnose(self, answers, code=None):
+        if code is None:
+            code = quiz_logic.compute_result(answers)["code"]
+        return DiagnosisResult.objects.create(answers=answers, result_code=code)
+
+    def compiled(self, raw=None):
+        tables = scoring_tables.compile_tables(scoring_tables.builtin_raw() if raw is None else raw)
+        return batch_scoring.compile_tables(tables)
+
+    def test_same_tables_change_nothing(self):
+        for answers in (ANSWERS, OTHER, ANSWERS):
+            self.diagnose(answers)
+        report = rescoring.rescore(self.compiled(), chunk_size=2)
+        self.assertEqual((report.scored, report.changed, report.skipped, report.written), (3, 0, 0, 0))
+        self.assertTrue(all(old == new for old, new in report.confusion))
+        self.assertEqual(sum(report.confusion.values()), 3)
+        self.assertFalse(DiagnosisRescore.objects.exists())
+
+    def test_confusion_matrix_and_skipped_rows(self):
+        self.diagnose(ANSWERS, code=7)  # 저장된 code 와 다르게 채점되는 행
+        self.diagnose(ANSWERS)
+        self.diagnose([1, 2], code=3)  # 형식 안 맞는 옛 행
+        report = rescoring.rescore(self.compiled())
+        new = quiz_logic.compute_result(ANSWERS)["code"] or 0
+        self.assertEqual((report.scored, report.skipped, report.changed), (2, 1, 0 if new == 7 else 1))
+        olds, news, counts = report.matrix()
+        self.assertEqual(news, [new])
+        self.assertEqual(sum(map(sum, counts)), 2)
+        self.assertEqual(counts[olds.index(7)][0], 1)
+
+    def test_write_upserts_shadow_rows(self):
+        raw = scoring_tables.builtin_raw()
+        raw["version"] = "v-test"
+        row = self.diagnose(ANSWERS)
+        for _ in range(2):
+            report = rescoring.rescore(self.compiled(raw), write=True)
+            self.assertEqual(report.written, 1)
+        shadow = DiagnosisRescore.objects.get()
+        expected = quiz_logic.compute_result(ANSWERS)
+        self.assertEqual((shadow.diagnosis_id, shadow.scoring_version), (row.pk, "v-test"))
+        self.assertEqual(shadow.result_code, expected["code"])
+        self.assertEqual(shadow.total_score, expected["total_score"])
+        self.assertEqual(shadow.score_a, sum(expected["scores"]["A"].values()))
+
+    def test_command_prints_matrix(self):
+        self.diagnose(ANSWERS)
+        raw = scoring_tables.builtin_raw()
+        raw["version"] = "v-cmd"
+        fd, path = tempfile.mkstemp(suffix=".json")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            json.dump(raw, f)
+        out = io.StringIO()
+        call_command("rescore_diagnoses", "--tables", path, "--quiet", "--write", stdout=out)
+        self.assertIn("version=v-cmd scored=1 changed=0 skipped=0 written=1", out.getvalue())
+        self.assertIn("old\\new", out.getvalue())
+        self.assertTrue(DiagnosisRescore.objects.filter(scoring_version="v-cmd").exists())
@@ -0,0 +1,70 @@
+import datetime
+import io
+import os
+
+from django.core.management import call_command
+
+from .. import rollups
+from ..models import ButtonClick, ClickHourlyStat, DiagnosisHourlyStat, DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+HOUR = datetime.datetime(2026, 3, 1, 10)
+
+
+class RollupTests(ApiTestCase):
+    def diagnose(self, created_at, code=3, total=10, skin_age=None):
+        row = DiagnosisResult.objects.create(
+            answers=ANSWERS, result_code=code, total_score=total, skin_age=skin_age, lang="KOR"
+        )
+        DiagnosisResult.objects.filter(pk=row.pk).update(created_at=created_at)
+        return row
+
+    def click(self, created_at, key="share"):
+        row = ButtonClick.objects.create(button_key=key, lang="KOR")
+        ButtonClick.objects.filter(pk=row.pk).update(created_at=created_at)
+
+    def test_rebuild_recomputes_range(self):
+        self.diagnose(HOUR + datetime.timedelta(minutes=5), skin_age=30)
+        self.diagnose(HOUR + datetime.timedelta(minutes=50), total=20)
+        self.diagnose(HOUR + datetime.timedelta(hours=1, minutes=1), code=None)
+        self.diagnose(HOUR + datetime.timedelta(hours=5))  # 구간 밖
+        self.click(HOUR + datetime.timedelta(minutes=7))
+        self.click(HOUR + datetime.timedelta(minutes=8))
+        DiagnosisHourlyStat.objects.create(hour=HOUR, result_code=3, lang="KOR", count=99)
+
+        for _ in range(2):  # 멱등
+            self.assertEqual(rollups.rebuild(HOUR, HOUR + datetime.timedelta(hours=2)), (2, 1))
+        first = DiagnosisHourlyStat.objects.get(hour=HOUR)
+        self.assertEqual((first.count, first.sum_total_score, first.sum_skin_age, first.skin_age_count), (2, 30, 30, 1))
+        self.assertEqual(DiagnosisHourlyStat.objects.get(hour=HOUR + datetime.timedelta(hours=1)).result_code, 0)
+        self.assertEqual(ClickHourlyStat.objects.get().count, 2)
+
+        until = HOUR + datetime.timedelta(hours=2)
+        resp = self.client.get("/api/stats", {"from": HOUR.isoformat(), "to": until.isoformat()})
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual([r["count"] for r in body["diagnoses"]], [2, 1])
+        self.assertEqual([r["result_code"] for r in body["diagnoses"]], [3, None])
+        self.assertEqual(body["clicks"][0]["count"], 2)
+
+    def test_buffer_merges_increments_per_key(self):
+        buf = rollups.RollupBuffer()
+        buf._pid = os.getpid()  # flush 스레드 없이 직접 flush
+        key = {"hour": HOUR, "result_code": 3, "lang": "KOR"}
+        buf.add(DiagnosisHourlyStat, key, {"count": 1, "sum_total_score": 10})
+        buf.add(DiagnosisHourlyStat, key, {"count": 2, "sum_total_score": 5})
+        buf.add(ClickHourlyStat, {"hour": HOUR, "button_key": "share", "lang": "KOR"}, {"count": 1})
+        self.assertEqual(buf.flush(), 2)
+        buf.add(DiagnosisHourlyStat, key, {"count": 1, "sum_total_score": 1})
+        buf.flush()
+        row = DiagnosisHourlyStat.objects.get()
+        self.assertEqual((row.count, row.sum_total_score), (4, 16))
+        self.assertEqual(buf.flush(), 0)
+
+    def test_rebuild_command_skips_current_hour(self):
+        now = datetime.datetime.now()
+        self.diagnose(now)
+        self.diagnose(now - datetime.timedelta(hours=2))
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        hours = list(DiagnosisHourlyStat.objects.values_list("hour", flat=True))
+        self.assertEqual(hours, [rollups.truncate_hour(now - datetime.timedelta(hours=2))])
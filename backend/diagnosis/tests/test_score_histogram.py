@@ -0,0 +1,101 @@
+import io
+import os
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import score_histogram, scoring_tables
+from ..models import DiagnosisResult, ScoreHistogramBin, ScoreHistogramSeed
+from .helpers import ANSWERS, ApiTestCase
+
+
+class PercentileTests(SimpleTestCase):
+    def test_percentiles_count_half_of_ties(self):
+        table = score_histogram.percentiles({10: 2, 20: 1, 30: 1})
+        self.assertEqual(table[30], 12)  # 위 0 + 같은 점수 1/2 → 0.5/4
+        self.assertEqual(table[20], 38)
+        self.assertEqual(table[15], 50)  # 빈 점수도 채움
+        self.assertEqual(table[10], 75)
+        self.assertEqual(score_histogram.percentiles({}), {})
+
+    def test_percentile_bounds_and_labels(self):
+        view = score_histogram._View("v1", {5: 1, 6: 1})
+        self.assertEqual((view.lookup(100), view.lookup(-5)), (1, 99))
+        self.assertEqual(score_histogram.label_for(12), "상위 12%")
+        self.assertEqual(score_histogram.label_for(75), "하위 25%")
+
+
+class HistogramTestMixin:
+    def worker(self):
+        hist = score_histogram.LiveHistogram()
+        hist._pid = os.getpid()  # 백그라운드 동기화 스레드 없이 sync() 를 직접 호출
+        return hist
+
+    def diagnose(self, total):
+        return DiagnosisResult.objects.create(
+            answers=ANSWERS, scoring_version=scoring_tables.get_tables().version, total_score=total
+        )
+
+    def counts(self):
+        return score_histogram.load(scoring_tables.get_tables().version)
+
+
+class LivePercentileTests(HistogramTestMixin, ApiTestCase):
+    def test_result_includes_live_percentile(self):
+        hist = self.worker()
+        self.addCleanup(setattr, score_histogram, "_histogram", score_histogram._histogram)
+        score_histogram._histogram = hist
+        with override_settings(DIAG_SCORE_HISTOGRAM=True, DIAG_LIVE_PERCENTILE=True,
+                               DIAG_LIVE_PERCENTILE_MIN_SAMPLES=3):
+            first = self.post("/api/result", {"answers": ANSWERS}).json()
+            self.assertIsNone(first["live_percentile"])  # 아직 표본 없음
+            for total in (0, 1000):
+                self.diagnose(total)
+            self.assertTrue(hist.sync())
+            body = self.post("/api/result", {"answers": ANSWERS}).json()
+        self.assertEqual(body["live_percentile"], 50)
+        self.assertEqual(body["live_percentile_label"], "상위 50%")
+
+    def test_rebuild_command(self):
+        for total in (10, 10, 20):
+            self.diagnose(total)
+        ScoreHistogramBin.objects.create(scoring_version="v-old", total_score=1, count=5)
+        out = io.StringIO()
+        call_command("rebuild_score_histogram", stdout=out)
+        self.assertIn("2 bins", out.getvalue())
+        self.assertEqual(self.counts(), {10: 2, 20: 1})
+        self.assertEqual(score_histogram.load("v-old"), {})
+
+
+class ScoreHistogramSeedTests(HistogramTestMixin, TestCase):
+    def test_seed_and_deltas_do_not_overlap(self):
+        version = scoring_tables.get_tables().version
+        old = [self.diagnose(t) for t in (10, 10, 20)]
+        slow = self.worker()  # 시드 전에 저장했지만 아직 안 더한 워커
+        for r in old:
+            slow.add(version, r.total_score, r.created_at)
+
+        first = self.worker()
+        self.assertTrue(first.sync())
+        self.assertEqual(self.counts(), {10: 2, 20: 1})
+        self.assertEqual(first._view.samples, 3)
+        self.assertTrue(ScoreHistogramSeed.objects.filter(scoring_version=version).exists())
+
+        new = self.diagnose(30)
+        slow.add(version, new.total_score, new.created_at)
+        self.assertTrue(slow.sync())
+        self.assertEqual(self.counts(), {10: 2, 20: 1, 30: 1})
+
+        # rebuild 는 cutoff 를 옮김 → 그 전에 저장된 진단의 늦은 증분은 버려짐
+        late = self.worker()
+        late.add(version, new.total_score, new.created_at)
+        score_histogram.rebuild()
+        self.assertTrue(late.sync())
+        self.assertEqual(self.counts(), {10: 2, 20: 1, 30: 1})
+
+    def test_seed_replaces_bins_without_seed(self):
+        version = scoring_tables.get_tables().version
+        self.diagnose(10)
+        ScoreHistogramBin.objects.create(scoring_version=version, total_score=99, count=5)
+        self.assertTrue(self.worker().sync())
+        self.assertEqual(self.counts(), {10: 1})
@@ -0,0 +1,50 @@
+import random
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from .. import quiz_logic, scoring_lut, scoring_tables
+
+
+class ScoringLutTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lut_dir = tempfile.mkdtemp()
+        cls.tables = scoring_tables.compile_tables(scoring_tables.builtin_raw())
+        cls.path = scoring_lut.build(cls.tables, cls.lut_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.lut_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        scoring_lut.reset()
+        self.addCleanup(scoring_lut.reset)
+
+    def test_lookup_matches_tables(self):
+        lut = scoring_lut.ScoringLut(str(self.path), self.tables)
+        self.assertEqual(lut.count, scoring_tables.N_OPT ** len(scoring_lut.relevant_questions(self.tables)))
+        rng = random.Random(11)
+        for _ in range(500):
+            answers = [rng.randint(0, 4) for _ in range(12)]
+            year = rng.choice([None, 1990, 2005])
+            self.assertEqual(lut.score(answers, year), self.tables.score(answers, year), answers)
+
+    def test_compute_result_uses_lut_only_when_configured(self):
+        self.assertIsNone(scoring_lut.get_lut(self.tables))
+        with self.settings(DIAG_SCORING_LUT_DIR=self.lut_dir):
+            scoring_lut.reset()
+            self.assertIsNotNone(scoring_lut.get_lut(self.tables))
+            answers = [1, 1, 2, 3, 1, 2, 1, 2, 3, 1, 2, 1]
+            self.assertEqual(quiz_logic.compute_result(answers, 1995),
+                             quiz_logic.compute_result_reference(answers, 1995))
+
+    def test_missing_or_stale_file_is_ignored(self):
+        raw = scoring_tables.builtin_raw()
+        raw["version"] = "v-other"
+        with self.settings(DIAG_SCORING_LUT_DIR=self.lut_dir):
+            with self.assertLogs("diagnosis.scoring_lut", "WARNING"):
+                self.assertIsNone(scoring_lut.get_lut(scoring_tables.compile_tables(raw)))
@@ -0,0 +1,92 @@
+import copy
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from .. import quiz_logic, scoring_tables
+
+
+class ScoringTablesTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        self.path = os.path.join(self.dir, "tables.json")
+        scoring_tables.reset()
+        self.addCleanup(scoring_tables.reset)
+
+    def write(self, version, delta=None, mtime=None):
+        raw = copy.deepcopy(scoring_tables.builtin_raw())
+        raw["version"] = version
+        if delta is not None:
+            raw["pct_age_table"][0][3] = delta
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def tables(self):
+        with override_settings(DIAG_SCORING_TABLES=self.path, DIAG_SCORING_RELOAD_INTERVAL=0):
+            return scoring_tables.get_tables()
+
+    def test_builtin_matches_reference(self):
+        tables = scoring_tables.get_tables()
+        self.assertEqual(tables.version, quiz_logic.TABLES_VERSION)
+        rng = random.Random(5)
+        for _ in range(500):
+            answers = [rng.randint(0, 4) for _ in range(12)]
+            year = rng.choice([None, 1990, 2005])
+            expected = quiz_logic.compute_result_reference(answers, year)
+            self.assertEqual({k: v for k, v in tables.score(answers, year).items() if k in expected}, expected)
+
+    def test_hot_reload(self):
+        self.write("v2", delta=-0.5, mtime=1000)
+        first = self.tables()
+        self.assertEqual(first.version, "v2")
+        self.assertIs(self.tables(), first)  # mtime 그대로면 다시 읽지 않음
+
+        self.write("v3", delta=-0.4, mtime=2000)
+        self.assertEqual(self.tables().version, "v3")
+
+        with open(self.path, "w") as f:
+            f.write("{")
+        os.utime(self.path, (3000, 3000))
+        with self.assertLogs("diagnosis.scoring_tables", "ERROR"):
+            self.assertEqual(self.tables().version, "v3")  # 잘못된 파일 → 이전 표 유지
+
+    def test_same_version_with_different_content_rejected(self):
+        self.write("v2", delta=-0.5, mtime=1000)
+        first = self.tables()
+        self.write("v2", delta=-0.25, mtime=2000)
+        with self.assertLogs("diagnosis.scoring_tables", "ERROR"):
+            self.assertIs(self.tables(), first)
+
+        scoring_tables.reset()
+        self.write(quiz_logic.TABLES_VERSION, delta=-0.25, mtime=3000)
+        with self.assertLogs("diagnosis.scoring_tables", "ERROR"):
+            self.assertIs(self.tables(), scoring_tables.builtin_tables())
+        with self.assertRaisesMessage(CommandError, "bump the version"):
+            call_command("scoring_tables", "--check", self.path)
+
+        self.write(quiz_logic.TABLES_VERSION, mtime=4000)  # 같은 내용이면 허용
+        out = io.StringIO()
+        call_command("scoring_tables", "--check", self.path, stdout=out)
+        self.assertIn("ok: version=", out.getvalue())
+
+    def test_validation(self):
+        raw = scoring_tables.builtin_raw()
+        bad = [
+            {**raw, "version": ""},
+            {**raw, "a_cats": raw["a_cats"] + ["x" * 17]},
+            {**raw, "result_map": raw["result_map"] + [["nope", raw["b_cats"][0], 1]]},
+            {**raw, "weights": {**raw["weights"], "13": {}}},
+            {**raw, "pct_default": ["상위 50%"]},
+        ]
+        for value in bad:
+            with self.assertRaises(scoring_tables.ScoringTablesError):
+                scoring_tables.compile_tables(value)
@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+
+from .. import share_pages
+
+
+class SharePageTests(SimpleTestCase):
+    def test_etag_and_cache_headers(self):
+        resp = self.client.get("/share/1?lang=ENG")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b"/assets/result-1_eng.png", resp.content)
+        self.assertIn("max-age=", resp["Cache-Control"])
+        again = self.client.get("/share/1?lang=ENG", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], resp["ETag"])
+        other = self.client.get("/share/1?lang=KOR", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(other.status_code, 200)
+
+    def test_pages_are_prerendered(self):
+        self.assertIs(share_pages.get_page(2, "kor"), share_pages.get_page(2, "KOR"))
+        self.assertEqual(share_pages.get_page(2, "xx"), share_pages.get_page(2, "KOR"))
+        self.assertEqual(share_pages.get_page(999, "ENG").body, share_pages.render_html(999, "ENG").encode())
+
+    def test_etag_matches(self):
+        etag = share_pages.get_page(1, "KOR").etag
+        self.assertTrue(share_pages.etag_matches(f'"x", W/{etag}', etag))
+        self.assertTrue(share_pages.etag_matches("*", etag))
+        self.assertFalse(share_pages.etag_matches("", etag))
@@ -0,0 +1,110 @@
+import datetime
+import io
+import random
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from .. import sketches
+from ..models import CompletionSketch, DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+START = datetime.datetime(2026, 3, 1, 9, 0, 0)
+
+
+class DDSketchTests(SimpleTestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(5)
+        values = sorted(rng.lognormvariate(4, 1) for _ in range(5000))
+        sk = sketches.DDSketch(0.01)
+        for v in values:
+            sk.add(v)
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sk.quantile(q) / exact, 1, delta=0.02)
+        self.assertEqual((sk.min, sk.max), (values[0], values[-1]))
+
+    def test_bytes_roundtrip_and_merge(self):
+        a, b = sketches.DDSketch(0.01), sketches.DDSketch(0.01)
+        for v in (0.0, 1.5, 30.0, 30.2):
+            a.add(v)
+        b.add(600.0, n=3)
+        copy = sketches.DDSketch.from_bytes(a.to_bytes())
+        self.assertEqual((copy.count, copy.bins, copy.min, copy.max), (a.count, a.bins, a.min, a.max))
+        copy.merge(b)
+        self.assertEqual(copy.count, 7)
+        self.assertEqual(copy.max, 600.0)
+        self.assertAlmostEqual(copy.quantile(0.99), 600.0, delta=6.0)
+
+    def test_merge_converts_accuracy(self):
+        coarse = sketches.DDSketch(0.05)
+        coarse.add(100.0)
+        fine = sketches.DDSketch(0.01)
+        with self.assertRaises(ValueError):
+            fine.merge(coarse)
+        fine.merge(coarse.with_accuracy(0.01))
+        self.assertAlmostEqual(fine.quantile(0.5), 100.0, delta=10.0)
+
+
+class CompletionStatsTests(ApiTestCase):
+    def diagnose(self, seconds, lang="KOR", code=3, day=START):
+        row = DiagnosisResult.objects.create(
+            answers=ANSWERS, lang=lang, result_code=code,
+            client_started_at=day - datetime.timedelta(seconds=seconds), client_submitted_at=day,
+        )
+        DiagnosisResult.objects.filter(pk=row.pk).update(created_at=day)
+
+    def test_completion_seconds_rejects_bad_ranges(self):
+        row = DiagnosisResult(client_started_at=START, client_submitted_at=START + datetime.timedelta(seconds=42))
+        self.assertEqual(sketches.completion_seconds(row), 42.0)
+        row.client_submitted_at = START - datetime.timedelta(seconds=1)
+        self.assertIsNone(sketches.completion_seconds(row))
+        row.client_submitted_at = None
+        self.assertIsNone(sketches.completion_seconds(row))
+
+    def test_rebuild_and_stats(self):
+        for seconds in (30, 60, 90):
+            self.diagnose(seconds)
+        self.diagnose(45, lang="ENG")
+        self.diagnose(45, day=START + datetime.timedelta(days=3))  # 구간 밖
+        CompletionSketch.objects.create(day=START.date(), lang="JPN", result_code=0, sketch=b"", count=0)
+
+        out = io.StringIO()
+        call_command("rebuild_completion_sketches", "--since", "2026-03-01", "--until", "2026-03-02", stdout=out)
+        self.assertIn("2 sketches", out.getvalue())
+        self.assertFalse(CompletionSketch.objects.filter(lang="JPN").exists())
+
+        body = self.client.get("/api/stats/completion?from=2026-03-01&to=2026-03-02&lang=kor").json()
+        self.assertEqual((body["lang"], body["count"], body["min"], body["max"]), ("KOR", 3, 30.0, 90.0))
+        self.assertAlmostEqual(body["p50"], 60.0, delta=0.6)
+        everyone = self.client.get("/api/stats/completion?from=2026-03-01&to=2026-03-02").json()
+        self.assertEqual(everyone["count"], 4)
+        self.assertEqual(self.client.get("/api/stats/completion?result_code=x").status_code, 400)
+
+    def test_result_view_records_duration(self):
+        with override_settings(DIAG_COMPLETION_SKETCHES=True):
+            buf = sketches.SketchBuffer()
+            buf._ensure_started = lambda: None
+            self.addCleanup(setattr, sketches, "_buffer", sketches._buffer)
+            sketches._buffer = buf
+            self.post("/api/result", {
+                "answers": ANSWERS,
+                "client_started_at": "2026-03-01T09:00:00Z",
+                "client_submitted_at": "2026-03-01T09:01:30Z",
+            })
+        (sk,) = buf.snapshot().values()
+        self.assertEqual((sk.count, sk.min), (1, 90.0))
+        self.assertEqual(buf.flush(), 1)
+        self.assertEqual(CompletionSketch.objects.get().count, 1)
+
+    @override_settings(DIAG_SKETCH_ACCURACY=0.02)
+    def test_stats_after_accuracy_change(self):
+        old = sketches.DDSketch(0.01)
+        for v in (10.0, 20.0, 30.0):
+            old.add(v)
+        CompletionSketch.objects.create(
+            day=datetime.date.today(), lang="ENG", result_code=0, sketch=old.to_bytes(), count=old.count
+        )
+        resp = self.client.get("/api/stats/completion")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["count"], 3)
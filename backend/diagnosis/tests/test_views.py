@@ -0,0 +1,48 @@
+import json
+
+from django.test import AsyncRequestFactory
+
+from .. import quiz_logic, views
+from ..models import DiagnosisResult
+from .helpers import ANSWERS, ApiTestCase
+
+
+class ResultViewTests(ApiTestCase):
+    def test_result(self):
+        resp = self.post("/api/result", {"answers": ANSWERS, "birth_year": 1995})
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        expected = quiz_logic.compute_result(ANSWERS, 1995)
+        for field in ("a_type", "b_type", "code", "scores", "total_score", "percentile", "skin_age"):
+            self.assertEqual(body[field], expected[field])
+        row = DiagnosisResult.objects.get(pk=body["diagnosis_id"])
+        self.assertEqual(row.total_score, expected["total_score"])
+
+    def test_result_rejects_bad_answers(self):
+        self.assertEqual(self.post("/api/result", {"answers": [9] * 12}).status_code, 400)
+        self.assertEqual(self.client.post("/api/result", "{", content_type="application/json").status_code, 400)
+        self.assertEqual(self.client.get("/api/result").status_code, 405)
+
+
+class AsyncViewTests(ApiTestCase):
+    factory = AsyncRequestFactory()
+
+    def request(self, path, data):
+        return self.factory.post(path, json.dumps(data), content_type="application/json")
+
+    async def test_result_matches_sync_view(self):
+        resp = await views.result_view_async(self.request("/api/result", {"answers": ANSWERS, "birth_year": 1995}))
+        self.assertEqual(resp.status_code, 200)
+        body = json.loads(resp.content)
+        expected = quiz_logic.compute_result(ANSWERS, 1995)
+        self.assertEqual({k: body[k] for k in expected}, expected)
+        self.assertTrue(await DiagnosisResult.objects.filter(pk=body["diagnosis_id"]).aexists())
+
+    async def test_click_and_share(self):
+        resp = await views.result_view_async(self.request("/api/result", {"answers": [9] * 12}))
+        self.assertEqual(resp.status_code, 400)
+        resp = await views.track_click_view_async(self.request("/api/track-click", {"button_key": "share"}))
+        self.assertEqual(resp.status_code, 200)
+        resp = await views.share_view_async(self.factory.get("/share/3?lang=ENG"), 3)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b"result-3_eng.png", resp.content)
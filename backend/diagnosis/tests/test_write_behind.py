@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.db import OperationalError
+
+from .. import write_behind
+from ..models import ButtonClick, DiagnosisResult
+from .helpers import ANSWERS, ApiTransactionTestCase
+
+
+class WriteBehindQueueTests(ApiTransactionTestCase):
+    def queue(self, **kwargs):
+        q = write_behind.WriteBehindQueue(DiagnosisResult, **kwargs)
+        q._ensure_started = lambda: None  # flusher 스레드 없이 현재 스레드에서 저장
+        q.backoff = 0
+        return q
+
+    @staticmethod
+    def diag(**kwargs):
+        return DiagnosisResult(answers=ANSWERS, total_score=10, **kwargs)
+
+    def test_flush_saves_queued_rows(self):
+        q = self.queue()
+        rows = [self.diag() for _ in range(3)]
+        for r in rows:
+            self.assertTrue(q.submit(r))
+        self.assertFalse(DiagnosisResult.objects.exists())
+        q.flush_and_stop()
+        self.assertEqual(set(DiagnosisResult.objects.values_list("pk", flat=True)), {r.pk for r in rows})
+
+    def test_full_queue_saves_synchronously(self):
+        q = self.queue(maxsize=1, put_timeout=0)
+        self.assertTrue(q.submit(self.diag()))
+        overflow = self.diag()
+        with self.assertLogs("diagnosis.write_behind", "WARNING"):
+            self.assertFalse(q.submit(overflow))
+        self.assertTrue(DiagnosisResult.objects.filter(pk=overflow.pk).exists())
+
+    def test_result_view_returns_id_before_flush(self):
+        q = self.queue()
+        with self.settings(DIAG_WRITE_BEHIND=True), mock.patch.object(write_behind, "_queue", q):
+            diag_id = self.post("/api/result", {"answers": ANSWERS}).json()["diagnosis_id"]
+            self.assertFalse(DiagnosisResult.objects.filter(pk=diag_id).exists())
+            q.flush_and_stop()
+        self.assertTrue(DiagnosisResult.objects.filter(pk=diag_id).exists())
+
+    def test_retries_then_carries_rows_while_db_is_down(self):
+        q = self.queue()
+        q.retries = 2
+        rows = [self.diag(), self.diag()]
+        down = OperationalError("database is down")
+        with mock.patch.object(DiagnosisResult.objects, "bulk_create", side_effect=down) as bulk, \
+                mock.patch.object(DiagnosisResult, "save", side_effect=down), \
+                self.assertLogs("diagnosis.write_behind", "WARNING"):
+            q._write(rows)
+        self.assertEqual(bulk.call_count, 3)
+        self.assertEqual(q._carry, rows)
+        self.assertFalse(DiagnosisResult.objects.exists())
+
+        # DB 가 돌아오면 넘겨 둔 행부터 함께 저장
+        later = self.diag()
+        q._write([later])
+        self.assertEqual(q._carry, [])
+        self.assertEqual(DiagnosisResult.objects.count(), 3)
+
+    def test_bad_row_is_dropped_and_rest_saved(self):
+        dup = self.diag()
+        dup.save(force_insert=True)
+        good = [self.diag(), self.diag()]
+        q = self.queue()
+        with self.assertLogs("diagnosis.write_behind", "INFO") as logs:
+            q._write([good[0], self.diag(id=dup.pk), self.diag(lang=None), good[1]])
+        self.assertTrue(any("Dropped duplicate" in line for line in logs.output))
+        self.assertEqual(q._carry, [])
+        self.assertEqual(set(DiagnosisResult.objects.values_list("pk", flat=True)), {dup.pk, *(r.pk for r in good)})
+
+    def test_click_linked_once_diagnosis_is_flushed(self):
+        q = self.queue()
+        with self.settings(DIAG_WRITE_BEHIND=True), mock.patch.object(write_behind, "_queue", q):
+            diag_id = self.post("/api/result", {"answers": ANSWERS}).json()["diagnosis_id"]
+            resp = self.post("/api/track-click", {"button_key": "share", "diagnosis_id": diag_id})
+            self.assertEqual(resp.status_code, 200)
+            self.assertIsNone(ButtonClick.objects.get().diagnosis_id)
+            q.flush_and_stop()
+        self.assertEqual(str(ButtonClick.objects.get().diagnosis_id), diag_id)
@@ -1,9 +1,35 @@
 # diagnosis/urls.py
+from django.apps import apps
+from django.conf import settings
 from django.urls import path
-from .views import result_view, share_view, track_click_view
+from . import metrics, views
+
+# ASGI(acne_service/asgi.py) 에서는 async 뷰, WSGI 에서는 sync 뷰
+if getattr(settings, "DIAG_ASYNC_VIEWS", False):
+    result_view = views.result_view_async
+    track_click_view = views.track_click_view_async
+    share_view = views.share_view_async
+else:
+    result_view = views.result_view
+    track_click_view = views.track_click_view
+    share_view = views.share_view
 
 urlpatterns = [
     path("api/result", result_view, name="api_result"),
+    path("api/result/batch", views.result_batch_view, name="api_result_batch"),
     path("api/track-click", track_click_view, name="api_track_click"),
+    path("api/track-click/batch", views.track_click_batch_view, name="api_track_click_batch"),
+    path("api/stats", views.stats_view, name="api_stats"),
+    path("api/stats/completion", views.completion_stats_view, name="api_stats_completion"),
     path("share/<int:code>", share_view, name="share"),
+    path("og/<int:code>.png", views.og_image_view, name="og_image"),
+    path("metrics", metrics.metrics_view, name="metrics"),
 ]
+
+# staff 전용 (로그인 세션 필요) → auth 가 있는 admin 배포에서만. API 프로필(settings_api)에는 없음
+if apps.is_installed("django.contrib.auth"):
+    urlpatterns += [
+        path("api/export/<str:kind>.<str:fmt>", views.export_view, name="api_export"),
+        path("admin/diag-profiles/", views.profiles_view, name="diag_profiles"),
+        path("admin/diag-profiles/<str:name>", views.profile_detail_view, name="diag_profile"),
+    ]
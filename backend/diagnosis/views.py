@@ -1,22 +1,47 @@
 # diagnosis/views.py
-import json
 import logging
 import datetime
+import functools
 import traceback
 
-from django.http import JsonResponse, HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse,
+)
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
 
-from . import quiz_logic
-from .models import DiagnosisResult, ButtonClick
+from . import (
+    clicks, codec, export, idempotency, logging_utils, metrics, og_images, profiling, quiz_logic,
+    ratelimit, rollups, score_histogram, scoring_tables, share_pages, sketches, write_behind,
+)
+from .codec import JsonResponse
+from .db_routing import analytics_db
+from .models import ClickHourlyStat, DiagnosisHourlyStat, DiagnosisResult
 
 logger = logging.getLogger(__name__)
 
 
+def _staff_member_required(view):
+    """admin 의 staff_member_required 를 첫 호출 때 적용 (API 프로필에서는 admin 을 import 하지 않음)"""
+    wrapped = None
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        nonlocal wrapped
+        if wrapped is None:
+            from django.contrib.admin.views.decorators import staff_member_required
+            wrapped = staff_member_required(view)
+        return wrapped(request, *args, **kwargs)
+    return wrapper
+
+
 def _brief(request):
     ua = request.META.get("HTTP_USER_AGENT", "-")
-    ip = request.META.get("HTTP_X_FORWARDED_FOR") or request.META.get("REMOTE_ADDR")
+    ip = logging_utils.client_ip(request)
     return f"IP={ip} UA={ua[:80]}"
 
 
@@ -38,80 +63,100 @@ def _ok_preflight():
     return JsonResponse({"ok": True}, status=200)
 
 
-@csrf_exempt
-def result_view(request):
-    # ✅ OPTIONS(preflight) 먼저 처리
-    if request.method == "OPTIONS":
-        return _ok_preflight()
-
-    if request.method != "POST":
-        return JsonResponse({"detail": "Method not allowed"}, status=405)
-
+def _decode_result_body(request):
+    """반환: (에러 JsonResponse, None) 또는 (None, body dict)"""
     try:
-        body = json.loads(request.body.decode("utf-8"))
+        with metrics.stage(request, "decode"):
+            body = codec.loads(request.body)
     except Exception:
-        return JsonResponse({"detail": "Invalid JSON"}, status=400)
+        return JsonResponse({"detail": "Invalid JSON"}, status=400), None
+    if not isinstance(body, dict):
+        return JsonResponse({"detail": "body must be an object"}, status=400), None
+    return None, body
+
 
+def _prepare_result(request, body, idempotency_key=None):
+    """
+    채점 + 저장할 행 구성 (sync/async 뷰 공용, DB 접근 없음)
+    반환: (에러 JsonResponse, None) 또는 (None, (res, diag, image))
+    """
     answers = body.get("answers")
     birth_year = body.get("birth_year")
     lang = (body.get("lang") or request.GET.get("lang") or "ENG").upper()
 
-    client_started_at = parse_datetime(body.get("client_started_at") or "")
-    client_submitted_at = parse_datetime(body.get("client_submitted_at") or "")
+    client_started_at = clicks.parse_client_ts(body.get("client_started_at"))
+    client_submitted_at = clicks.parse_client_ts(body.get("client_submitted_at"))
 
+    # 요청 하나는 한 버전의 표로 채점 (도중에 교체돼도 섞이지 않게)
+    tables = scoring_tables.get_tables()
     try:
-        res = quiz_logic.compute_result(answers, birth_year=birth_year)
+        with metrics.stage(request, "compute"):
+            res = quiz_logic.compute_result(
+                answers, birth_year=birth_year, tables=tables, live_percentile=score_histogram.live_enabled()
+            )
     except Exception as e:
-        return JsonResponse({"detail": str(e)}, status=400)
+        return JsonResponse({"detail": str(e)}, status=400), None
 
     code = res.get("code")
     image = f"/assets/result-{code}.png" if code else "/assets/result-1.png"
 
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    logger.info(
-        f"[{now}] {_brief(request)} + answers:{answers} "
-        f"--> A:{res['scores']['A']} B:{res['scores']['B']} total:{res['total_score']} "
-        f"pct:{res['percentile_label']} skin_age:{res['skin_age']} "
-        f"view: result-{code if code else '?'} .png"
-    )
+    # INFO 가 꺼져 있거나 샘플링에서 빠지면 아무 것도 만들지 않음. 문자열화는 출력 시점에
+    if logger.isEnabledFor(logging.INFO) and logging_utils.should_sample():
+        with metrics.stage(request, "log"):
+            line = logging_utils.ResultLogLine(request, answers, res)
+            logger.info("%s", line, extra={"diag": line})
 
     # ✅ dict -> int 합계로 저장 (이미 해결한 부분 유지)
     scores = res.get("scores") or {}
     score_a_total = _sum_numeric_values(scores.get("A") or {})
     score_b_total = _sum_numeric_values(scores.get("B") or {})
 
-    diagnosis_id = None
-    try:
-        diag = DiagnosisResult.objects.create(
-            lang=lang,
-            user_agent=(request.META.get("HTTP_USER_AGENT") or "")[:2000],
-            answers=answers or [],
-            birth_year=birth_year,
-            result_code=code,
-            skin_age=res.get("skin_age"),
-            skin_percentile=res.get("skin_percentile"),
-            score_a=score_a_total,
-            score_b=score_b_total,
-            total_score=res.get("total_score"),
-            client_started_at=client_started_at,
-            client_submitted_at=client_submitted_at,
-        )
-        diagnosis_id = str(diag.id)
-    except Exception as e:
-        logger.error(f"Failed to persist diagnosis: {e}")
-        logger.error(traceback.format_exc())
-        diagnosis_id = None
+    # id(uuid4)는 인스턴스 생성 시 확정 → write-behind 모드여도 바로 응답 가능
+    diag = DiagnosisResult(
+        lang=lang,
+        user_agent=(request.META.get("HTTP_USER_AGENT") or "")[:2000],
+        answers=answers or [],
+        birth_year=birth_year,
+        result_code=code,
+        skin_age=res.get("skin_age"),
+        skin_percentile=res.get("percentile"),
+        score_a=score_a_total,
+        score_b=score_b_total,
+        total_score=res.get("total_score"),
+        scoring_version=tables.version,
+        client_started_at=client_started_at,
+        client_submitted_at=client_submitted_at,
+        idempotency_key=idempotency_key,
+    )
+    if idempotency_key:
+        diag.id = idempotency.diagnosis_id(idempotency_key)
+    diag.set_analytics(answers, res)
+    return None, (res, diag, image)
+
 
+def _result_response(request, res, image, diagnosis_id, replayed=False):
     payload = {
         **res,
         "image": image,
         "diagnosis_id": diagnosis_id,
     }
-    return JsonResponse(payload, status=200)
+    with metrics.stage(request, "serialize"):
+        resp = JsonResponse(payload, status=200)
+    if replayed:
+        resp["Idempotent-Replayed"] = "true"
+    return resp
+
+
+def _log_persist_error(what, e):
+    metrics.db_failure(what)
+    logger.error(f"Failed to persist {what}: {e}")
+    logger.error(traceback.format_exc())
 
 
 @csrf_exempt
-def track_click_view(request):
+@ratelimit.limit("result")
+@profiling.profiled("result")
+def result_view(request):
     # ✅ OPTIONS(preflight) 먼저 처리
     if request.method == "OPTIONS":
         return _ok_preflight()
@@ -119,61 +164,460 @@ def track_click_view(request):
     if request.method != "POST":
         return JsonResponse({"detail": "Method not allowed"}, status=405)
 
+    err, body = _decode_result_body(request)
+    if err is not None:
+        return err
+    # 재전송이면 채점/저장 없이 처음 결과 그대로
+    key = idempotency.key_for(request, body)
+    if key is not None:
+        with metrics.stage(request, "idempotency"):
+            replay = idempotency.lookup(key)
+        if replay is not None:
+            return _result_response(request, *replay, replayed=True)
+
+    err, prepared = _prepare_result(request, body, key)
+    if err is not None:
+        return err
+    res, diag, image = prepared
+
+    diagnosis_id = None
+    try:
+        with metrics.stage(request, "db"):
+            if key is not None:
+                replay = idempotency.save(diag, res, image)
+                if replay[0] is not res:  # 다른 워커가 먼저 저장한 재전송
+                    return _result_response(request, *replay, replayed=True)
+            else:
+                write_behind.save_diagnosis(diag)
+        diagnosis_id = str(diag.id)
+    except Exception as e:
+        _log_persist_error("diagnosis", e)
+        diagnosis_id = None
+
+    return _result_response(request, res, image, diagnosis_id)
+
+
+@csrf_exempt
+@ratelimit.limit("result_batch")
+def result_batch_view(request):
+    """
+    여러 건 일괄 채점 (파트너 키오스크/리플레이 작업용). DB 저장은 하지 않음.
+    body: {"items": [{"answers": [...], "birth_year": 1995}, ...]}
+    """
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
     try:
-        body = json.loads(request.body.decode("utf-8"))
+        body = codec.loads(request.body)
     except Exception:
         return JsonResponse({"detail": "Invalid JSON"}, status=400)
 
-    button_key = (body.get("button_key") or "").strip()
-    if not button_key:
-        return JsonResponse({"detail": "button_key is required"}, status=400)
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, list):
+        return JsonResponse({"detail": "items must be a list"}, status=400)
+    max_items = getattr(settings, "DIAG_BATCH_MAX_ITEMS", 5000)
+    if len(items) > max_items:
+        return JsonResponse({"detail": f"too many items (max {max_items})"}, status=400)
+
+    # 검증 실패한 항목은 그 자리에 detail 만 돌려주고 나머지는 채점
+    rows, years, pos = [], [], []
+    results = [None] * len(items)
+    for i, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("item must be an object")
+            row = quiz_logic.normalize_answers(item.get("answers"))
+        except Exception as e:
+            results[i] = {"detail": str(e)}
+            continue
+        rows.append(row)
+        years.append(item.get("birth_year"))
+        pos.append(i)
+
+    if rows:
+        # NumPy 는 배치 요청에서만 필요 → 콜드 스타트 때 import 하지 않음
+        import numpy as np
+
+        from . import batch_scoring
+
+        tables = batch_scoring.get_tables()
+        scored = batch_scoring.to_dicts(
+            batch_scoring.score_matrix(np.array(rows, dtype=np.int64), years, tables), tables
+        )
+        for i, res in zip(pos, scored):
+            code = res.get("code")
+            res["image"] = f"/assets/result-{code}.png" if code else "/assets/result-1.png"
+            results[i] = res
+
+    return JsonResponse({"results": results}, status=200)
+
+
+def _prepare_click(request):
+    """반환: (에러 JsonResponse, None) 또는 (None, 저장 전 ButtonClick)"""
+    try:
+        with metrics.stage(request, "decode"):
+            body = codec.loads(request.body)
+    except Exception:
+        return JsonResponse({"detail": "Invalid JSON"}, status=400), None
+
+    # diagnosis 조회 없이 FK 값을 바로 넣음 (clicks.save_clicks 참고)
+    try:
+        return None, clicks.build_click(body)
+    except ValueError as e:
+        return JsonResponse({"detail": str(e)}, status=400), None
+
+
+@csrf_exempt
+@ratelimit.limit("click")
+@profiling.profiled("click")
+def track_click_view(request):
+    # ✅ OPTIONS(preflight) 먼저 처리
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
 
-    lang = (body.get("lang") or "ENG").upper()
-    diagnosis_id = body.get("diagnosis_id")
+    err, click = _prepare_click(request)
+    if err is not None:
+        return err
+    with metrics.stage(request, "db"):
+        clicks.save_clicks([click])
+
+    return JsonResponse({"ok": True}, status=200)
 
-    diag = None
-    if diagnosis_id:
+
+@csrf_exempt
+@ratelimit.limit("click_batch")
+def track_click_batch_view(request):
+    """
+    버퍼링된 클릭 일괄 저장 (FE sendBeacon flush 용)
+    body: [{"button_key", "lang", "diagnosis_id", "client_ts"}, ...] 또는 {"events": [...]}
+    """
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
+    # sendBeacon 은 text/plain 으로 오는 경우가 많아 Content-Type 은 보지 않음
+    try:
+        body = codec.loads(request.body)
+    except Exception:
+        return JsonResponse({"detail": "Invalid JSON"}, status=400)
+
+    events = body.get("events") if isinstance(body, dict) else body
+    if not isinstance(events, list):
+        return JsonResponse({"detail": "events must be a list"}, status=400)
+    max_events = getattr(settings, "DIAG_CLICK_BATCH_MAX_EVENTS", 500)
+    if len(events) > max_events:
+        return JsonResponse({"detail": f"too many events (max {max_events})"}, status=400)
+
+    batch, rejected = [], 0
+    for ev in events:
         try:
-            diag = DiagnosisResult.objects.filter(id=diagnosis_id).first()
-        except Exception:
-            diag = None
+            batch.append(clicks.build_click(ev))
+        except ValueError:
+            rejected += 1
+    saved = clicks.save_clicks(batch)
+
+    return JsonResponse({"ok": True, "saved": saved, "rejected": rejected}, status=200)
+
+
+def _share_response(request, code: int):
+    """사전 렌더링된 페이지 + ETag/Cache-Control, If-None-Match 일치 시 304"""
+    lang = request.GET.get("lang", "KOR")
+    # ?age=&pct= 가 있으면 og:image 를 개인화 이미지로 (렌더는 크롤러가 이미지를 가져갈 때)
+    key = og_images.parse_key(code, lang, request.GET.get("age"), request.GET.get("pct"))
+    image = og_images.image_url(key) if key is not None and og_images.available() else None
+    page = share_pages.get_page(code, lang, image)
+    if share_pages.etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), page.etag):
+        resp = HttpResponseNotModified()
+    else:
+        resp = HttpResponse(page.body, content_type="text/html; charset=utf-8")
+    resp["ETag"] = page.etag
+    resp["Cache-Control"] = f"public, max-age={getattr(settings, 'DIAG_SHARE_MAX_AGE', 3600)}"
+    return resp
+
+
+@profiling.profiled("share")
+def share_view(request, code: int):
+    return _share_response(request, code)
+
+
+def og_image_view(request, code: int):
+    """/og/<code>.png?lang=&age=&pct= 개인화 OG 이미지. 못 만들면 원본 결과 이미지로 redirect"""
+    lang = share_pages.normalize_lang(request.GET.get("lang", "KOR"))
+    key = og_images.parse_key(code, lang, request.GET.get("age"), request.GET.get("pct"))
+    hit = og_images.open_image(key, render_missing=False) if key is not None else None
+    # 새로 렌더하는 요청만 IP 별 한도 (캐시 hit 는 제한 없음). 넘으면 고정 이미지
+    if hit is None and key is not None and ratelimit.check(request, "og_render") is None:
+        hit = og_images.open_image(key)
+    if hit is None:
+        return HttpResponseRedirect(og_images.static_url(code, lang))
+
+    f, digest = hit
+    etag = f'"{digest[:32]}"'
+    if share_pages.etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), etag):
+        f.close()
+        resp = HttpResponseNotModified()
+    else:
+        resp = FileResponse(f, content_type="image/png")
+    resp["ETag"] = etag
+    # 같은 URL 은 항상 같은 이미지 (원본/폰트가 바뀌면 digest 가 바뀜)
+    resp["Cache-Control"] = f"public, max-age={getattr(settings, 'DIAG_OG_MAX_AGE', 86400)}"
+    return resp
+
+
+# ---- ASGI(async) 버전: DIAG_ASYNC_VIEWS=1 (asgi.py 기본값) 일 때 urls.py 에서 사용 ----
+# Django 4.2 의 csrf_exempt 는 sync 래퍼를 돌려줘서 async 뷰에는 속성만 직접 붙임
+def _async_csrf_exempt(view):
+    view.csrf_exempt = True
+    return view
+
+
+@_async_csrf_exempt
+@ratelimit.limit("result")
+@profiling.profiled("result")
+async def result_view_async(request):
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
+    err, body = _decode_result_body(request)
+    if err is not None:
+        return err
+    key = idempotency.key_for(request, body)
+    if key is not None:
+        with metrics.stage(request, "idempotency"):
+            replay = await idempotency.alookup(key)
+        if replay is not None:
+            return _result_response(request, *replay, replayed=True)
+
+    err, prepared = _prepare_result(request, body, key)
+    if err is not None:
+        return err
+    res, diag, image = prepared
 
+    diagnosis_id = None
     try:
-        ButtonClick.objects.create(
-            diagnosis=diag,
-            button_key=button_key[:32],
-            lang=lang,
-        )
+        with metrics.stage(request, "db"):
+            if key is not None:
+                replay = await sync_to_async(idempotency.save)(diag, res, image)
+                if replay[0] is not res:
+                    return _result_response(request, *replay, replayed=True)
+            elif write_behind.enabled():
+                # 큐 full 시 put_timeout 대기/동기 저장이 있어 이벤트 루프 밖에서 실행
+                await sync_to_async(write_behind.save_diagnosis)(diag)
+            else:
+                await diag.asave(force_insert=True)
+                rollups.record_diagnoses([diag])
+                sketches.record_diagnoses([diag])
+                score_histogram.record_diagnoses([diag])
+        diagnosis_id = str(diag.id)
     except Exception as e:
-        logger.error(f"Failed to persist click: {e}")
-        logger.error(traceback.format_exc())
+        _log_persist_error("diagnosis", e)
+        diagnosis_id = None
+
+    return _result_response(request, res, image, diagnosis_id)
+
+
+@_async_csrf_exempt
+@ratelimit.limit("click")
+@profiling.profiled("click")
+async def track_click_view_async(request):
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
+    err, click = _prepare_click(request)
+    if err is not None:
+        return err
+    with metrics.stage(request, "db"):
+        await clicks.asave_clicks([click])
 
     return JsonResponse({"ok": True}, status=200)
 
 
-def share_view(request, code: int):
-    lang = request.GET.get("lang", "KOR").upper()
-    img = f"/assets/result-{int(code)}.png"
-    if lang == "ENG":
-        img = img.replace(".png", "_eng.png")
-
-    title = "Spot Eraser"
-    desc = "Acne diagnosis result"
-    html = f"""<!doctype html>
+@profiling.profiled("share")
+async def share_view_async(request, code: int):
+    return _share_response(request, code)
+
+
+def _parse_range(request, default_hours: int = 24):
+    """?from=&to= (ISO). 기본은 최근 default_hours 시간"""
+    now = datetime.datetime.now() if not settings.USE_TZ else timezone.now()
+    until = parse_datetime(request.GET.get("to") or "") or now
+    since = parse_datetime(request.GET.get("from") or "") or (until - datetime.timedelta(hours=default_hours))
+    return since, until
+
+
+def stats_view(request):
+    """
+    시간별 롤업 조회 (읽기 전용). 원본 테이블은 스캔하지 않음.
+    GET /api/stats?from=2026-01-01T00:00:00&to=2026-01-02T00:00:00
+    """
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
+    try:
+        since, until = _parse_range(request)
+    except ValueError:
+        return JsonResponse({"detail": "Invalid from/to"}, status=400)
+    since = rollups.truncate_hour(since)
+
+    db = analytics_db()  # 통계 읽기는 replica (설정 시)
+    diagnoses = list(
+        DiagnosisHourlyStat.objects.using(db).filter(hour__gte=since, hour__lt=until)
+        .order_by("hour", "result_code", "lang")
+        .values("hour", "result_code", "lang", "count",
+                "sum_total_score", "sum_skin_age", "skin_age_count")
+    )
+    clicks_ = list(
+        ClickHourlyStat.objects.using(db).filter(hour__gte=since, hour__lt=until)
+        .order_by("hour", "button_key", "lang")
+        .values("hour", "button_key", "lang", "count")
+    )
+    for r in diagnoses:
+        r["result_code"] = r["result_code"] or None
+
+    return JsonResponse({
+        "from": since,
+        "to": until,
+        "diagnoses": diagnoses,
+        "clicks": clicks_,
+    }, status=200)
+
+
+def completion_stats_view(request):
+    """
+    퀴즈 완료 시간 분위수 (초). 일 단위 스케치를 병합하므로 기간과 무관하게 즉시 응답
+    GET /api/stats/completion?from=2026-01-01&to=2026-01-31&lang=KOR&result_code=3
+    """
+    if request.method == "OPTIONS":
+        return _ok_preflight()
+
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+
+    try:
+        since, until = _parse_range(request, default_hours=24 * 7)
+        result_code = request.GET.get("result_code")
+        result_code = int(result_code) if result_code else None
+    except ValueError:
+        return JsonResponse({"detail": "Invalid filter"}, status=400)
+    lang = (request.GET.get("lang") or "").upper() or None
+
+    sk = sketches.query(since.date(), until.date(), lang=lang, result_code=result_code, using=analytics_db())
+    return JsonResponse({
+        "from": since.date(),
+        "to": until.date(),
+        "lang": lang,
+        "result_code": result_code,
+        "count": sk.count,
+        "p50": sk.quantile(0.5),
+        "p90": sk.quantile(0.9),
+        "p99": sk.quantile(0.99),
+        "min": sk.min if sk.count else None,
+        "max": sk.max if sk.count else None,
+        "relative_accuracy": sk.relative_accuracy,
+    }, status=200)
+
+
+@_staff_member_required
+def export_view(request, kind: str, fmt: str):
+    """
+    스태프 전용 스트리밍 내보내기
+    GET /api/export/diagnoses.csv?from=&to=&result_code=3&lang=ENG
+    """
+    if kind not in export.KINDS or fmt not in export.FORMATS:
+        return JsonResponse({"detail": "Not found"}, status=404)
+    try:
+        since = parse_datetime(request.GET.get("from") or "")
+        until = parse_datetime(request.GET.get("to") or "")
+        result_code = request.GET.get("result_code")
+        result_code = int(result_code) if result_code else None
+    except ValueError:
+        return JsonResponse({"detail": "Invalid filter"}, status=400)
+
+    filters = {"since": since, "until": until, "lang": request.GET.get("lang") or None}
+    if kind == "diagnoses":
+        filters["result_code"] = result_code
+
+    content_type = "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson; charset=utf-8"
+    resp = StreamingHttpResponse(export.stream(kind, fmt, **filters), content_type=content_type)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    resp["Content-Disposition"] = f'attachment; filename="{kind}-{stamp}.{fmt}"'
+    return resp
+
+
+_PROFILE_PAGE = """<!doctype html>
 <html>
-<head>
-<meta charset="utf-8" />
-<title>{title}</title>
-<meta property="og:title" content="{title}" />
-<meta property="og:description" content="{desc}" />
-<meta property="og:image" content="{img}" />
-<meta property="og:type" content="website" />
-<meta name="twitter:card" content="summary_large_image" />
-<meta name="twitter:image" content="{img}" />
+<head><meta charset="utf-8" /><title>{title}</title>
+<style>body{{font-family:sans-serif;margin:24px}}table{{border-collapse:collapse}}
+td,th{{border:1px solid #ccc;padding:4px 8px;font-size:13px;text-align:left}}pre{{font-size:12px}}</style>
 </head>
 <body>
-<p>Result #{code}</p>
-<img src="{img}" alt="result" style="max-width:600px;width:100%" />
+<h1>{title}</h1>
+{body}
 </body>
 </html>"""
-    return HttpResponse(html)
+
+
+@_staff_member_required
+def profiles_view(request):
+    """최근 요청 프로파일 목록 (DIAG_PROFILING)"""
+    rows = "".join(
+        "<tr><td><a href=\"{href}\">{name}</a></td><td>{view}</td><td>{method} {path}</td><td>{status}</td>"
+        "<td>{ms}</td><td>{sql_count}</td><td>{sql_ms}</td></tr>".format(
+            href=escape(p["name"]), name=escape(p["name"]), view=escape(p.get("view", "")),
+            method=escape(p.get("method", "")), path=escape(p.get("path", "")), status=p.get("status", ""),
+            ms=p.get("ms", ""), sql_count=p.get("sql_count", ""), sql_ms=p.get("sql_ms", ""),
+        )
+        for p in profiling.recent()
+    )
+    state = "on" if profiling.enabled() else "off (DIAG_PROFILING=1 로 켜기)"
+    body = (
+        f"<p>profiling: {escape(state)} · dir: {escape(str(profiling.profile_dir()))}</p>"
+        "<table><tr><th>name</th><th>view</th><th>request</th><th>status</th><th>ms</th>"
+        f"<th>sql</th><th>sql ms</th></tr>{rows}</table>"
+    )
+    return HttpResponse(_PROFILE_PAGE.format(title="Request profiles", body=body))
+
+
+@_staff_member_required
+def profile_detail_view(request, name: str):
+    """프로파일 하나: pstats 상위 함수 + SQL. ?download=1 이면 .prof 파일"""
+    meta = profiling.load(name)
+    if meta is None:
+        return HttpResponse("not found\n", status=404, content_type="text/plain")
+    if request.GET.get("download"):
+        path = profiling.prof_path(name)
+        if path is None:
+            return HttpResponse("no cProfile data\n", status=404, content_type="text/plain")
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{name}.prof")
+
+    sort = request.GET.get("sort") if request.GET.get("sort") in ("cumulative", "tottime", "ncalls") else "cumulative"
+    sql_rows = "".join(
+        f"<tr><td>{q['ms']}</td><td>{escape(q.get('error') or '')}</td><td><code>{escape(q['sql'])}</code></td></tr>"
+        for q in meta.get("sql", ())
+    )
+    body = (
+        f"<p>{escape(meta.get('method', ''))} {escape(meta.get('path', ''))} → {meta.get('status')} "
+        f"in {meta.get('ms')} ms · SQL {meta.get('sql_count')} queries / {meta.get('sql_ms')} ms · "
+        f"<a href=\"?download=1\">download .prof</a> · sort: "
+        + " ".join(f"<a href=\"?sort={s}\">{s}</a>" for s in ("cumulative", "tottime", "ncalls"))
+        + f"</p><h2>cProfile</h2><pre>{escape(profiling.stats_text(name, sort) or 'n/a')}</pre>"
+        f"<h2>SQL</h2><table><tr><th>ms</th><th>error</th><th>sql</th></tr>{sql_rows}</table>"
+    )
+    return HttpResponse(_PROFILE_PAGE.format(title=escape(name), body=body))
@@ -0,0 +1,273 @@
+# diagnosis/write_behind.py
+"""
+DiagnosisResult write-behind 저장 (opt-in: DIAG_WRITE_BEHIND=1).
+
+- 요청 스레드는 bounded queue 에 행만 넣고 바로 응답
+- 백그라운드 flusher 가 batch_size 또는 flush_interval 마다 bulk_create
+- 큐가 가득 차면 put_timeout 만큼 기다리고(backpressure), 그래도 안 되면 동기 저장
+- 워커 종료(atexit) 시 남은 행을 모두 flush
+- bulk_create 실패: 연결 문제면 backoff 로 재시도 → 그래도 안 되면 한 행씩 insert
+  (문제 있는 행만 버리고, DB 가 계속 안 되는 행은 다음 주기로 넘김. 최대 maxsize 개)
+- 매 flush 전 close_old_connections() → DB 가 끊은 연결을 계속 붙잡지 않음
+- 아직 flush 안 된 진단을 가리키는 클릭은 diagnosis 없이 먼저 저장하고, 진단이 저장되면
+  flusher 가 diagnosis_id 를 채움 (defer_click_links, 다른 워커 큐에 있던 진단도 포함. 최대 LINK_TIMEOUT 초)
+
+id 는 모델 default(uuid4)로 인스턴스 생성 시점에 정해지므로 응답의 diagnosis_id 는 그대로 유효.
+(Idempotency-Key 요청은 키에서 만든 id → 다른 워커의 같은 재전송은 insert 때 pk 중복으로 버림)
+(단, created_at 은 auto_now_add 라 실제 insert 시각 = 최대 flush_interval 만큼 늦을 수 있음)
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, connection, transaction
+
+from . import metrics, rollups, score_histogram, sketches
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    def __init__(self, model, maxsize: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 1.0, put_timeout: float = 0.05):
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.put_timeout = float(put_timeout)
+        self.maxsize = max(1, int(maxsize))
+        self._q: "queue.Queue" = queue.Queue(maxsize=self.maxsize)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.retries = 3
+        self.backoff = 0.5  # 초, 재시도마다 2배
+        self._carry: List = []  # DB 장애로 못 넣은 행 (다음 주기에 먼저)
+        self._links: Dict[object, Tuple[List, float]] = {}  # diagnosis_id → (click id 들, 포기 시각)
+        self._links_lock = threading.Lock()
+
+    # ---- producer ----
+    def submit(self, obj) -> bool:
+        """큐에 넣으면 True. 가득 차서 못 넣으면 동기 저장 후 False."""
+        self._ensure_started()
+        try:
+            self._q.put(obj, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            logger.warning("write-behind queue full; saving synchronously")
+            obj.save(force_insert=True)
+            self._recorded([obj])
+            return False
+
+    # ---- consumer ----
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="diag-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _drain(self, first=None) -> List:
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List) -> None:
+        batch = self._carry + batch
+        self._carry = []
+        if not batch:
+            return
+        for attempt in range(self.retries + 1):
+            close_old_connections()
+            try:
+                self.model.objects.bulk_create(batch, batch_size=self.batch_size)
+            except (IntegrityError, DataError) as e:
+                # 배치 안의 특정 행 문제 → 재시도해도 같음
+                logger.warning(f"Bulk persist of {len(batch)} diagnoses failed, inserting one by one: {e}")
+                break
+            except Exception as e:
+                logger.warning(f"Bulk persist of {len(batch)} diagnoses failed (attempt {attempt + 1}): {e}")
+                if attempt < self.retries and not self._stop.wait(self.backoff * 2 ** attempt):
+                    continue
+                break
+            else:
+                self._recorded(batch)
+                return
+        self._write_rows(batch)
+
+    def _write_rows(self, batch: List) -> None:
+        """한 행씩 insert. 행 자체가 문제면 그 행만 버리고, 그 밖의 실패는 다음 주기로"""
+        saved = []
+        for obj in batch:
+            close_old_connections()
+            try:
+                with transaction.atomic():
+                    obj.save(force_insert=True)
+                saved.append(obj)
+            except (IntegrityError, DataError) as e:
+                if isinstance(e, IntegrityError) and self._exists(obj):
+                    # 다른 워커가 먼저 저장한 재전송 (idempotency: 같은 키 → 같은 id)
+                    logger.info(f"Dropped duplicate diagnosis {obj.pk}")
+                    continue
+                metrics.db_failure("diagnosis")
+                logger.error(f"Failed to persist diagnosis {obj.pk}: {e}")
+                logger.error(traceback.format_exc())
+            except Exception as e:
+                metrics.db_failure("diagnosis")
+                logger.error(f"Failed to persist diagnosis {obj.pk}, will retry: {e}")
+                self._carry.append(obj)
+        if len(self._carry) > self.maxsize:
+            dropped = len(self._carry) - self.maxsize
+            logger.error(f"write-behind retry buffer full; dropping {dropped} oldest diagnoses")
+            self._carry = self._carry[dropped:]
+        self._recorded(saved)
+
+    def _exists(self, obj) -> bool:
+        try:
+            return self.model.objects.filter(pk=obj.pk).exists()
+        except Exception:
+            return False
+
+    def _recorded(self, saved: List) -> None:
+        if saved:
+            rollups.record_diagnoses(saved)
+            sketches.record_diagnoses(saved)
+            score_histogram.record_diagnoses(saved)
+
+    # ---- 클릭 → 아직 저장 안 된 진단 연결 ----
+    def defer_click_links(self, links: List[Tuple[object, object]]) -> None:
+        """(click id, diagnosis id) 들: diagnosis 없이 저장한 클릭을 그 진단이 저장되면 연결"""
+        self._ensure_started()
+        deadline = time.monotonic() + float(getattr(settings, "DIAG_WRITE_BEHIND_LINK_TIMEOUT", 60.0))
+        with self._links_lock:
+            for click_id, diag_id in links:
+                ids, _ = self._links.get(diag_id, ([], 0.0))
+                ids.append(click_id)
+                self._links[diag_id] = (ids, deadline)
+
+    def _link_clicks(self) -> None:
+        with self._links_lock:
+            if not self._links:
+                return
+            links, self._links = self._links, {}
+        from .models import ButtonClick
+
+        now = time.monotonic()
+        keep = {}
+        try:
+            close_old_connections()
+            found = set(self.model.objects.filter(pk__in=list(links)).values_list("pk", flat=True))
+            for diag_id, (click_ids, deadline) in links.items():
+                if diag_id in found:
+                    ButtonClick.objects.filter(pk__in=click_ids, diagnosis__isnull=True).update(diagnosis_id=diag_id)
+                elif deadline > now:
+                    keep[diag_id] = (click_ids, deadline)
+                else:
+                    logger.warning(f"Diagnosis {diag_id} never persisted; {len(click_ids)} clicks left unlinked")
+        except Exception as e:
+            logger.error(f"Failed to link deferred clicks: {e}")
+            logger.error(traceback.format_exc())
+            keep = {k: v for k, v in links.items() if v[1] > now}
+        if keep:
+            with self._links_lock:
+                for diag_id, (click_ids, deadline) in keep.items():
+                    ids, _ = self._links.get(diag_id, ([], 0.0))
+                    self._links[diag_id] = (click_ids + ids, deadline)
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                deadline = time.monotonic() + self.flush_interval
+                batch = []
+                # batch_size 가 차거나 flush_interval 이 지나면 flush
+                while len(batch) < self.batch_size and not self._stop.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.extend(self._drain(self._q.get(timeout=remaining)))
+                    except queue.Empty:
+                        break
+                self._write(batch)
+                self._link_clicks()
+            # 종료 시 남은 것 전부
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+            if self._carry:
+                self._write([])
+            if self._carry:
+                logger.error(f"write-behind stopping with {len(self._carry)} unsaved diagnoses")
+            self._link_clicks()
+        finally:
+            connection.close()
+
+    def flush_and_stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        t = self._thread
+        if t is not None and t.is_alive():
+            t.join(timeout)
+        elif not self._q.empty():
+            # 스레드 없이 남은 행 (fork 직후 등) 은 현재 스레드에서 저장
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+            self._link_clicks()
+
+    def qsize(self) -> int:
+        return self._q.qsize()
+
+
+_queue: Optional[WriteBehindQueue] = None
+_queue_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DIAG_WRITE_BEHIND", False))
+
+
+def get_queue() -> WriteBehindQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from .models import DiagnosisResult
+                _queue = WriteBehindQueue(
+                    DiagnosisResult,
+                    maxsize=getattr(settings, "DIAG_WRITE_BEHIND_QUEUE_SIZE", 10000),
+                    batch_size=getattr(settings, "DIAG_WRITE_BEHIND_BATCH_SIZE", 200),
+                    flush_interval=getattr(settings, "DIAG_WRITE_BEHIND_FLUSH_INTERVAL", 1.0),
+                    put_timeout=getattr(settings, "DIAG_WRITE_BEHIND_PUT_TIMEOUT", 0.05),
+                )
+                atexit.register(_queue.flush_and_stop)
+    return _queue
+
+
+def save_diagnosis(diag, sync: bool = False) -> None:
+    """write-behind 켜져 있으면 큐로, 아니면(또는 sync=True) 기존처럼 동기 insert."""
+    if enabled() and not sync:
+        get_queue().submit(diag)
+    else:
+        diag.save(force_insert=True)
+        rollups.record_diagnoses([diag])
+        sketches.record_diagnoses([diag])
+        score_histogram.record_diagnoses([diag])
@@ -1,4 +1,4 @@
-import React, { useContext, useEffect, useMemo } from "react";
+import React, { useContext, useEffect, useMemo, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { QuizContext } from "../context/QuizContext.jsx";
 import { QUESTIONS, NUM_Q } from "../data/questions.js";
@@ -10,6 +10,12 @@ const API_BASE =
   import.meta.env.VITE_API_BASE ||
   (import.meta.env.PROD ? "https://acne-eraser.onrender.com" : "http://127.0.0.1:8000");
 
+/* 제출 1건 식별자 (같은 답안 재전송이면 재사용 → 서버가 중복 저장 안 함) */
+function newSubmitKey() {
+  if (typeof crypto !== "undefined" && crypto.randomUUID) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
 /* Q1 성별 → 'M' | 'W' | null */
 function sexFromQ1(ans) {
   if (ans === 1 || ans === 3) return "M";
@@ -38,6 +44,9 @@ export default function QuizPage() {
   const nav = useNavigate();
   const { state, dispatch } = useContext(QuizContext);
   const { lang, current, answers, birthYear } = state;
+  // 완료 시간 통계용 (client_started_at ~ client_submitted_at)
+  const startedAtRef = useRef(new Date().toISOString());
+  const submitRef = useRef(null); // { sig, key, submittedAt }
 
   /**
    * ✅ 진입 시 무조건 영어 고정
@@ -69,13 +78,23 @@ export default function QuizPage() {
 
   const submitResult = async () => {
     try {
-      const payload = {
+      const base = {
         answers: (answers || []).map((v) => (v == null ? 0 : v)),
         birth_year: birthYear || null,
       };
+      // 답안이 그대로면 같은 키/제출 시각으로 재전송 (실패 후 다시 누름, 중복 클릭 등)
+      const sig = JSON.stringify(base);
+      if (submitRef.current?.sig !== sig) {
+        submitRef.current = { sig, key: newSubmitKey(), submittedAt: new Date().toISOString() };
+      }
+      const payload = {
+        ...base,
+        client_started_at: startedAtRef.current,
+        client_submitted_at: submitRef.current.submittedAt,
+      };
       const res = await fetch(`${API_BASE}/api/result`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: { "Content-Type": "application/json", "Idempotency-Key": submitRef.current.key },
         body: JSON.stringify(payload),
       });
       if (!res.ok) throw new Error(await res.text());